@@ -1,11 +1,9 @@
 import pygame
 import random
 import math
-
-# Initialize Pygame and mixer for sound
-pygame.mixer.pre_init(44100, -16, 1, 512)  # Pre-initialize mixer with 44.1kHz, 16-bit, mono, small buffer for low latency
-pygame.init()  # Initialize Pygame
-pygame.display.set_caption("Pong")  # Set the window title
+import argparse
+from pong_audio import init_audio, buffer_latency, measure_latency, VoiceManager, DEFAULT_BUFFER, DEFAULT_VOICES, \
+    PRIORITY_LOW, PRIORITY_NORMAL, PRIORITY_HIGH
 
 # Game configuration constants
 SCREEN_WIDTH = 800
@@ -36,17 +34,14 @@ def generate_sound(frequency, duration_ms, volume=0.5):
         # Compute the sine wave sample value at time i
         sample_value = amplitude * math.sin(2 * math.pi * frequency * (i / sample_rate))
         waveform.append(int(sample_value))
-    # Convert the list of samples to a bytes object (16-bit little-endian audio data)
-    audio_data = bytes()
+    # Convert the list of samples to bytes (16-bit little-endian audio data), one copy per mixer channel
+    channels = pygame.mixer.get_init()[2]  # 2 when the mixer is stereo (needed for panning)
+    audio_data = bytearray()
     for sample in waveform:
-        audio_data += int.to_bytes(sample, length=2, byteorder='little', signed=True)
+        audio_data += int.to_bytes(sample, length=2, byteorder='little', signed=True) * channels
     # Create a Sound object from the raw audio data
     return pygame.mixer.Sound(buffer=audio_data)
 
-# Generate sound effects (no external files, purely generated)
-beep_sound = generate_sound(frequency=1000, duration_ms=100, volume=0.5)  # High-pitched short beep (e.g., paddle hit)
-boop_sound = generate_sound(frequency=500, duration_ms=300, volume=0.5)   # Lower-pitched longer boop (e.g., scoring)
-
 # Define classes for game objects
 class Paddle:
     def __init__(self, x, y):
@@ -116,112 +111,207 @@ class Ball:
         """Draw the ball (as a square) on the given surface."""
         pygame.draw.rect(surface, WHITE, self.rect)
 
-# Initialize the game window and clock
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-clock = pygame.time.Clock()
-
-# Create game objects: one player paddle (left), one AI paddle (right), and a ball
-player_paddle = Paddle(x=20, y=(SCREEN_HEIGHT - PADDLE_HEIGHT) // 2)  # Player paddle starts centered vertically at x=20
-ai_paddle = Paddle(x=SCREEN_WIDTH - 20 - PADDLE_WIDTH, y=(SCREEN_HEIGHT - PADDLE_HEIGHT) // 2)  # AI paddle (right side)
-ball = Ball(x=0, y=0, size=BALL_SIZE)
-ball.launch()  # Launch the ball from the center in a random direction
-
-# Scorekeeping
-player_score = 0
-ai_score = 0
-# Font for rendering the score (using default font)
-font = pygame.font.Font(None, 36)  # 36-point font
-
-# Main game loop
-running = True
-while running:
-    # Cap the loop to 60 frames per second
-    clock.tick(FPS)
-    
-    # Event handling
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-    
-    # Player paddle control (keyboard input)
-    keys = pygame.key.get_pressed()
-    if keys[pygame.K_UP] or keys[pygame.K_w]:
-        player_paddle.move(-PADDLE_SPEED)  # move up
-    if keys[pygame.K_DOWN] or keys[pygame.K_s]:
-        player_paddle.move(PADDLE_SPEED)   # move down
-    
-    # AI paddle movement (simple AI logic)
-    # The AI will move towards the ball when the ball is on the AI's side or moving towards the AI.
-    if ball.dx > 0 and ball.x > SCREEN_WIDTH // 2:
-        # Ball is moving right and has passed the middle, move AI paddle toward the ball's y
-        if ai_paddle.rect.centery < ball.rect.centery:
-            ai_paddle.move(AI_SPEED)    # move down
-        elif ai_paddle.rect.centery > ball.rect.centery:
-            ai_paddle.move(-AI_SPEED)   # move up
-    else:
-        # (Optional) When ball is not moving towards AI, you can have the AI paddle drift toward center
-        if ai_paddle.rect.centery < SCREEN_HEIGHT // 2:
-            ai_paddle.move(AI_SPEED)
-        elif ai_paddle.rect.centery > SCREEN_HEIGHT // 2:
-            ai_paddle.move(-AI_SPEED)
-    
-    # Move the ball
-    ball.move()
-    
-    # Ball collision with top or bottom wall
-    if ball.y <= 0:
-        ball.y = 0
-        ball.bounce_vertical()
-        beep_sound.play()  # play bounce sound
-    elif ball.y + BALL_SIZE >= SCREEN_HEIGHT:
-        ball.y = SCREEN_HEIGHT - BALL_SIZE
-        ball.bounce_vertical()
-        beep_sound.play()  # play bounce sound
-    
-    # Ball collision with paddles
-    if ball.rect.colliderect(player_paddle.rect):
-        # Ball hit the player's paddle
-        ball.x = player_paddle.x + player_paddle.width  # avoid sticking inside paddle
-        # Calculate hit position to adjust ball's vertical speed (for more dynamic bounce)
-        hit_position = (ball.rect.centery - player_paddle.rect.centery) / (player_paddle.height / 2)
-        ball.dy += hit_position * 2  # tweak vertical velocity based on hit position
-        ball.bounce_horizontal()
-        beep_sound.play()  # play bounce sound
-    elif ball.rect.colliderect(ai_paddle.rect):
-        # Ball hit the AI's paddle
-        ball.x = ai_paddle.x - ball.size
-        hit_position = (ball.rect.centery - ai_paddle.rect.centery) / (ai_paddle.height / 2)
-        ball.dy += hit_position * 2
-        ball.bounce_horizontal()
-        beep_sound.play()  # play bounce sound
-    
-    # Check for scoring (ball goes off left or right side)
-    if ball.x < 0:
-        # Ball went off the left side – AI scores
-        ai_score += 1
-        boop_sound.play()       # play score sound
-        ball.launch()           # reset ball to center and launch toward a random direction
-    elif ball.x > SCREEN_WIDTH:
-        # Ball went off the right side – Player scores
-        player_score += 1
-        boop_sound.play()       # play score sound
-        ball.launch()           # reset and relaunch ball
-    
-    # Drawing everything on the screen
-    screen.fill(BLACK)  # Clear screen with black background
-    player_paddle.draw(screen)
-    ai_paddle.draw(screen)
-    ball.draw(screen)
-    # Draw the scores on the top of the screen
-    score_text = font.render(f"{player_score}   {ai_score}", True, WHITE)
-    text_rect = score_text.get_rect(center=(SCREEN_WIDTH // 2, 30))
-    screen.blit(score_text, text_rect)
-    # (Optional) Draw a center dividing line for aesthetics
-    # for y in range(0, SCREEN_HEIGHT, 40):
-    #     pygame.draw.rect(screen, WHITE, (SCREEN_WIDTH//2 - 2, y, 4, 20))
-    
-    # Update the display with all drawn content
-    pygame.display.flip()
+# Game entry point (window, sounds and the main loop are only created when the game is run, so the
+# constants, classes and generate_sound can be imported by pong_stress.py and other tools)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pong")
+    parser.add_argument("--balls", type=int, default=0, help="Party mode: play with this many balls at once")
+    parser.add_argument("--obstacles", type=int, default=0, help="Party mode: scatter this many obstacles")
+    parser.add_argument("--audio-buffer", type=int, default=DEFAULT_BUFFER, help="Mixer buffer in samples (latency)")
+    parser.add_argument("--voices", type=int, default=DEFAULT_VOICES, help="Mixer channels for sound effects")
+    parser.add_argument("--measure-latency", action="store_true", help="Print the nominal audio output latency and mixer jitter")
+    parser.add_argument("--no-music", action="store_true", help="Turn off the procedural background music")
+    parser.add_argument("--window", default=f"{SCREEN_WIDTH}x{SCREEN_HEIGHT}", help="Window size as WIDTHxHEIGHT")
+    parser.add_argument("--fullscreen", action="store_true", help="Use the whole screen")
+    parser.add_argument("--scale-mode", choices=("fit", "integer", "scaled"), default="fit",
+                        help="fit: any scale, integer: whole multiples only, scaled: let SDL scale (allows --vsync)")
+    parser.add_argument("--vsync", action="store_true", help="Wait for vsync (with --scale-mode scaled)")
+    parser.add_argument("--fx", nargs="*", choices=("trails", "bloom", "scanlines"),
+                        help="Retro post-processing effects (all of them if none are named; needs NumPy)")
+    parser.add_argument("--fx-stats", action="store_true", help="Show what each effect costs per frame")
+    parser.add_argument("--frames", type=int, default=0, help="Quit after this many frames (headless matches)")
+    parser.add_argument("--uncapped", action="store_true", help="Run frames as fast as possible instead of at FPS")
+    args = parser.parse_args(argv)
+    if args.balls and (args.fx is not None or args.fx_stats):
+        parser.error("--fx and --fx-stats are not available in party mode (--balls)")
+
+    # Initialize Pygame and mixer for sound
+    init_audio(args.audio_buffer)  # Pre-initialize mixer with 44.1kHz, 16-bit, stereo (for panning), configurable buffer
+    pygame.init()  # Initialize Pygame
+    pygame.display.set_caption("Pong")  # Set the window title
+
+    # Generate sound effects (no external files, purely generated)
+    beep_sound = generate_sound(frequency=1000, duration_ms=100, volume=0.5)  # High-pitched short beep (e.g., paddle hit)
+    boop_sound = generate_sound(frequency=500, duration_ms=300, volume=0.5)   # Lower-pitched longer boop (e.g., scoring)
+
+    # Sound effects play through a fixed pool of voices; scoring outranks paddle hits, which outrank walls
+    audio = VoiceManager(args.voices)
+    audio.add("wall", beep_sound, PRIORITY_LOW)
+    audio.add("paddle", beep_sound, PRIORITY_NORMAL)
+    audio.add("score", boop_sound, PRIORITY_HIGH)
+    if args.measure_latency:
+        print(f"Audio output latency: {buffer_latency(args.audio_buffer):.1f} ms nominal (buffer {args.audio_buffer} "
+              f"samples), end event {measure_latency():.1f} ms late (callback jitter)")
+
+    # Initialize the game window and clock. The game works in SCREEN_WIDTH x SCREEN_HEIGHT logical pixels;
+    # the Display scales them to the window (imported here because it imports this module's constants)
+    from pong_display import Display, solid_sprite
+    window_size = tuple(int(n) for n in args.window.lower().split("x"))
+    display = Display(size=window_size, fullscreen=args.fullscreen, mode=args.scale_mode, vsync=args.vsync)
+    display.add_sprite("paddle", solid_sprite(PADDLE_WIDTH, PADDLE_HEIGHT))
+    display.add_sprite("ball", solid_sprite(BALL_SIZE, BALL_SIZE))
+    clock = pygame.time.Clock()
+
+    if args.balls:
+        # Party mode: many balls in packed arrays (needs NumPy, so it is only imported here)
+        from pong_stress import run_party
+        run_party(display, clock, args.balls, args.obstacles, audio, args.frames, args.uncapped)
+        pygame.quit()
+        return
+
+    # Background music is streamed on one extra channel after the sound effect voices (needs NumPy)
+    music = None
+    if not args.no_music:
+        try:
+            from pong_music import MusicStream
+        except ImportError:
+            print("Music is off: pip install numpy to hear it")
+        else:
+            pygame.mixer.set_num_channels(args.voices + 1)
+            music = MusicStream(pygame.mixer.Channel(args.voices))
+
+    # Optional post-processing, applied to the frame after it is drawn
+    fx = None
+    fx_text, fx_updated = "", 0
+    if args.fx is not None:
+        from pong_fx import PostFX, EFFECTS
+        fx = PostFX(display, args.fx or EFFECTS)
+
+    # Create game objects: one player paddle (left), one AI paddle (right), and a ball
+    player_paddle = Paddle(x=20, y=(SCREEN_HEIGHT - PADDLE_HEIGHT) // 2)  # Player paddle starts centered vertically at x=20
+    ai_paddle = Paddle(x=SCREEN_WIDTH - 20 - PADDLE_WIDTH, y=(SCREEN_HEIGHT - PADDLE_HEIGHT) // 2)  # AI paddle (right side)
+    ball = Ball(x=0, y=0, size=BALL_SIZE)
+    ball.launch()  # Launch the ball from the center in a random direction
+
+    # Scorekeeping
+    player_score = 0
+    ai_score = 0
+    rally = 0  # Paddle hits since the last serve; the music speeds up and thickens with it
+
+    # Main game loop
+    running = True
+    frame = 0
+    while running:
+        # Cap the loop to 60 frames per second
+        clock.tick(0 if args.uncapped else FPS)
+        frame += 1
+        if args.frames and frame > args.frames:
+            break
+        audio.begin_frame()  # Reset the voice manager's once-per-frame sound limits
+        if music:
+            music.update()  # Queue the next synthesized chunk if the channel has room (never waits)
+
+        # Event handling
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            display.handle_event(event)  # Rescales sprites and glyphs once when the window is resized
+
+        # Player paddle control (keyboard input)
+        keys = pygame.key.get_pressed()
+        if keys[pygame.K_UP] or keys[pygame.K_w]:
+            player_paddle.move(-PADDLE_SPEED)  # move up
+        if keys[pygame.K_DOWN] or keys[pygame.K_s]:
+            player_paddle.move(PADDLE_SPEED)   # move down
+
+        # AI paddle movement (simple AI logic)
+        # The AI will move towards the ball when the ball is on the AI's side or moving towards the AI.
+        if ball.dx > 0 and ball.x > SCREEN_WIDTH // 2:
+            # Ball is moving right and has passed the middle, move AI paddle toward the ball's y
+            if ai_paddle.rect.centery < ball.rect.centery:
+                ai_paddle.move(AI_SPEED)    # move down
+            elif ai_paddle.rect.centery > ball.rect.centery:
+                ai_paddle.move(-AI_SPEED)   # move up
+        else:
+            # (Optional) When ball is not moving towards AI, you can have the AI paddle drift toward center
+            if ai_paddle.rect.centery < SCREEN_HEIGHT // 2:
+                ai_paddle.move(AI_SPEED)
+            elif ai_paddle.rect.centery > SCREEN_HEIGHT // 2:
+                ai_paddle.move(-AI_SPEED)
+
+        # Move the ball
+        ball.move()
+
+        # Ball collision with top or bottom wall
+        if ball.y <= 0:
+            ball.y = 0
+            ball.bounce_vertical()
+            audio.play("wall", pan=ball.x / SCREEN_WIDTH)  # play bounce sound, panned to the ball
+        elif ball.y + BALL_SIZE >= SCREEN_HEIGHT:
+            ball.y = SCREEN_HEIGHT - BALL_SIZE
+            ball.bounce_vertical()
+            audio.play("wall", pan=ball.x / SCREEN_WIDTH)  # play bounce sound, panned to the ball
+
+        # Ball collision with paddles
+        if ball.rect.colliderect(player_paddle.rect):
+            # Ball hit the player's paddle
+            ball.x = player_paddle.x + player_paddle.width  # avoid sticking inside paddle
+            # Calculate hit position to adjust ball's vertical speed (for more dynamic bounce)
+            hit_position = (ball.rect.centery - player_paddle.rect.centery) / (player_paddle.height / 2)
+            ball.dy += hit_position * 2  # tweak vertical velocity based on hit position
+            ball.bounce_horizontal()
+            audio.play("paddle", pan=ball.x / SCREEN_WIDTH)  # play bounce sound
+            rally += 1
+        elif ball.rect.colliderect(ai_paddle.rect):
+            # Ball hit the AI's paddle
+            ball.x = ai_paddle.x - ball.size
+            hit_position = (ball.rect.centery - ai_paddle.rect.centery) / (ai_paddle.height / 2)
+            ball.dy += hit_position * 2
+            ball.bounce_horizontal()
+            audio.play("paddle", pan=ball.x / SCREEN_WIDTH)  # play bounce sound
+            rally += 1
+
+        # Check for scoring (ball goes off left or right side)
+        if ball.x < 0:
+            # Ball went off the left side – AI scores
+            ai_score += 1
+            audio.play("score", pan=0.0)   # play score sound (on the side that was scored on)
+            rally = 0
+            ball.launch()           # reset ball to center and launch toward a random direction
+        elif ball.x > SCREEN_WIDTH:
+            # Ball went off the right side – Player scores
+            player_score += 1
+            audio.play("score", pan=1.0)   # play score sound
+            rally = 0
+            ball.launch()           # reset and relaunch ball
+        if music:
+            music.set_rally(rally)
+
+        # Drawing everything on the screen
+        display.clear(BLACK)  # Clear screen with black background
+        display.blit("paddle", player_paddle.rect.topleft)  # Sprites are pre-scaled to the window size
+        display.blit("paddle", ai_paddle.rect.topleft)
+        display.blit("ball", ball.rect.topleft)
+        # Draw the scores on the top of the screen (36-point default font, cached per window size)
+        display.text(f"{player_score}   {ai_score}", 36, WHITE, (SCREEN_WIDTH // 2, 30))
+        # (Optional) Draw a center dividing line for aesthetics
+        # for y in range(0, SCREEN_HEIGHT, 40):
+        #     pygame.draw.rect(screen, WHITE, (SCREEN_WIDTH//2 - 2, y, 4, 20))
+        if fx:
+            fx.apply(ball.rect)  # Trails, bloom and scanlines, only where something was drawn
+            if args.fx_stats:
+                if pygame.time.get_ticks() - fx_updated > 500:  # Refresh the readout twice a second
+                    fx_text, fx_updated = fx.readout(), pygame.time.get_ticks()
+                display.text(fx_text, 20, WHITE, (SCREEN_WIDTH // 2, SCREEN_HEIGHT - 15))
+
+        # Update the display with all drawn content
+        display.present()
+
+    # Quit Pygame gracefully
+    if music:
+        music.stop()
+    pygame.quit()
+
 
-# Quit Pygame gracefully
-pygame.quit()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+import os
+import gc
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+
+# ----------------------------------------
+# Constants
+# ----------------------------------------
+MIN_SAMPLE_SECONDS = 0.05   # Micro benchmarks loop until one sample takes at least this long
+DEFAULT_REPEAT = 7
+DEFAULT_THRESHOLD = 0.10    # compare flags anything more than 10% slower
+MATCH_SECONDS = 10          # Game time simulated by the headless match benchmarks
+SYNTHETIC_VERSIONS = 300    # Installed versions in the synthetic versions tree
+MANIFEST_VERSIONS = 800     # Entries in the synthetic version manifest (about Mojang's size)
+
+BENCHMARKS = {}  # name -> (kind, setup); setup(workdir) returns the function to time
+
+
+def benchmark(name, kind="micro"):
+    """
+    Registers a benchmark. Micro benchmarks are called in a loop and timed
+    per call; macro benchmarks are whole runs timed once per sample.
+    """
+    def register(setup):
+        BENCHMARKS[name] = (kind, setup)
+        return setup
+    return register
+
+
+def _headless():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+
+# ----------------------------------------
+# Pong
+# ----------------------------------------
+
+@benchmark("pong.generate_sound")
+def _generate_sound(workdir):
+    _headless()
+    import pygame
+    from Pong4kv0 import generate_sound
+    from pong_audio import init_audio
+    init_audio()
+    pygame.mixer.init()
+    return lambda: generate_sound(1000, 100)
+
+
+@benchmark("pong.step.env")
+def _step_env(workdir):
+    """One step of a single game over the Pong4kv0 rules (the vectorized env with one game)."""
+    from pong_env import PongVecEnv, STAY
+    import numpy as np
+    env = PongVecEnv(1, seed=1)
+    env.reset()
+    actions = np.full(1, STAY)
+    return lambda: env.step(actions)
+
+
+@benchmark("pong.step.env1024")
+def _step_env_batch(workdir):
+    from pong_env import PongVecEnv, STAY
+    import numpy as np
+    env = PongVecEnv(1024, seed=1)
+    env.reset()
+    actions = np.full(1024, STAY)
+    return lambda: env.step(actions)
+
+
+@benchmark("pong.step.party1000")
+def _step_party(workdir):
+    from pong_stress import StressSim
+    sim = StressSim(1000, obstacles=4, seed=1)
+    return lambda: sim.step(player_ai=True)
+
+
+def _render(size, effects=None):
+    _headless()
+    import pygame
+    pygame.init()
+    from Pong4kv0 import SCREEN_WIDTH, SCREEN_HEIGHT, BALL_SIZE, PADDLE_WIDTH, PADDLE_HEIGHT, WHITE
+    from pong_display import Display, solid_sprite
+    display = Display(size=size)
+    display.add_sprite("paddle", solid_sprite(PADDLE_WIDTH, PADDLE_HEIGHT))
+    display.add_sprite("ball", solid_sprite(BALL_SIZE, BALL_SIZE))
+    fx = None
+    if effects:
+        from pong_fx import PostFX
+        fx = PostFX(display, effects)
+    frame = [0]
+
+    def render():
+        n = frame[0] = frame[0] + 1
+        x, y = 30 + n * 6 % (SCREEN_WIDTH - 60), 10 + n * 5 % (SCREEN_HEIGHT - 20)
+        display.clear()
+        display.blit("paddle", (20, 250))
+        display.blit("paddle", (SCREEN_WIDTH - 30, y // 2))
+        display.blit("ball", (x, y))
+        display.text(f"{n // 600}   0", 36, WHITE, (SCREEN_WIDTH // 2, 30))
+        if fx:
+            fx.apply(pygame.Rect(x, y, BALL_SIZE, BALL_SIZE))
+        display.present()
+    return render
+
+
+@benchmark("pong.render.800x600")
+def _render_small(workdir):
+    return _render((800, 600))
+
+
+@benchmark("pong.render.2560x1440")
+def _render_large(workdir):
+    return _render((2560, 1440))
+
+
+@benchmark("pong.render.2560x1440.fx")
+def _render_large_fx(workdir):
+    return _render((2560, 1440), ("trails", "bloom", "scanlines"))
+
+
+def _match(extra=("--no-music",)):
+    """MATCH_SECONDS of game time through Pong4kv0.main, as fast as it will go."""
+    _headless()
+    from Pong4kv0 import main, FPS
+    args = ["--frames", str(MATCH_SECONDS * FPS), "--uncapped", *extra]
+
+    def match():
+        random.seed(1)  # Same serves every run
+        main(args)
+    return match
+
+
+@benchmark("pong.match", kind="macro")
+def _match_plain(workdir):
+    return _match()
+
+
+@benchmark("pong.match.music_fx", kind="macro")
+def _match_music_fx(workdir):
+    return _match(["--fx"])
+
+
+@benchmark("pong.match.party2000", kind="macro")
+def _match_party(workdir):
+    _headless()
+    from Pong4kv0 import FPS
+    from pong_stress import frame_ms
+    return lambda: frame_ms(2000, obstacles=4, frames=MATCH_SECONDS * FPS)
+
+
+# ----------------------------------------
+# Launcher
+# ----------------------------------------
+
+def _synthetic_manifest(count=MANIFEST_VERSIONS):
+    versions = []
+    for i in range(count):
+        kind = "release" if i % 4 == 0 else "snapshot" if i % 4 != 3 else "old_beta"
+        versions.append({
+            "id": f"1.{i // 40}.{i % 40}" if kind == "release" else f"{20 + i // 52}w{i % 52:02d}a",
+            "type": kind,
+            "url": f"https://piston-meta.mojang.com/v1/packages/{i:040x}/{i}.json",
+            "time": "2024-01-01T00:00:00+00:00",
+            "releaseTime": f"20{10 + i // 60:02d}-01-01T00:00:00+00:00",
+            "sha1": f"{i:040x}",
+            "complianceLevel": 1,
+        })
+    return {"latest": {"release": versions[0]["id"], "snapshot": versions[1]["id"]}, "versions": versions}
+
+
+def _synthetic_versions_tree(minecraft_dir, count=SYNTHETIC_VERSIONS):
+    """A versions/ directory with `count` installed versions, each a realistic-size client JSON."""
+    libraries = [{"name": f"org.example:lib{n}:1.{n}", "downloads": {"artifact": {
+        "path": f"org/example/lib{n}/1.{n}/lib{n}-1.{n}.jar", "sha1": f"{n:040x}", "size": 1000 + n,
+        "url": f"https://libraries.minecraft.net/org/example/lib{n}/1.{n}/lib{n}-1.{n}.jar"}}} for n in range(60)]
+    for i in range(count):
+        version_id = f"1.{i // 10}.{i % 10}"
+        directory = os.path.join(minecraft_dir, "versions", version_id)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, version_id + ".json"), "w", encoding="utf-8") as f:
+            json.dump({"id": version_id, "type": "release", "releaseTime": "2023-06-07T09:35:21+00:00",
+                       "mainClass": "net.minecraft.client.main.Main", "libraries": libraries}, f)
+
+
+@benchmark("launcher.manifest.parse")
+def _manifest_parse(workdir):
+    from version_manifest import compact_versions
+    raw = json.dumps(_synthetic_manifest())
+    return lambda: compact_versions(json.loads(raw)["versions"])
+
+
+@benchmark("launcher.version_json.parse")
+def _version_json_parse(workdir):
+    from version_index import read_version_json
+    _synthetic_versions_tree(workdir, 1)
+    path = os.path.join(workdir, "versions", "1.0.0", "1.0.0.json")
+    return lambda: read_version_json(path)
+
+
+@benchmark("launcher.installed.scan")
+def _installed_scan(workdir):
+    """The library's full scan: list versions/ and parse every JSON."""
+    import minecraft_launcher_lib
+    _synthetic_versions_tree(workdir)
+    return lambda: minecraft_launcher_lib.utils.get_installed_versions(workdir)
+
+
+@benchmark("launcher.installed.index")
+def _installed_index(workdir):
+    """What the launchers do instead: open the SQLite index (already reconciled) and list it."""
+    from version_index import VersionIndex
+    _synthetic_versions_tree(workdir)
+    index = VersionIndex(workdir)
+    index.reconcile()
+    index.close()
+
+    def load():
+        index = VersionIndex(workdir)
+        versions = index.installed_versions()
+        index.close()
+        return versions
+    return load
+
+
+@benchmark("launcher.settings.load")
+def _settings_load(workdir):
+    from launcher_settings import SettingsStore
+    from launcher_core import default_settings
+    store = SettingsStore(os.path.join(workdir, "settings.json"), default_settings(), legacy_files=[])
+    store.load()
+    store.data["profiles"] = [{"name": f"profile{i}", "version": "1.20.1", "ram": 4096} for i in range(20)]
+    store.save()
+    store.close()
+    return store.load
+
+
+@benchmark("launcher.settings.save")
+def _settings_save(workdir):
+    """A synchronous save (snapshot plus atomic, fsync'd write) rather than the debounced one."""
+    from launcher_settings import SettingsStore
+    from launcher_core import default_settings
+    store = SettingsStore(os.path.join(workdir, "settings.json"), default_settings(), legacy_files=[])
+    store.load()
+
+    def save():
+        store.data["ram"] += 1
+        store.save()
+        store.flush()
+    return save
+
+
+# ----------------------------------------
+# Running
+# ----------------------------------------
+
+def _time_micro(function, repeat):
+    function()  # Warm up caches and lazy imports
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_SAMPLE_SECONDS:
+            break
+        number *= 2 if elapsed * 10 < MIN_SAMPLE_SECONDS else 1 + int(MIN_SAMPLE_SECONDS / max(elapsed, 1e-9))
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        samples.append((time.perf_counter() - start) / number)
+    return samples, number
+
+
+def _time_macro(function, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    return samples, 1
+
+
+def run_benchmark(name, repeat=DEFAULT_REPEAT):
+    """Runs one registered benchmark in a scratch directory. Returns its result dict."""
+    kind, setup = BENCHMARKS[name]
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    try:
+        try:
+            function = setup(workdir)
+        except ImportError as e:
+            return {"kind": kind, "skipped": f"missing dependency: {e.name}"}
+        gc_was_enabled = gc.isenabled()
+        gc.collect()
+        gc.disable()  # Like timeit: collections at random points only add noise
+        try:
+            samples, number = (_time_macro if kind == "macro" else _time_micro)(function, repeat)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "kind": kind,
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "number": number,
+        "repeat": len(samples),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run(patterns=None, repeat=DEFAULT_REPEAT, callback=print):
+    """Runs every benchmark whose name contains one of `patterns` (all if none). Returns the results document."""
+    names = [name for name in BENCHMARKS if not patterns or any(p in name for p in patterns)]
+    results = {}
+    for name in names:
+        result = results[name] = run_benchmark(name, repeat)
+        if callback:
+            callback(format_result(name, result))
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+
+
+def _format_seconds(seconds):
+    for unit, factor in (("s", 1), ("ms", 1e3), ("us", 1e6)):
+        if seconds * factor >= 1:
+            return f"{seconds * factor:.3g} {unit}"
+    return f"{seconds * 1e9:.3g} ns"
+
+
+def format_result(name, result):
+    if "skipped" in result:
+        return f"{name:<28} skipped ({result['skipped']})"
+    spread = result["stdev"] / result["median"] * 100 if result["median"] else 0.0
+    return (f"{name:<28} {_format_seconds(result['median']):>10} median  {_format_seconds(result['min']):>10} min  "
+            f"+-{spread:.1f}%  ({result['repeat']} x {result['number']})")
+
+
+# ----------------------------------------
+# Comparing
+# ----------------------------------------
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Compares two results documents by median time. Returns a list of
+    (name, baseline_median, current_median, ratio, status) where status is
+    "regression" (slower by more than `threshold`), "improvement", "same",
+    "new", "removed" or "skipped" (skipped in either run, e.g. a missing
+    dependency, so there is nothing to compare).
+    """
+    rows = []
+    old, new = baseline["results"], current["results"]
+    for name in sorted(set(old) | set(new)):
+        if "skipped" in old.get(name, {}) or "skipped" in new.get(name, {}):
+            rows.append((name, None, None, None, "skipped"))
+            continue
+        before = old.get(name, {}).get("median")
+        after = new.get(name, {}).get("median")
+        if before is None or after is None:
+            rows.append((name, before, after, None, "removed" if after is None else "new"))
+            continue
+        ratio = after / before if before else float("inf")
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 - threshold:
+            status = "improvement"
+        else:
+            status = "same"
+        rows.append((name, before, after, ratio, status))
+    return rows
+
+
+def _load(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pong and launcher benchmarks.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("list", help="List the benchmarks")
+
+    p_run = sub.add_parser("run", help="Run benchmarks and write the results as JSON")
+    p_run.add_argument("patterns", nargs="*", help="Only run benchmarks whose name contains one of these")
+    p_run.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Samples per benchmark")
+    p_run.add_argument("--output", "-o", help="JSON file for the results (default: bench-<time>.json)")
+
+    p_cmp = sub.add_parser("compare", help="Compare two result files and flag regressions")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("current")
+    p_cmp.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                       help="Fraction slower that counts as a regression (default 0.10)")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for name, (kind, setup) in BENCHMARKS.items():
+            print(f"{name:<28} {kind}")
+    elif args.command == "run":
+        document = run(args.patterns, args.repeat)
+        output = args.output or datetime.now().strftime("bench-%Y%m%d-%H%M%S.json")
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+        print(f"Results written to {output}")
+    else:
+        rows = compare(_load(args.baseline), _load(args.current), args.threshold)
+        for name, before, after, ratio, status in rows:
+            if ratio is None:
+                print(f"{name:<28} {status}")
+            else:
+                print(f"{name:<28} {_format_seconds(before):>10} -> {_format_seconds(after):>10}  "
+                      f"{ratio:6.2f}x  {status.upper() if status == 'regression' else status}")
+        regressions = sum(1 for row in rows if row[4] == "regression")
+        print(f"{regressions} regression(s) beyond {args.threshold:.0%}")
+        sys.exit(1 if regressions else 0)
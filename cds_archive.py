@@ -0,0 +1,203 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+import subprocess
+
+# ----------------------------------------
+# Constants
+# ----------------------------------------
+ARCHIVE_DIR_NAME = "cds_archives"
+MIN_DYNAMIC_CDS = 13   # -XX:ArchiveClassesAtExit
+MIN_AUTO_CDS = 19      # -XX:+AutoCreateSharedArchive
+TRAINING_TIMEOUT = 300
+
+# Log lines after which the game has loaded (and so archived) the classes a normal start needs
+LOADED_PATTERNS = [
+    re.compile(r"Sound engine started"),
+    re.compile(r"Created: \d+x\d+x\d+ minecraft:textures/atlas/blocks\.png-atlas"),
+]
+
+_JAVA_VERSION_RE = re.compile(r'version "(\d+)(?:\.(\d+))?')
+
+
+# ----------------------------------------
+# Utility Functions
+# ----------------------------------------
+
+_java_versions = {}  # (realpath, mtime_ns) -> (major, version line)
+
+
+def java_version(java):
+    """Returns (major, first line of `java -version`) for a java executable, or (None, "") if it can't run."""
+    try:
+        path = os.path.realpath(java)
+        stamp = (path, os.stat(path).st_mtime_ns)
+    except OSError:
+        stamp = (java, None)  # Found on PATH; cached for this process only
+    if stamp not in _java_versions:
+        try:
+            result = subprocess.run([java, "-version"], capture_output=True, text=True, timeout=15)
+            line = (result.stderr or result.stdout).splitlines()[0]
+        except (OSError, subprocess.SubprocessError, IndexError):
+            _java_versions[stamp] = (None, "")
+            return _java_versions[stamp]
+        match = _JAVA_VERSION_RE.search(line)
+        major = None
+        if match:
+            # "1.8.0_392" is Java 8, "17.0.8" is Java 17
+            major = int(match.group(2)) if match.group(1) == "1" and match.group(2) else int(match.group(1))
+        _java_versions[stamp] = (major, line)
+    return _java_versions[stamp]
+
+
+def command_classpath(command):
+    """The -cp / -classpath value of a launch command, or None."""
+    for flag in ("-cp", "-classpath", "--class-path"):
+        if flag in command:
+            i = command.index(flag)
+            if i + 1 < len(command):
+                return command[i + 1]
+    return None
+
+
+# ----------------------------------------
+# Archive Store
+# ----------------------------------------
+
+class CdsArchives:
+    """
+    Per-launch-configuration AppCDS archives.
+
+    An archive is keyed by the java runtime (path and `-version` line) and a
+    hash of the launch classpath, so a changed mod list, library update or
+    different JDK simply gets a new key; the old archive is never handed to
+    a JVM it wasn't built for. The JVM itself re-validates every archive and
+    with the default -Xshare:auto quietly starts without it on any mismatch.
+
+    - Java 19+: -XX:+AutoCreateSharedArchive builds the archive on the first
+      launch and refreshes it whenever it goes stale.
+    - Java 13-18: the first launch with a new key records the archive with
+      -XX:ArchiveClassesAtExit; later launches pass -XX:SharedArchiveFile.
+    - Older runtimes are launched unchanged.
+    """
+
+    def __init__(self, minecraft_dir, archive_dir=None):
+        self.archive_dir = archive_dir or os.path.join(minecraft_dir, ARCHIVE_DIR_NAME)
+        self._lock = threading.Lock()
+        self._training = set()  # Keys being recorded by a running game
+        os.makedirs(self.archive_dir, exist_ok=True)
+
+    def key(self, command):
+        classpath = command_classpath(command)
+        if classpath is None:
+            return None
+        _major, version_line = java_version(command[0])
+        h = hashlib.sha1()
+        h.update(os.path.realpath(command[0]).encode("utf-8") + b"\0")
+        h.update(version_line.encode("utf-8") + b"\0")
+        h.update(classpath.encode("utf-8"))
+        return h.hexdigest()
+
+    def archive_path(self, key):
+        return os.path.join(self.archive_dir, key + ".jsa")
+
+    def apply(self, command, train=True, label=None):
+        """
+        Returns (command, mode) with CDS flags added after the java executable.
+        mode is "auto", "use", "train" or None (launched unchanged).
+        """
+        major, _line = java_version(command[0])
+        if major is None or major < MIN_DYNAMIC_CDS:
+            return command, None
+        key = self.key(command)
+        if key is None:
+            return command, None
+        path = self.archive_path(key)
+
+        if major >= MIN_AUTO_CDS:
+            flags, mode = ["-XX:+AutoCreateSharedArchive", f"-XX:SharedArchiveFile={path}"], "auto"
+        elif os.path.isfile(path):
+            flags, mode = [f"-XX:SharedArchiveFile={path}", "-Xshare:auto"], "use"
+        elif train:
+            with self._lock:
+                if key in self._training:
+                    return command, None  # Another running game is already recording this archive
+                self._training.add(key)
+            flags, mode = [f"-XX:ArchiveClassesAtExit={path}"], "train"
+        else:
+            return command, None
+
+        if mode != "use":
+            self._write_info(key, command, label)
+        return [command[0]] + flags + command[1:], mode
+
+    def training_finished(self, command):
+        """Call when a game launched in "train" mode has exited."""
+        key = self.key(command)
+        with self._lock:
+            self._training.discard(key)
+
+    def _write_info(self, key, command, label):
+        info = {
+            "java": os.path.realpath(command[0]),
+            "java_version": java_version(command[0])[1],
+            "label": label,
+            "created": time.time(),
+        }
+        try:
+            with open(os.path.join(self.archive_dir, key + ".json"), "w") as f:
+                json.dump(info, f, indent=4)
+        except OSError as e:
+            print(f"Could not write CDS archive info: {e}")
+
+    def archives(self):
+        """Lists recorded archives as dicts (key, size, label, java_version, created)."""
+        result = []
+        for name in os.listdir(self.archive_dir):
+            if not name.endswith(".jsa"):
+                continue
+            key = name[:-4]
+            info = {}
+            try:
+                with open(os.path.join(self.archive_dir, key + ".json"), "r") as f:
+                    info = json.load(f)
+            except (OSError, ValueError):
+                pass
+            info.update({"key": key, "size": os.path.getsize(os.path.join(self.archive_dir, name))})
+            result.append(info)
+        return result
+
+    def remove(self, key):
+        for suffix in (".jsa", ".json"):
+            try:
+                os.remove(os.path.join(self.archive_dir, key + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def wait_until_loaded(lines, timeout=TRAINING_TIMEOUT):
+    """
+    Reads game output lines until one matches LOADED_PATTERNS. Returns False on timeout or EOF.
+    Lines are read on a thread, so a game that stops writing can't block past the deadline;
+    the caller ends the process, which ends the reader.
+    """
+    loaded = threading.Event()
+    done = threading.Event()
+
+    def read():
+        try:
+            for line in lines:
+                if any(p.search(line) for p in LOADED_PATTERNS):
+                    loaded.set()
+                    return
+        except (OSError, ValueError):
+            pass  # The pipe was closed under us
+        finally:
+            done.set()
+
+    threading.Thread(target=read, name="CdsTrainingOutput", daemon=True).start()
+    done.wait(timeout)
+    return loaded.is_set()
@@ -3,8 +3,14 @@ from tkinter import ttk, messagebox, filedialog
 import minecraft_launcher_lib
 import subprocess
 import os
-import json
 from threading import Thread
+from launcher_settings import SettingsStore, PYLAUNCHER_CONFIG
+from version_index import VersionIndex
+from install_progress import ProgressMonitor
+from install_queue import InstallScheduler, CANCELLED, DONE
+from net_loop import NetLoop, TkDispatcher
+from natives_cache import NativesCache
+from version_manifest import shared_manifest
 
 class MinecraftLauncher:
     def __init__(self, root):
@@ -16,12 +22,30 @@ class MinecraftLauncher:
         self.minecraft_dir = minecraft_launcher_lib.utils.get_minecraft_directory()
 
         # Launcher settings (will be saved/loaded to file)
-        self.settings = {
-            "java_path": "",
-            "ram": "4096",            # in MB
-            "resolution": "1280x720",
-            "server_ip": ""
-        }
+        self.settings_store = SettingsStore(
+            os.path.join(self.minecraft_dir, PYLAUNCHER_CONFIG),
+            {
+                "java_path": "",
+                "ram": 4096,              # in MB
+                "resolution": "1280x720",
+                "server_ip": ""
+            }
+        )
+        self.settings = self.settings_store.data
+
+        # Installed versions are read from a persistent index kept current by a directory watcher
+        self.version_index = VersionIndex(self.minecraft_dir)
+        self.version_index.start()
+        self.index_generation = -1
+
+        # Installs are queued: duplicate clicks are merged and concurrent installs are capped
+        self.install_scheduler = InstallScheduler(self.minecraft_dir)
+
+        # Network work runs on one event loop thread and reports back on the Tk thread
+        self.net = NetLoop(TkDispatcher(self.root))
+
+        # Natives are extracted once and shared between launches
+        self.natives_cache = NativesCache(self.minecraft_dir)
 
         # UI variables
         self.selected_version = tk.StringVar()
@@ -33,6 +57,7 @@ class MinecraftLauncher:
         self.create_notebook()
         self.load_settings()       # Load any saved settings
         self.load_installed_versions()  # Populate the "Play" tab combobox with installed versions
+        self.root.after(1000, self.poll_version_index)
 
     def create_notebook(self):
         """Create tabs for Play, Installations, Skins, and Settings."""
@@ -127,6 +152,9 @@ class MinecraftLauncher:
             options["server"] = server_ip
 
         try:
+            natives_dir = self.natives_cache.prepare(version)
+            if natives_dir:
+                options["nativesDirectory"] = natives_dir
             command = minecraft_launcher_lib.command.get_minecraft_command(version, self.minecraft_dir, options)
 
             # Create a subprocess to launch the game
@@ -184,27 +212,38 @@ class MinecraftLauncher:
         # We'll store the version ID in the "text" field
         self.version_tree.grid(row=1, column=0, columnspan=3, sticky="nsew")
 
+        # Progress (sampled from the Tk loop; install threads never touch widgets)
+        ttk.Progressbar(self.install_frame, variable=self.download_progress, maximum=100).grid(
+            row=2, column=0, columnspan=3, padx=5, pady=5, sticky="ew"
+        )
+        self.progress_label = ttk.Label(self.install_frame, text="")
+        self.progress_label.grid(row=3, column=0, columnspan=3, padx=5, sticky="w")
+        self.progress_monitor = ProgressMonitor(self.root, self.show_progress)
+
         self.install_frame.grid_rowconfigure(1, weight=1)
         self.install_frame.grid_columnconfigure(0, weight=1)
 
-        # Load remote version list in a background thread
-        Thread(target=self.load_online_versions, daemon=True).start()
+        # Load remote version list off the Tk thread
+        self.load_online_versions()
 
     def load_online_versions(self):
-        """Fetch the official list of Minecraft releases from Mojang and populate the TreeView."""
-        try:
-            versions = minecraft_launcher_lib.utils.get_version_list()
-            # Only show official releases (exclude snapshots, betas, etc.)
-            for version in versions:
-                if version["type"] == "release":
-                    self.version_tree.insert(
-                        "",
-                        "end",
-                        text=version["id"],
-                        values=(version["type"], version["releaseTime"])
-                    )
-        except Exception as e:
-            self.log(f"Error loading versions: {str(e)}")
+        """Fetch the official list of Minecraft releases from Mojang in the background."""
+        self.net.run_blocking(
+            shared_manifest().versions, ("release",),
+            on_done=self.populate_online_versions,
+            on_error=lambda e: self.log(f"Error loading versions: {str(e)}")
+        )
+
+    def populate_online_versions(self, versions):
+        """Fill the TreeView with the fetched versions (runs on the Tk thread)."""
+        # Only official releases were requested (no snapshots, betas, etc.)
+        for version in versions:
+            self.version_tree.insert(
+                "",
+                "end",
+                text=version.id,
+                values=(version.type, version.release_time)
+            )
 
     def install_version(self):
         """Install the selected version with the chosen modloader."""
@@ -216,37 +255,45 @@ class MinecraftLauncher:
         version_id = self.version_tree.item(selection[0])["text"]
         modloader = self.modloader_var.get()
 
-        def do_install():
-            try:
-                if modloader == "Forge":
-                    # Installs the Forge version for the chosen MC version
-                    minecraft_launcher_lib.forge.install_forge_version(version_id, self.minecraft_dir)
-                    self.log(f"Installed Forge for Minecraft {version_id}")
-                elif modloader == "Fabric":
-                    minecraft_launcher_lib.fabric.install_fabric(version_id, self.minecraft_dir)
-                    self.log(f"Installed Fabric for Minecraft {version_id}")
-                elif modloader == "OptiFine":
-                    # Placeholder: minecraft-launcher-lib does not fully automate OptiFine installs.
-                    # One approach is to download the OptiFine installer and run it, or use partial logic.
-                    # We'll just log for now:
-                    self.log("OptiFine installation is not fully automated. Manual steps may be required.")
-                else:
-                    # Vanilla install
-                    minecraft_launcher_lib.install.install_minecraft_version(version_id, self.minecraft_dir)
-                    self.log(f"Installed Vanilla Minecraft {version_id}")
-
-                # After successful install, refresh the "Play" tab's combobox
-                self.load_installed_versions()
-
-            except Exception as e:
-                self.log(f"Installation error: {str(e)}")
-
-        Thread(target=do_install, daemon=True).start()
+        if modloader == "OptiFine":
+            # Placeholder: minecraft-launcher-lib does not fully automate OptiFine installs.
+            # One approach is to download the OptiFine installer and run it, or use partial logic.
+            # We'll just log for now:
+            self.log("OptiFine installation is not fully automated. Manual steps may be required.")
+            return
+
+        if self.install_scheduler.get(version_id, modloader):
+            self.log(f"{modloader} {version_id} is already queued.")
+            return
+
+        tracker = self.progress_monitor.track(f"{modloader} {version_id}")
+
+        def install_done(job):
+            """Called on the install worker thread when the job ends."""
+            tracker.finish("cancelled" if job.state == CANCELLED else job.error)
+            if job.state == DONE:
+                # Update the index; poll_version_index refreshes the combobox
+                self.version_index.reconcile()
+                message = f"Installed {modloader} Minecraft {version_id}"
+            elif job.state == CANCELLED:
+                message = f"Installation of {modloader} {version_id} cancelled."
+            else:
+                message = f"Installation error: {str(job.error)}"
+            self.root.after(0, self.log, message)  # Tk widgets only from the Tk thread
+
+        self.install_scheduler.submit(version_id, modloader, callback=tracker.callbacks(), on_done=install_done)
+
+    def show_progress(self, samples):
+        """Render the progress of all running installs (called on the Tk thread)."""
+        active = [s for s in samples if not s.finished]
+        self.download_progress.set(sum(s.fraction for s in active) / len(active) * 100 if active else 0)
+        self.progress_label["text"] = "\n".join(s.describe() for s in samples)
 
     def load_installed_versions(self):
         """Scan the local .minecraft folder for installed versions and populate the play combobox."""
         try:
-            installed = minecraft_launcher_lib.utils.get_installed_versions(self.minecraft_dir)
+            self.index_generation = self.version_index.generation
+            installed = self.version_index.installed_versions()
             version_ids = [v["id"] for v in installed]
             self.version_combobox["values"] = version_ids
 
@@ -256,6 +303,12 @@ class MinecraftLauncher:
         except Exception as e:
             self.log(f"Error loading installed versions: {str(e)}")
 
+    def poll_version_index(self):
+        """Refresh the play combobox on the Tk thread whenever the version index changes."""
+        if self.version_index.generation != self.index_generation:
+            self.load_installed_versions()
+        self.root.after(1000, self.poll_version_index)
+
     # --------------------------------------------------
     # -------------------- SKIN TAB --------------------
     # --------------------------------------------------
@@ -326,30 +379,29 @@ class MinecraftLauncher:
     def save_settings(self):
         """Save current settings to a JSON file in the Minecraft directory."""
         self.settings["java_path"] = self.java_path_entry.get()
-        self.settings["ram"] = self.ram_spinbox.get()
+        try:
+            self.settings["ram"] = int(self.ram_spinbox.get())
+        except ValueError:
+            self.log("RAM must be a whole number of MB; keeping the previous value.")
         self.settings["resolution"] = self.resolution_entry.get()
 
         # Also save the server IP from the Play tab
         self.settings["server_ip"] = self.server_entry.get()
 
-        settings_path = os.path.join(self.minecraft_dir, "PyLauncher_settings.json")
-        try:
-            with open(settings_path, "w") as f:
-                json.dump(self.settings, f, indent=4)
+        # Written atomically in the background; rapid saves are coalesced
+        self.settings_store.save(on_written=lambda error: self.root.after(0, self.settings_written, error))
+
+    def settings_written(self, error):
+        """Report the outcome of the background settings write."""
+        if error is None:
             self.log("Settings saved successfully.")
-        except Exception as e:
-            self.log(f"Could not save settings: {str(e)}")
+        else:
+            self.log(f"Failed to save settings: {error}")
 
     def load_settings(self):
         """Load launcher settings from a JSON file, if it exists."""
-        settings_path = os.path.join(self.minecraft_dir, "PyLauncher_settings.json")
-        if os.path.exists(settings_path):
-            try:
-                with open(settings_path, "r") as f:
-                    loaded = json.load(f)
-                self.settings.update(loaded)
-            except Exception as e:
-                self.log(f"Could not load settings: {str(e)}")
+        # Migrates older/other launchers' config files on first run
+        self.settings_store.load()
 
     # ----------------------------------------------------
     # ------------------ LOGGING HELPER ------------------
@@ -0,0 +1,165 @@
+import time
+
+# ----------------------------------------
+# Constants
+# ----------------------------------------
+SAMPLE_INTERVAL_MS = 100  # How often the Tk loop samples install progress (10 Hz)
+RATE_SMOOTHING = 0.3      # Weight of the newest sample in the throughput moving average
+
+
+# ----------------------------------------
+# Utility Functions
+# ----------------------------------------
+
+def format_eta(seconds):
+    """Formats a number of seconds as M:SS (or H:MM:SS), or '--:--' when unknown."""
+    if seconds is None:
+        return "--:--"
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+# ----------------------------------------
+# Progress Tracking
+# ----------------------------------------
+
+class ProgressTracker:
+    """
+    Progress state for one install, written by the install thread.
+
+    `callbacks()` returns the setStatus/setProgress/setMax dict that
+    minecraft_launcher_lib expects. Each callback is a single attribute store,
+    so the install thread never takes a lock, never touches Tk, and pays next
+    to nothing per downloaded file. Everything derived (percentage,
+    throughput, ETA) is computed by `sample()` on the Tk thread.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.status = "Queued"
+        self.current = 0
+        self.maximum = 0
+        self.finished = False
+        self.error = None
+        self.started = time.monotonic()
+
+        # Only touched from the sampling (Tk) thread
+        self._last_time = None
+        self._last_current = 0
+        self._last_maximum = 0
+        self._rate = 0.0
+
+    def callbacks(self):
+        return {
+            "setStatus": self._set_status,
+            "setProgress": self._set_progress,
+            "setMax": self._set_max,
+        }
+
+    def _set_status(self, status):
+        self.status = status
+
+    def _set_progress(self, value):
+        self.current = value
+
+    def _set_max(self, value):
+        # The library calls setMax once per phase (libraries, assets, processors, ...)
+        self.maximum = value
+        self.current = 0
+
+    def finish(self, error=None):
+        self.error = error
+        self.finished = True
+
+    def sample(self, now=None):
+        """Returns a ProgressSample and updates the throughput estimate."""
+        now = time.monotonic() if now is None else now
+        current, maximum = self.current, self.maximum
+
+        if self._last_time is None or maximum != self._last_maximum or current < self._last_current:
+            # First sample or a new phase started: restart the rate estimate
+            self._rate = 0.0
+        else:
+            elapsed = now - self._last_time
+            if elapsed > 0:
+                instant = (current - self._last_current) / elapsed
+                self._rate += RATE_SMOOTHING * (instant - self._rate)
+        self._last_time, self._last_current, self._last_maximum = now, current, maximum
+
+        fraction = min(current / maximum, 1.0) if maximum > 0 else 0.0
+        eta = None
+        if self._rate > 0 and maximum > current:
+            eta = (maximum - current) / self._rate
+        return ProgressSample(self.name, self.status, current, maximum, fraction,
+                              self._rate, eta, self.finished, self.error)
+
+
+class ProgressSample:
+    """Immutable view of one install's progress at a point in time."""
+
+    __slots__ = ("name", "status", "current", "maximum", "fraction", "rate", "eta", "finished", "error")
+
+    def __init__(self, name, status, current, maximum, fraction, rate, eta, finished, error):
+        self.name = name
+        self.status = status
+        self.current = current
+        self.maximum = maximum
+        self.fraction = fraction
+        self.rate = rate          # Items per second in the current phase
+        self.eta = eta            # Seconds left in the current phase, or None
+        self.finished = finished
+        self.error = error
+
+    def describe(self):
+        """One-line human-readable summary for a status label."""
+        if self.finished:
+            return f"{self.name}: {'failed - ' + str(self.error) if self.error else 'done'}"
+        text = f"{self.name}: {self.status}"
+        if self.maximum:
+            text += f" {self.fraction * 100:.0f}% ({self.current}/{self.maximum}, {self.rate:.1f}/s, ETA {format_eta(self.eta)})"
+        return text
+
+
+class ProgressMonitor:
+    """
+    Samples every active ProgressTracker from the Tk event loop at a fixed rate.
+
+    `on_update` is called on the Tk thread with a list of ProgressSample
+    objects (one per install). Finished installs are reported once more and
+    then dropped. Sampling stops while nothing is being tracked.
+    """
+
+    def __init__(self, root, on_update, interval_ms=SAMPLE_INTERVAL_MS):
+        self.root = root
+        self.on_update = on_update
+        self.interval_ms = interval_ms
+        self._trackers = []
+        self._after_id = None
+
+    def track(self, name):
+        """Creates a tracker for a new install. Call from the Tk thread."""
+        tracker = ProgressTracker(name)
+        self._trackers.append(tracker)
+        if self._after_id is None:
+            self._after_id = self.root.after(self.interval_ms, self._tick)
+        return tracker
+
+    def _tick(self):
+        now = time.monotonic()
+        trackers = list(self._trackers)
+        samples = [tracker.sample(now) for tracker in trackers]
+        # Drop only installs whose *reported* sample was final, so the last state is always shown
+        for tracker, sample in zip(trackers, samples):
+            if sample.finished:
+                self._trackers.remove(tracker)
+        try:
+            self.on_update(samples)
+        finally:
+            if self._trackers:
+                self._after_id = self.root.after(self.interval_ms, self._tick)
+            else:
+                self._after_id = None
@@ -0,0 +1,343 @@
+import os
+import heapq
+import shutil
+import fnmatch
+import importlib
+import itertools
+import threading
+import minecraft_launcher_lib
+from modloader_cache import ModloaderCache
+
+# ----------------------------------------
+# Constants
+# ----------------------------------------
+MAX_CONCURRENT_INSTALLS = 2
+MAX_DOWNLOADS = 8            # Files downloading at once across all installs (the lib runs up to 32 per install)
+# Lib modules that import download_file by name; each holds its own reference to wrap
+DOWNLOADING_MODULES = ("install", "forge", "fabric", "quilt", "mrpack", "runtime")
+
+PRIORITY_LAUNCH = 0    # The version the user is about to play
+PRIORITY_NORMAL = 10   # A click on "Install"
+PRIORITY_BATCH = 20    # Bulk/overnight installs
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class InstallCancelled(Exception):
+    """Raised inside an install (from its progress callbacks) once the job has been cancelled."""
+
+
+# ----------------------------------------
+# Utility Functions
+# ----------------------------------------
+
+_modloader_cache = None
+
+
+def install_modloader_version(version, modloader, minecraft_dir, callback=None, cache=None):
+    """
+    Installs `version` (a vanilla version id) with the given modloader ("Vanilla", "Forge" or "Fabric").
+    Loaders go through `cache` (default: the per-user ModloaderCache).
+    """
+    global _modloader_cache
+    if modloader in ("Forge", "Fabric"):
+        # Replays previously installed loaders from the shared cache instead of re-running installers
+        if cache is None:
+            if _modloader_cache is None:
+                _modloader_cache = ModloaderCache()
+            cache = _modloader_cache
+        cache.install(modloader, version, minecraft_dir, callback=callback)
+    else:
+        minecraft_launcher_lib.install.install_minecraft_version(version, minecraft_dir, callback=callback)
+
+
+_download_slots = None
+_download_limit = None
+
+
+def limit_downloads(max_downloads=MAX_DOWNLOADS):
+    """
+    Caps how many files minecraft_launcher_lib downloads at once, process-wide.
+    The lib downloads libraries and assets on its own thread pool with its own
+    requests sessions, so the cap is a semaphore around download_file in every
+    lib module that imported it. Calling it again only changes the limit.
+    """
+    global _download_slots, _download_limit
+    if max_downloads == _download_limit:
+        return
+    first = _download_slots is None
+    _download_slots = threading.BoundedSemaphore(max_downloads)
+    _download_limit = max_downloads
+    if not first:
+        return
+    for name in DOWNLOADING_MODULES:
+        try:
+            module = importlib.import_module(f"minecraft_launcher_lib.{name}")
+        except ImportError:
+            continue
+        download_file = getattr(module, "download_file", None)
+        if download_file is None:
+            continue
+
+        def limited(*args, _download_file=download_file, **kwargs):
+            slots = _download_slots
+            with slots:
+                return _download_file(*args, **kwargs)
+        module.download_file = limited
+
+
+# ----------------------------------------
+# Jobs
+# ----------------------------------------
+
+class InstallJob:
+    """One queued (version, modloader) install. Created by InstallScheduler.submit()."""
+
+    def __init__(self, version, modloader, priority, callback, on_done):
+        self.version = version
+        self.modloader = modloader
+        self.key = (version, modloader)
+        # "1.20.1-47.1.0" (a Forge version) still writes the files of Minecraft 1.20.1; "1.21-rc1" is its own version
+        self.game_version = version.split("-")[0] if modloader == "Forge" else version
+        self.priority = priority
+        self.state = QUEUED
+        self.error = None
+        self.callback = callback or {}
+        self.on_done = [on_done] if on_done else []
+
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        """Requests cancellation; a running install stops at its next progress callback."""
+        self._cancel.set()
+
+    def wait(self, timeout=None):
+        """Blocks until the job has finished (in any state). Returns False on timeout."""
+        return self._done.wait(timeout)
+
+    def guarded_callback(self):
+        """The job's callback dict, wrapped so each call checks for cancellation first."""
+        def guard(name):
+            inner = self.callback.get(name)
+
+            def call(value):
+                if self._cancel.is_set():
+                    raise InstallCancelled(f"{self.modloader} {self.version}")
+                if inner:
+                    inner(value)
+            return call
+        return {name: guard(name) for name in ("setStatus", "setProgress", "setMax")}
+
+    def __repr__(self):
+        return f"<InstallJob {self.modloader} {self.version} {self.state}>"
+
+
+# ----------------------------------------
+# Scheduler
+# ----------------------------------------
+
+class InstallScheduler:
+    """
+    Runs installs from a priority queue on a fixed pool of worker threads.
+
+    - Submitting a (version, modloader) pair that is already queued or running
+      returns the existing job instead of starting a second, racing install.
+    - Jobs for the same Minecraft version never run at the same time, because
+      every modloader install writes that version's vanilla files too.
+    - Cancellation is cooperative: the library calls our progress callbacks
+      between files, and the next call raises InstallCancelled. Version
+      directories the job created are then removed so a half-installed
+      version never shows up as playable. Libraries and assets are kept;
+      the library verifies them by SHA-1 before reusing them.
+    """
+
+    def __init__(self, minecraft_dir, max_installs=MAX_CONCURRENT_INSTALLS, installer=install_modloader_version,
+                 max_downloads=MAX_DOWNLOADS):
+        self.minecraft_dir = minecraft_dir
+        self.max_installs = max_installs
+        self.installer = installer
+        limit_downloads(max_downloads)
+
+        self._cond = threading.Condition()
+        self._heap = []                  # (priority, seq, job)
+        self._seq = itertools.count()
+        self._jobs = {}                  # key -> queued or running job
+        self._busy_versions = set()      # Minecraft versions with a running job
+        self._workers = []
+        self._shutdown = False
+
+    # ---------------- Submitting ----------------
+    def submit(self, version, modloader="Vanilla", callback=None, on_done=None, priority=PRIORITY_NORMAL):
+        """Queues an install and returns its InstallJob (or the identical job already pending)."""
+        with self._cond:
+            job = self._jobs.get((version, modloader))
+            if job is not None:
+                if on_done:
+                    job.on_done.append(on_done)
+                if priority < job.priority and job.state == QUEUED:
+                    self._requeue(job, priority)
+                return job
+
+            job = InstallJob(version, modloader, priority, callback, on_done)
+            self._jobs[job.key] = job
+            heapq.heappush(self._heap, (priority, next(self._seq), job))
+            self._ensure_workers()
+            self._cond.notify()
+            return job
+
+    def submit_many(self, pairs, priority=PRIORITY_BATCH):
+        """Queues many (version, modloader) installs at once, e.g. a test matrix."""
+        return [self.submit(version, modloader, priority=priority) for version, modloader in pairs]
+
+    def prioritize(self, version):
+        """Moves every queued job for `version` to the front of the queue."""
+        with self._cond:
+            for job in list(self._jobs.values()):
+                if job.version == version and job.state == QUEUED and job.priority > PRIORITY_LAUNCH:
+                    self._requeue(job, PRIORITY_LAUNCH)
+
+    def _requeue(self, job, priority):
+        # heapq has no decrease-key; push a new entry and skip the stale one when popped
+        job.priority = priority
+        heapq.heappush(self._heap, (priority, next(self._seq), job))
+        self._cond.notify()
+
+    def get(self, version, modloader="Vanilla"):
+        """The queued or running job for (version, modloader), or None."""
+        with self._cond:
+            return self._jobs.get((version, modloader))
+
+    # ---------------- Cancelling / Waiting ----------------
+    def cancel(self, version, modloader="Vanilla"):
+        with self._cond:
+            job = self._jobs.get((version, modloader))
+        if job:
+            job.cancel()
+        return job
+
+    def cancel_all(self):
+        with self._cond:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.cancel()
+
+    def pending(self):
+        """Queued and running jobs, highest priority first."""
+        with self._cond:
+            return sorted(self._jobs.values(), key=lambda j: (j.state != RUNNING, j.priority))
+
+    def wait_all(self, timeout=None):
+        """Blocks until the queue has drained. Returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._jobs, timeout)
+
+    def shutdown(self, cancel=True):
+        if cancel:
+            self.cancel_all()
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+
+    # ---------------- Workers ----------------
+    def _ensure_workers(self):
+        while len(self._workers) < self.max_installs:
+            worker = threading.Thread(target=self._worker_loop, name=f"InstallWorker-{len(self._workers)}", daemon=True)
+            self._workers.append(worker)
+            worker.start()
+
+    def _next_job(self):
+        """Pops the best runnable job, skipping stale heap entries and busy versions. Caller holds the lock."""
+        skipped = []
+        job = None
+        while self._heap:
+            priority, seq, candidate = heapq.heappop(self._heap)
+            if candidate.state != QUEUED or priority != candidate.priority:
+                continue  # Stale entry from a requeue, or already taken
+            if candidate.game_version in self._busy_versions:
+                skipped.append((priority, seq, candidate))
+                continue
+            job = candidate
+            break
+        for entry in skipped:
+            heapq.heappush(self._heap, entry)
+        return job
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                job = None
+                while not self._shutdown:
+                    job = self._next_job()
+                    if job is not None:
+                        break
+                    self._cond.wait()
+                if job is None:
+                    return
+                job.state = RUNNING
+                self._busy_versions.add(job.game_version)
+            self._run(job)
+
+    def _run(self, job):
+        versions_dir = os.path.join(self.minecraft_dir, "versions")
+        before = set(os.listdir(versions_dir)) if os.path.isdir(versions_dir) else set()
+        try:
+            if job.cancelled:
+                raise InstallCancelled(f"{job.modloader} {job.version}")
+            self.installer(job.version, job.modloader, self.minecraft_dir, job.guarded_callback())
+            job.state = DONE
+        except InstallCancelled as e:
+            job.state = CANCELLED
+            job.error = e
+            self._remove_partial_versions(versions_dir, before, job)
+        except Exception as e:
+            job.state = FAILED
+            job.error = e
+        finally:
+            with self._cond:
+                self._jobs.pop(job.key, None)
+                self._busy_versions.discard(job.game_version)
+                self._cond.notify_all()
+            job._done.set()
+            for on_done in job.on_done:
+                try:
+                    on_done(job)
+                except Exception as e:
+                    print(f"Error in install completion handler: {e}")
+
+    @staticmethod
+    def _remove_partial_versions(versions_dir, before, job):
+        """Deletes version directories the cancelled job created (they hold no finished install)."""
+        if not os.path.isdir(versions_dir):
+            return
+        for name in set(os.listdir(versions_dir)) - before:
+            # Jobs for other Minecraft versions may be writing their own new directories right now
+            if _job_creates(job, name):
+                shutil.rmtree(os.path.join(versions_dir, name), ignore_errors=True)
+
+
+def _job_creates(job, version_id):
+    """True if installing `job` can create versions/<version_id>: its vanilla base or its loader's version."""
+    game_version = job.game_version
+    if version_id == game_version:
+        return True
+    if job.modloader == "Forge":
+        if "-" in job.version:
+            try:
+                if version_id == minecraft_launcher_lib.forge.forge_to_installed_version(job.version):
+                    return True
+            except Exception:
+                pass
+        # The Forge build is resolved during the install; old ones are named like 1.12.2-forge1.12.2-14.23.5.2859
+        return fnmatch.fnmatchcase(version_id, f"{game_version}-forge*")
+    if job.modloader == "Fabric":
+        return fnmatch.fnmatchcase(version_id, f"fabric-loader-*-{game_version}")
+    return False
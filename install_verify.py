@@ -0,0 +1,294 @@
+import os
+import json
+import mmap
+import sqlite3
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from minecraft_launcher_lib._helper import inherit_json, parse_rule_list
+from minecraft_launcher_lib.natives import get_natives
+from net_loop import NetLoop
+
+# ----------------------------------------
+# Constants
+# ----------------------------------------
+STAT_CACHE_FILE = "launcher_verify_cache.sqlite"
+ASSET_URL = "https://resources.download.minecraft.net/"
+POOL_THRESHOLD = 16        # Fewer files than this are hashed in-process (pool startup costs more)
+POOL_CHUNKSIZE = 8
+MMAP_THRESHOLD = 64 * 1024  # Small files are cheaper to read() than to map
+
+MISSING = "missing"
+WRONG_SIZE = "size"
+WRONG_HASH = "sha1"
+
+
+# ----------------------------------------
+# Hashing (runs in worker processes)
+# ----------------------------------------
+
+def sha1_mmap(path):
+    """SHA-1 of a file, hashed straight from a read-only memory map."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < MMAP_THRESHOLD:
+            return hashlib.sha1(f.read()).hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            return hashlib.sha1(m).hexdigest()
+
+
+def _hash_entry(path):
+    """Returns (path, sha1, size, mtime_ns, inode), or (path, None, ...) if the file is gone."""
+    try:
+        st = os.stat(path)
+        return path, sha1_mmap(path), st.st_size, st.st_mtime_ns, st.st_ino
+    except OSError:
+        return path, None, 0, 0, 0
+
+
+# ----------------------------------------
+# Expected Files
+# ----------------------------------------
+
+def _entry(minecraft_dir, rel_path, sha1, size, url):
+    return {"path": os.path.join(minecraft_dir, rel_path), "sha1": sha1, "size": size, "url": url}
+
+
+def expected_files(version, minecraft_dir):
+    """
+    Lists every file an installed version needs, with the SHA-1 and size its
+    manifests promise: client jar, libraries (and this platform's natives),
+    the asset index with all its objects, and the logging config.
+    Files the manifests give no hash for (old-style Forge libraries) are skipped.
+    """
+    json_path = os.path.join(minecraft_dir, "versions", version, version + ".json")
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if "inheritsFrom" in data:
+        data = inherit_json(data, minecraft_dir)
+
+    files = []
+    client = data.get("downloads", {}).get("client")
+    if client:
+        files.append(_entry(minecraft_dir, os.path.join("versions", data["id"], data["id"] + ".jar"),
+                            client["sha1"], client.get("size"), client["url"]))
+
+    for lib in data.get("libraries", []):
+        # Same rules the installer applies: libraries for other platforms aren't installed
+        if "rules" in lib and not parse_rule_list(lib["rules"], {}):
+            continue
+        downloads = lib.get("downloads", {})
+        artifact = downloads.get("artifact")
+        if artifact and artifact.get("url") and artifact.get("path") and artifact.get("sha1"):
+            files.append(_entry(minecraft_dir, os.path.join("libraries", artifact["path"]),
+                                artifact["sha1"], artifact.get("size"), artifact["url"]))
+        native = get_natives(lib) if "natives" in lib else ""  # get_natives() forks `file` on every call
+        classifier = downloads.get("classifiers", {}).get(native) if native else None
+        if classifier and classifier.get("path") and classifier.get("sha1"):
+            files.append(_entry(minecraft_dir, os.path.join("libraries", classifier["path"]),
+                                classifier["sha1"], classifier.get("size"), classifier["url"]))
+
+    logging_file = data.get("logging", {}).get("client", {}).get("file")
+    if logging_file:
+        files.append(_entry(minecraft_dir, os.path.join("assets", "log_configs", logging_file["id"]),
+                            logging_file["sha1"], logging_file.get("size"), logging_file["url"]))
+
+    asset_index = data.get("assetIndex")
+    if asset_index:
+        index_rel = os.path.join("assets", "indexes", data["assets"] + ".json")
+        files.append(_entry(minecraft_dir, index_rel, asset_index["sha1"], asset_index.get("size"), asset_index["url"]))
+        try:
+            with open(os.path.join(minecraft_dir, index_rel), "r", encoding="utf-8") as f:
+                objects = json.load(f).get("objects", {})
+        except (OSError, ValueError):
+            objects = {}  # The index itself will be reported and repaired first
+        for obj in objects.values():
+            h = obj["hash"]
+            files.append(_entry(minecraft_dir, os.path.join("assets", "objects", h[:2], h),
+                                h, obj.get("size"), ASSET_URL + h[:2] + "/" + h))
+    return files
+
+
+# ----------------------------------------
+# Stat Cache
+# ----------------------------------------
+
+class StatCache:
+    """
+    Remembers the SHA-1 of every file we have hashed, keyed by path and
+    guarded by (size, mtime_ns, inode). A file whose stat() still matches is
+    not read again; any write, replace or relink changes one of the three.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, inode INTEGER, sha1 TEXT)"
+        )
+        self._db.commit()
+        # Loaded once: the warm path is then one stat() and one dict lookup per file
+        self._rows = {row[0]: row[1:] for row in self._db.execute("SELECT path, size, mtime_ns, inode, sha1 FROM files")}
+
+    def lookup(self, path, st):
+        """The cached SHA-1 if `st` still matches what we hashed, else None."""
+        row = self._rows.get(path)
+        if row and row[0] == st.st_size and row[1] == st.st_mtime_ns and row[2] == st.st_ino:
+            return row[3]
+        return None
+
+    def store_many(self, results):
+        """Records (path, sha1, size, mtime_ns, inode) tuples from _hash_entry()."""
+        rows = [(p, size, mtime, ino, sha1) for p, sha1, size, mtime, ino in results if sha1 is not None]
+        with self._lock:
+            for row in rows:
+                self._rows[row[0]] = row[1:]
+            self._db.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)", rows)
+            self._db.commit()
+
+    def forget(self, paths):
+        with self._lock:
+            for path in paths:
+                self._rows.pop(path, None)
+            self._db.executemany("DELETE FROM files WHERE path = ?", [(p,) for p in paths])
+            self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+
+# ----------------------------------------
+# Verifier
+# ----------------------------------------
+
+class VerifyReport:
+    def __init__(self):
+        self.total = 0
+        self.cached = 0      # Trusted from the stat cache without reading
+        self.hashed = 0      # Read and hashed this run
+        self.failures = []   # (entry, reason)
+        self.repaired = []
+        self.unrepaired = []  # (entry, error)
+
+    @property
+    def ok(self):
+        return not self.failures or len(self.repaired) == len(self.failures)
+
+    def summary(self):
+        return {
+            "files": self.total,
+            "cached": self.cached,
+            "hashed": self.hashed,
+            "failed": [{"path": e["path"], "reason": reason} for e, reason in self.failures],
+            "repaired": [e["path"] for e in self.repaired],
+            "unrepaired": [{"path": e["path"], "error": str(err)} for e, err in self.unrepaired],
+        }
+
+
+class InstallVerifier:
+    """
+    Checks installed versions against their manifests.
+
+    Each expected file is stat()ed; files whose (size, mtime, inode) match
+    the stat cache are trusted, everything else is hashed on a process pool
+    reading through mmap. Only files that are missing or fail their hash are
+    downloaded again.
+    """
+
+    def __init__(self, minecraft_dir, cache_path=None, workers=None):
+        self.minecraft_dir = minecraft_dir
+        self.workers = workers
+        self.cache = StatCache(cache_path or os.path.join(minecraft_dir, STAT_CACHE_FILE))
+
+    def collect(self, versions):
+        """Expected files for all versions, deduplicated by path (assets and libraries are shared)."""
+        files = {}
+        for version in versions:
+            for entry in expected_files(version, self.minecraft_dir):
+                files.setdefault(entry["path"], entry)
+        return list(files.values())
+
+    def verify(self, versions, repair=False, callback=None):
+        callback = callback or {}
+        report = VerifyReport()
+        entries = self.collect(versions)
+        report.total = len(entries)
+
+        to_hash = []
+        for entry in entries:
+            try:
+                st = os.stat(entry["path"])
+            except OSError:
+                report.failures.append((entry, MISSING))
+                continue
+            if entry["size"] is not None and st.st_size != entry["size"]:
+                report.failures.append((entry, WRONG_SIZE))
+                continue
+            cached = self.cache.lookup(entry["path"], st)
+            if cached is not None:
+                report.cached += 1
+                if cached != entry["sha1"]:
+                    report.failures.append((entry, WRONG_HASH))
+                continue
+            to_hash.append(entry)
+
+        if to_hash:
+            callback.get("setStatus", lambda s: None)(f"Hashing {len(to_hash)} files")
+            results = self._hash_all([e["path"] for e in to_hash], callback)
+            self.cache.store_many(results)
+            report.hashed = len(results)
+            for entry, (_path, sha1, _size, _mtime, _ino) in zip(to_hash, results):
+                if sha1 is None:
+                    report.failures.append((entry, MISSING))
+                elif sha1 != entry["sha1"]:
+                    report.failures.append((entry, WRONG_HASH))
+
+        if repair and report.failures:
+            self.repair(report, callback)
+        return report
+
+    def _hash_all(self, paths, callback):
+        set_max = callback.get("setMax", lambda n: None)
+        set_progress = callback.get("setProgress", lambda n: None)
+        set_max(len(paths))
+        if len(paths) < POOL_THRESHOLD:
+            results = []
+            for i, path in enumerate(paths):
+                results.append(_hash_entry(path))
+                set_progress(i + 1)
+            return results
+        results = []
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            for i, result in enumerate(pool.map(_hash_entry, paths, chunksize=POOL_CHUNKSIZE)):
+                results.append(result)
+                set_progress(i + 1)
+        return results
+
+    def repair(self, report, callback=None):
+        """Downloads the failed files again (concurrently on one NetLoop) and re-checks their hashes."""
+        callback = callback or {}
+        callback.get("setStatus", lambda s: None)(f"Re-downloading {len(report.failures)} files")
+        self.cache.forget([e["path"] for e, _reason in report.failures])
+        net = NetLoop()
+        try:
+            pending = [(entry, net.submit(net.client.download(entry["url"], entry["path"]))) for entry, _reason in report.failures]
+            for entry, future in pending:
+                try:
+                    future.result()
+                    result = _hash_entry(entry["path"])
+                    if result[1] != entry["sha1"]:
+                        raise ValueError(f"checksum mismatch after download ({result[1]} != {entry['sha1']})")
+                    self.cache.store_many([result])
+                    report.repaired.append(entry)
+                except Exception as e:
+                    report.unrepaired.append((entry, e))
+        finally:
+            net.close()
+        return report
+
+    def close(self):
+        self.cache.close()
+
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import time
+import errno
+import shutil
+import tempfile
+from launcher_settings import atomic_write_json
+from modloader_cache import ModloaderCache, sha1_file
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# ----------------------------------------
+# Constants
+# ----------------------------------------
+FICLONE = 0x40049409  # ioctl(dst_fd, FICLONE, src_fd): share extents copy-on-write (btrfs, XFS, bcachefs)
+SNAPSHOT_DIR = ".snapshots"
+
+# Launcher-owned caches and transient output are never part of an instance snapshot/clone
+EXCLUDED_NAMES = {
+    SNAPSHOT_DIR, "logs", "crash-reports", "launcher_logs", "modloader_cache", "natives_cache",
+    "cds_archives", "launcher_daemon.sock",
+}
+EXCLUDED_SUFFIXES = (".sqlite", ".sqlite-journal", ".part", ".tmp")
+
+# Files nothing rewrites in place: safe to hardlink between instances when reflinks aren't available.
+# Only downloaded game files qualify; worlds, resource packs and other user data are always copied
+IMMUTABLE_SUFFIXES = (".jar",)
+IMMUTABLE_JAR_DIRS = tuple(name + os.sep for name in ("libraries", "mods", "versions"))
+IMMUTABLE_PREFIXES = (os.path.join("assets", "objects") + os.sep,)
+
+ADDED = "added"
+REMOVED = "removed"
+MODIFIED = "modified"
+
+
+# ----------------------------------------
+# Utility Functions
+# ----------------------------------------
+
+def walk_files(root):
+    """Yields (rel_path, os.stat_result) for every file under root that belongs to the instance."""
+    stack = [""]
+    while stack:
+        rel_dir = stack.pop()
+        try:
+            entries = list(os.scandir(os.path.join(root, rel_dir)))
+        except FileNotFoundError:
+            continue
+        for entry in entries:
+            if entry.name in EXCLUDED_NAMES or entry.name.endswith(EXCLUDED_SUFFIXES):
+                continue
+            rel = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(rel)
+            elif entry.is_file(follow_symlinks=False):
+                yield rel, entry.stat(follow_symlinks=False)
+
+
+def is_immutable(rel_path):
+    if rel_path.startswith(IMMUTABLE_PREFIXES):
+        return True
+    return rel_path.endswith(IMMUTABLE_SUFFIXES) and rel_path.startswith(IMMUTABLE_JAR_DIRS)
+
+
+class Cloner:
+    """
+    Copies single files as cheaply as the filesystem allows: a reflink
+    (FICLONE) when supported, else a hardlink for immutable files and a real
+    copy for mutable ones. Remembers when reflinks fail so a non-CoW
+    filesystem costs one failed ioctl, not one per file.
+    """
+
+    def __init__(self, allow_hardlinks=True):
+        self.allow_hardlinks = allow_hardlinks
+        self.reflinks = fcntl is not None and sys.platform.startswith("linux")
+        self.counts = {"reflink": 0, "hardlink": 0, "copy": 0}
+
+    def reflink(self, src, dst):
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            try:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+                return True
+            except OSError as e:
+                if e.errno in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.ENOSYS):
+                    self.reflinks = False if e.errno != errno.EXDEV else self.reflinks
+                    return False
+                raise
+
+    def clone(self, src, dst, immutable):
+        if self.reflinks and self.reflink(src, dst):
+            shutil.copystat(src, dst)
+            self.counts["reflink"] += 1
+            return
+        if immutable and self.allow_hardlinks:
+            if os.path.lexists(dst):
+                os.remove(dst)
+            try:
+                os.link(src, dst)
+                self.counts["hardlink"] += 1
+                return
+            except OSError:
+                pass
+        shutil.copy2(src, dst)
+        self.counts["copy"] += 1
+
+
+# ----------------------------------------
+# Instance Manager
+# ----------------------------------------
+
+class InstanceManager:
+    """
+    Snapshots, clones, diffs and rolls back instance directories.
+
+    A snapshot is a JSON manifest (path -> size, mtime, mode, SHA-1) stored
+    under <instance>/.snapshots/, with file contents kept once in the shared
+    content-addressed object store. Unchanged files reuse the previous
+    snapshot's hash instead of being read again.
+    """
+
+    def __init__(self, store=None):
+        self.store = store or ModloaderCache()
+
+    # ---------------- Snapshots ----------------
+    def snapshot_dir(self, instance_dir):
+        return os.path.join(instance_dir, SNAPSHOT_DIR)
+
+    def snapshots(self, instance_dir):
+        """Snapshot names of an instance, oldest first."""
+        try:
+            names = [n[:-5] for n in os.listdir(self.snapshot_dir(instance_dir)) if n.endswith(".json")]
+        except FileNotFoundError:
+            return []
+        return sorted(names, key=lambda n: os.path.getmtime(self._snapshot_path(instance_dir, n)))
+
+    def _snapshot_path(self, instance_dir, name):
+        return os.path.join(self.snapshot_dir(instance_dir), name + ".json")
+
+    def load_snapshot(self, instance_dir, name):
+        with open(self._snapshot_path(instance_dir, name), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def snapshot(self, instance_dir, name=None):
+        """Records the instance's current state. Returns the snapshot name (an existing one is never replaced)."""
+        if name is None:
+            base = name = time.strftime("%Y%m%d-%H%M%S")
+            n = 1
+            while os.path.exists(self._snapshot_path(instance_dir, name)):
+                n += 1
+                name = f"{base}-{n}"
+        elif os.path.exists(self._snapshot_path(instance_dir, name)):
+            raise FileExistsError(f"Snapshot {name} already exists")
+        previous = {}
+        existing = self.snapshots(instance_dir)
+        if existing:
+            previous = self.load_snapshot(instance_dir, existing[-1])["files"]
+
+        files = {}
+        cloner = Cloner(allow_hardlinks=False)
+        for rel, st in walk_files(instance_dir):
+            key = rel.replace(os.sep, "/")
+            old = previous.get(key)
+            if old and old["size"] == st.st_size and old["mtime_ns"] == st.st_mtime_ns \
+                    and os.path.exists(self.store.object_path(old["sha1"])):
+                files[key] = old
+                continue
+            path = os.path.join(instance_dir, rel)
+            digest = sha1_file(path)
+            obj = self.store.object_path(digest)
+            if not os.path.exists(obj):
+                # Reflink into the store where possible; the store makes its own copy otherwise
+                os.makedirs(self.store.cache_dir, exist_ok=True)
+                fd, tmp = tempfile.mkstemp(prefix=".snap-", dir=self.store.cache_dir)
+                os.close(fd)
+                cloner.clone(path, tmp, immutable=False)
+                self.store.add_object(tmp, digest, move=True)
+            files[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "mode": st.st_mode & 0o777, "sha1": digest}
+
+        atomic_write_json(self._snapshot_path(instance_dir, name), {
+            "name": name, "created": time.time(), "files": files
+        })
+        return name
+
+    # ---------------- Cloning ----------------
+    def clone(self, src_dir, dst_dir):
+        """Clones a live instance directory into dst_dir (which must not exist). Returns the method counts."""
+        if os.path.exists(dst_dir):
+            raise FileExistsError(dst_dir)
+        cloner = Cloner()
+        made = set()
+        for rel, _st in walk_files(src_dir):
+            dst = os.path.join(dst_dir, rel)
+            parent = os.path.dirname(dst)
+            if parent not in made:
+                os.makedirs(parent, exist_ok=True)
+                made.add(parent)
+            cloner.clone(os.path.join(src_dir, rel), dst, is_immutable(rel))
+        os.makedirs(dst_dir, exist_ok=True)
+        return cloner.counts
+
+    def clone_many(self, src_dir, dst_prefix, count):
+        """Makes `count` clones named <dst_prefix>-1 .. -N. Returns their paths."""
+        paths = []
+        for i in range(1, count + 1):
+            path = f"{dst_prefix}-{i}"
+            self.clone(src_dir, path)
+            paths.append(path)
+        return paths
+
+    def clone_snapshot(self, instance_dir, name, dst_dir):
+        """Materializes a snapshot into a new directory from the object store."""
+        if os.path.exists(dst_dir):
+            raise FileExistsError(dst_dir)
+        snapshot = self.load_snapshot(instance_dir, name)
+        cloner = Cloner()
+        for key, meta in snapshot["files"].items():
+            self._restore_file(cloner, dst_dir, key, meta)
+        os.makedirs(dst_dir, exist_ok=True)
+        return cloner.counts
+
+    def _restore_file(self, cloner, instance_dir, key, meta):
+        rel = key.replace("/", os.sep)
+        dst = os.path.join(instance_dir, rel)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        if os.path.lexists(dst):
+            os.remove(dst)
+        # Reflink or copy, never hardlink: the store's objects are shared by every instance and snapshot,
+        # and anything that rewrites the file in place (download_file opens it "wb") would change them
+        cloner.clone(self.store.object_path(meta["sha1"]), dst, immutable=False)
+        os.chmod(dst, meta["mode"])
+        os.utime(dst, ns=(meta["mtime_ns"], meta["mtime_ns"]))
+
+    # ---------------- Diff / Rollback ----------------
+    def diff(self, instance_dir, name, against=None):
+        """
+        Changes from snapshot `name` to snapshot `against` (or the live instance).
+        Returns {path: ADDED | REMOVED | MODIFIED}.
+        """
+        base = self.load_snapshot(instance_dir, name)["files"]
+        if against is not None:
+            current = self.load_snapshot(instance_dir, against)["files"]
+            changes = {}
+            for key in base.keys() | current.keys():
+                if key not in current:
+                    changes[key] = REMOVED
+                elif key not in base:
+                    changes[key] = ADDED
+                elif base[key]["sha1"] != current[key]["sha1"]:
+                    changes[key] = MODIFIED
+            return changes
+
+        changes = {}
+        seen = set()
+        for rel, st in walk_files(instance_dir):
+            key = rel.replace(os.sep, "/")
+            seen.add(key)
+            old = base.get(key)
+            if old is None:
+                changes[key] = ADDED
+            elif old["size"] != st.st_size:
+                changes[key] = MODIFIED
+            elif old["mtime_ns"] != st.st_mtime_ns and sha1_file(os.path.join(instance_dir, rel)) != old["sha1"]:
+                changes[key] = MODIFIED
+        for key in base.keys() - seen:
+            changes[key] = REMOVED
+        return changes
+
+    def rollback(self, instance_dir, name):
+        """Restores the instance to snapshot `name`. Returns the changes that were undone."""
+        snapshot = self.load_snapshot(instance_dir, name)["files"]
+        changes = self.diff(instance_dir, name)
+        cloner = Cloner()
+        for key, change in changes.items():
+            if change == ADDED:
+                os.remove(os.path.join(instance_dir, key.replace("/", os.sep)))
+            else:
+                self._restore_file(cloner, instance_dir, key, snapshot[key])
+        return changes
+
@@ -0,0 +1,692 @@
+#!/usr/bin/env python3
+import os
+import re
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import hashlib
+import argparse
+import tempfile
+import mimetypes
+import threading
+import http.server
+import urllib.parse
+import urllib.error
+import urllib.request
+import requests
+from modloader_cache import ModloaderCache, sha1_file
+
+# ----------------------------------------
+# Constants
+# ----------------------------------------
+MIRROR_PORT = 25580
+DISCOVERY_PORT = 25581
+DISCOVERY_QUERY = b"PYLAUNCHER-MIRROR?"
+DISCOVERY_TIMEOUT = 1.0       # Seconds to collect discovery replies
+URL_INDEX_FILE = "mirror_urls.sqlite"
+MUTABLE_TTL = 10 * 60         # Seconds a manifest or other mutable document is served before refetching
+UPSTREAM_TIMEOUT = 30
+MIRROR_CONNECT_TIMEOUT = 2.0  # A LAN mirror answers fast or not at all
+FAILURE_LIMIT = 2             # Consecutive mirror failures before clients stop trying it...
+FAILURE_COOLDOWN = 60         # ...for this many seconds
+COPY_CHUNK = 1024 * 1024
+USER_AGENT = "PyLauncherMirror/1.0"
+
+# Hosts a mirror fetches for its clients; anything else is refused
+MIRRORED_HOSTS = (
+    "launchermeta.mojang.com",
+    "piston-meta.mojang.com",
+    "piston-data.mojang.com",
+    "launcher.mojang.com",
+    "resources.download.minecraft.net",
+    "libraries.minecraft.net",
+    "maven.minecraftforge.net",
+    "files.minecraftforge.net",
+    "maven.fabricmc.net",
+    "meta.fabricmc.net",
+)
+ASSET_HOST = "resources.download.minecraft.net"
+LIBRARY_HOST = "libraries.minecraft.net"
+HASH_IN_URL = re.compile(r"/([0-9a-f]{40})(?:/|$)")
+
+
+class MirrorError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ----------------------------------------
+# Utility Functions
+# ----------------------------------------
+
+def url_digest(url):
+    """The SHA-1 a Mojang download URL is named by (objects, packages, assets), or None."""
+    match = HASH_IN_URL.search(urllib.parse.urlsplit(url).path)
+    return match.group(1) if match else None
+
+
+def is_immutable(url):
+    """Hash-named downloads and released jars never change; manifests and metadata do."""
+    path = urllib.parse.urlsplit(url).path
+    return url_digest(url) is not None or (path.endswith(".jar") and "SNAPSHOT" not in path)
+
+
+def parse_range(header, size):
+    """
+    Parses a single-range "bytes=" header into an inclusive (start, end).
+    Returns None when the whole file should be sent (no header, multiple
+    ranges or bad syntax) and raises ValueError when it can't be satisfied.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, sep, last = header[len("bytes="):].strip().partition("-")
+    if not sep or not (first or last) or not (first or "0").isdigit() or not (last or "0").isdigit():
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("empty suffix range")
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("range starts past the end")
+    return start, end
+
+
+# ----------------------------------------
+# Mirror Store
+# ----------------------------------------
+
+class MirrorStore:
+    """
+    Resolves upstream URLs to files in a ModloaderCache's object store.
+
+    Hash-named downloads go straight into the content-addressed store and are
+    verified against their name. Other URLs are downloaded once, stored by
+    content and remembered in a url -> sha1 index (immutable jars forever,
+    manifests for MUTABLE_TTL). The mirror's own Minecraft directory seeds it:
+    assets and libraries it already has are served without any download.
+    Concurrent requests for the same URL share one upstream fetch.
+    """
+
+    def __init__(self, cache, minecraft_dir=None, allowed_hosts=MIRRORED_HOSTS):
+        self.cache = cache
+        self.minecraft_dir = minecraft_dir
+        self.allowed_hosts = set(allowed_hosts)
+        self.stats = {"hits": 0, "local": 0, "misses": 0, "upstream_bytes": 0}
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._db = sqlite3.connect(os.path.join(cache.cache_dir, URL_INDEX_FILE), check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, sha1 TEXT, fetched REAL)")
+        self._db.commit()
+        self._urls = {row[0]: row[1:] for row in self._db.execute("SELECT url, sha1, fetched FROM urls")}
+
+    def object_file(self, digest):
+        if not re.fullmatch(r"[0-9a-f]{40}", digest or ""):
+            raise MirrorError(400, f"Not a SHA-1: {digest!r}")
+        path = self.cache.object_path(digest)
+        if not os.path.exists(path):
+            raise MirrorError(404, f"No object {digest}")
+        return path
+
+    def resolve(self, url, digest=None):
+        """Returns a local path holding `url`'s content, fetching it upstream if needed."""
+        parts = urllib.parse.urlsplit(url or "")
+        if parts.scheme not in ("http", "https") or parts.netloc not in self.allowed_hosts:
+            raise MirrorError(403, f"Not a mirrored URL: {url!r}")
+        digest = digest or url_digest(url)
+        path = self._cached(url, digest)
+        if path:
+            return path
+        with self._lock:
+            url_lock = self._inflight.setdefault(url, threading.Lock())
+        with url_lock:
+            try:
+                # Whoever held the lock before us may just have fetched it
+                path = self._cached(url, digest)
+                if path:
+                    return path
+                return self._fetch(url, digest)
+            finally:
+                with self._lock:
+                    self._inflight.pop(url, None)
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.stats[key] += n
+
+    def _cached(self, url, digest):
+        if digest:
+            path = self.cache.object_path(digest)
+            if os.path.exists(path):
+                self._count("hits")
+                return path
+        local = self._local_copy(url, digest)
+        if local:
+            self._count("local")
+            return local
+        row = self._urls.get(url)
+        if row and (is_immutable(url) or time.time() - row[1] < MUTABLE_TTL):
+            path = self.cache.object_path(row[0])
+            if os.path.exists(path):
+                self._count("hits")
+                return path
+        return None
+
+    def _local_copy(self, url, digest):
+        """A file the mirror's own Minecraft directory already has for this URL."""
+        if not self.minecraft_dir:
+            return None
+        parts = urllib.parse.urlsplit(url)
+        if parts.netloc == ASSET_HOST and digest:
+            path = os.path.join(self.minecraft_dir, "assets", "objects", digest[:2], digest)
+        elif parts.netloc == LIBRARY_HOST and ".." not in parts.path:
+            path = os.path.join(self.minecraft_dir, "libraries", *parts.path.lstrip("/").split("/"))
+        else:
+            return None
+        return path if os.path.isfile(path) else None
+
+    def _fetch(self, url, digest):
+        tmp = os.path.join(self.cache.objects_dir, f"fetch.{os.getpid()}.{threading.get_ident()}.tmp")
+        h = hashlib.sha1()
+        request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+        try:
+            with urllib.request.urlopen(request, timeout=UPSTREAM_TIMEOUT) as response, open(tmp, "wb") as f:
+                for chunk in iter(lambda: response.read(COPY_CHUNK), b""):
+                    h.update(chunk)
+                    f.write(chunk)
+                    self._count("upstream_bytes", len(chunk))
+        except OSError as e:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            if isinstance(e, urllib.error.HTTPError):
+                raise MirrorError(e.code, f"Upstream answered {e.code} for {url}")
+            raise MirrorError(502, f"Upstream fetch of {url} failed: {e}")
+        actual = h.hexdigest()
+        if digest and actual != digest:
+            os.remove(tmp)
+            raise MirrorError(502, f"Checksum mismatch for {url}: expected {digest}, got {actual}")
+        self.cache.add_object(tmp, actual, move=True)
+        self._count("misses")
+        with self._lock:
+            self._urls[url] = (actual, time.time())
+            self._db.execute("INSERT OR REPLACE INTO urls VALUES (?, ?, ?)", (url, actual, time.time()))
+            self._db.commit()
+        return self.cache.object_path(actual)
+
+    def close(self):
+        self._db.close()
+
+
+# ----------------------------------------
+# HTTP Server
+# ----------------------------------------
+
+class _MirrorHandler(http.server.BaseHTTPRequestHandler):
+    """
+    GET/HEAD /objects/<sha1>   a file from the content-addressed store
+    GET/HEAD /fetch?url=<url>  an upstream file, fetched and cached on first use
+    GET /status                counters as JSON
+    File responses support single byte ranges, so clients can resume.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server_version = USER_AGENT
+
+    def do_GET(self):
+        self._serve(head=False)
+
+    def do_HEAD(self):
+        self._serve(head=True)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _serve(self, head):
+        mirror = self.server.mirror
+        parts = urllib.parse.urlsplit(self.path)
+        try:
+            if parts.path == "/status":
+                return self._send_json(mirror.status(), head)
+            if parts.path.startswith("/objects/"):
+                name = None
+                path = mirror.store.object_file(parts.path[len("/objects/"):])
+            elif parts.path == "/fetch":
+                query = urllib.parse.parse_qs(parts.query)
+                name = query.get("url", [None])[0]
+                path = mirror.store.resolve(name, query.get("sha1", [None])[0])
+            else:
+                raise MirrorError(404, "Unknown path")
+        except MirrorError as e:
+            return self._send_error(e.status, str(e), head)
+        self._send_file(path, head, mimetypes.guess_type(name)[0] if name else None)
+
+    def _send_error(self, status, message, head):
+        body = message.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def _send_json(self, data, head):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def _send_file(self, path, head, content_type):
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            try:
+                byte_range = parse_range(self.headers.get("Range"), size)
+            except ValueError:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            start, end = byte_range or (0, size - 1)
+            length = end - start + 1
+            self.send_response(206 if byte_range else 200)
+            self.send_header("Content-Type", content_type or "application/octet-stream")
+            self.send_header("Content-Length", str(length))
+            self.send_header("Accept-Ranges", "bytes")
+            if byte_range:
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            self.end_headers()
+            if head or length <= 0:
+                return
+            # Zero-copy from the page cache to the socket
+            self.connection.sendfile(f, start, length)
+            self.server.mirror.count_served(length)
+
+
+class _MirrorHTTPServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class MirrorServer:
+    """
+    Serves this launcher's content-addressed store to the other launchers on
+    the LAN, and answers their UDP discovery broadcasts. Clients point
+    their downloads at /fetch, so the mirror pulls each file from Mojang or
+    the loader mavens once and every other machine gets it at LAN speed.
+    """
+
+    def __init__(self, cache=None, minecraft_dir=None, port=MIRROR_PORT, discovery_port=DISCOVERY_PORT,
+                 allowed_hosts=MIRRORED_HOSTS, name=None, verbose=False):
+        self.store = MirrorStore(cache or ModloaderCache(), minecraft_dir, allowed_hosts)
+        self.name = name or socket.gethostname()
+        self.id = uuid.uuid4().hex
+        self.served_bytes = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.httpd = _MirrorHTTPServer(("", port), _MirrorHandler)
+        self.httpd.mirror = self
+        self.httpd.verbose = verbose
+        self.port = self.httpd.server_address[1]
+        self.discovery = None
+        if discovery_port is not None:
+            try:
+                self.discovery = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                self.discovery.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                self.discovery.bind(("", discovery_port))
+            except OSError as e:
+                print(f"LAN mirror discovery disabled, could not bind UDP port {discovery_port}: {e}")
+                self.discovery.close()
+                self.discovery = None
+        self.discovery_port = self.discovery.getsockname()[1] if self.discovery else None
+        self._threads = []
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def count_served(self, n):
+        with self._lock:
+            self.served_bytes += n
+            self.requests += 1
+
+    def status(self):
+        return {"name": self.name, "port": self.port, "served_bytes": self.served_bytes,
+                "served_files": self.requests, **self.store.stats}
+
+    def start(self):
+        self._threads = [threading.Thread(target=self.httpd.serve_forever, name="MirrorHTTP", daemon=True)]
+        if self.discovery:
+            self._threads.append(threading.Thread(target=self._answer_discovery, name="MirrorDiscovery", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def serve_forever(self):
+        self.start()
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def _answer_discovery(self):
+        reply = json.dumps({"service": "pylauncher-mirror", "id": self.id, "name": self.name,
+                            "port": self.port}).encode("utf-8")
+        while True:
+            try:
+                data, addr = self.discovery.recvfrom(512)
+            except OSError:
+                return  # Socket closed by stop()
+            if data.strip() == DISCOVERY_QUERY:
+                try:
+                    self.discovery.sendto(reply, addr)
+                except OSError:
+                    pass
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.discovery:
+            self.discovery.close()
+        self.store.close()
+
+
+# ----------------------------------------
+# Discovery
+# ----------------------------------------
+
+def discover(timeout=DISCOVERY_TIMEOUT, port=DISCOVERY_PORT):
+    """Broadcasts a discovery query and returns the mirror URLs that answered, fastest first."""
+    found, seen = [], set()
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        for target in ("<broadcast>", "127.0.0.1"):
+            try:
+                sock.sendto(DISCOVERY_QUERY, (target, port))
+            except OSError:
+                pass  # No broadcast route (or no loopback); the other target may still work
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            sock.settimeout(remaining)
+            try:
+                data, addr = sock.recvfrom(512)
+                reply = json.loads(data)
+            except socket.timeout:
+                break
+            except (OSError, ValueError):
+                continue
+            if reply.get("service") != "pylauncher-mirror" or reply.get("id") in seen:
+                continue
+            seen.add(reply.get("id"))
+            found.append(f"http://{addr[0]}:{int(reply['port'])}")
+    return found
+
+
+# ----------------------------------------
+# Client
+# ----------------------------------------
+
+_original_send = requests.Session.send
+_active_client = None
+
+
+def _send_via_mirror(session, request, **kwargs):
+    client = _active_client
+    if client is not None and request.method in ("GET", "HEAD"):
+        target = client.rewrite(request.url)
+        if target:
+            response = client.try_mirror(session, request, target, kwargs)
+            if response is not None:
+                return response
+    return _original_send(session, request, **kwargs)
+
+
+class MirrorClient:
+    """
+    Sends this process's downloads for MIRRORED_HOSTS through a LAN mirror,
+    with the real upstream as the fallback.
+
+    minecraft_launcher_lib imports its download helpers by name into every
+    module, so the hook sits one level lower, on requests.Session.send,
+    which every lib download goes through. Anything but a 200/206 from the
+    mirror (or no answer at all) sends that request upstream instead; after
+    FAILURE_LIMIT failures in a row the mirror is skipped for FAILURE_COOLDOWN
+    seconds.
+
+    With `verify`, the mirror is not trusted (it was found by an
+    unauthenticated broadcast): only hash-named downloads go through it, and
+    each body is checked against the SHA-1 in its URL before the caller sees
+    it. Manifests and other mutable documents always come from upstream.
+    """
+
+    def __init__(self, url, hosts=MIRRORED_HOSTS, verify=False):
+        self.url = url.rstrip("/")
+        self.hosts = set(hosts)
+        self.verify = verify
+        self.stats = {"mirror": 0, "fallback": 0}
+        self.failures = 0
+        self.disabled_until = 0.0
+        self._lock = threading.Lock()  # The lib downloads on a thread pool
+
+    def rewrite(self, url):
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ("http", "https") or parts.netloc not in self.hosts:
+            return None
+        if self.verify and url_digest(url) is None:
+            return None
+        return f"{self.url}/fetch?url={urllib.parse.quote(url, safe='')}"
+
+    def try_mirror(self, session, request, target, kwargs):
+        if self.verify and request.method != "GET":
+            return None
+        with self._lock:
+            if time.monotonic() < self.disabled_until:
+                self.stats["fallback"] += 1
+                return None
+        mirrored = request.copy()
+        mirrored.url = target
+        options = dict(kwargs, timeout=(MIRROR_CONNECT_TIMEOUT, UPSTREAM_TIMEOUT))
+        try:
+            response = _original_send(session, mirrored, **options)
+            ok = response.status_code in ((200,) if self.verify else (200, 206))
+            if ok and self.verify:
+                # Reads the body now; requests serves it from memory to the caller's iter_content()
+                ok = hashlib.sha1(response.content).hexdigest() == url_digest(request.url)
+        except requests.RequestException:
+            response, ok = None, False
+        with self._lock:
+            if ok:
+                self.failures = 0
+                self.stats["mirror"] += 1
+                return response
+            self.failures += 1
+            self.stats["fallback"] += 1
+            if self.failures >= FAILURE_LIMIT:
+                self.disabled_until = time.monotonic() + FAILURE_COOLDOWN
+        if response is not None:
+            response.close()
+        return None
+
+    def install(self):
+        """Routes every requests.Session in this process through this mirror."""
+        global _active_client
+        _active_client = self
+        requests.Session.send = _send_via_mirror
+        return self
+
+    def uninstall(self):
+        global _active_client
+        if _active_client is self:
+            _active_client = None
+            requests.Session.send = _original_send
+
+    def summary(self):
+        with self._lock:
+            return {"url": self.url, "verify": self.verify, **self.stats}
+
+
+def use_mirror(setting, timeout=DISCOVERY_TIMEOUT):
+    """
+    Applies the "mirror" launcher setting: "" turns it off, "auto" uses the
+    first mirror that answers discovery (for verifiable downloads only),
+    anything else is the URL of a mirror trusted with every download.
+    Returns the installed MirrorClient, or None.
+    """
+    if _active_client is not None:
+        _active_client.uninstall()
+    if not setting:
+        return None
+    if setting == "auto":
+        found = discover(timeout)
+        return MirrorClient(found[0], verify=True).install() if found else None
+    if "://" not in setting:
+        setting = "http://" + setting
+    return MirrorClient(setting).install()
+
+
+# ----------------------------------------
+# Self Test
+# ----------------------------------------
+
+def self_test():
+    """Runs a mirror in front of a local stand-in upstream and checks caching, ranges, discovery and fallback."""
+    payload = os.urandom(300 * 1024)
+    digest = hashlib.sha1(payload).hexdigest()
+    files = {
+        f"/v1/objects/{digest}/client.jar": payload,
+        "/net/example/lib/1.0/lib-1.0.jar": b"library" * 1000,
+        "/mc/game/version_manifest_v2.json": b'{"latest": {"release": "1.20.1"}}',
+        f"/v1/objects/{'0' * 40}/corrupt.jar": b"not what the name says",
+    }
+    upstream_hits = {}
+
+    class Upstream(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            upstream_hits[self.path] = upstream_hits.get(self.path, 0) + 1
+            body = files.get(self.path)
+            if body is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    upstream = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Upstream)
+    threading.Thread(target=upstream.serve_forever, daemon=True).start()
+    host = f"127.0.0.1:{upstream.server_address[1]}"
+    urls = {path: f"http://{host}{path}" for path in files}
+
+    with tempfile.TemporaryDirectory(prefix="lan-mirror-test-") as root:
+        server = MirrorServer(ModloaderCache(os.path.join(root, "cache")), port=0, discovery_port=0,
+                              allowed_hosts=(host,)).start()
+        try:
+            found = discover(timeout=0.5, port=server.discovery_port)
+            assert found and found[0].endswith(f":{server.port}"), found
+            client = MirrorClient(found[0], hosts=(host,)).install()
+
+            # Every good file arrives intact through the mirror, and the upstream is asked only once
+            for _ in range(2):
+                for path in list(files)[:3]:
+                    assert requests.get(urls[path], timeout=5).content == files[path], path
+            assert all(upstream_hits[path] == 1 for path in list(files)[:3]), upstream_hits
+            assert client.stats == {"mirror": 6, "fallback": 0}, client.stats
+            assert sha1_file(server.store.object_file(digest)) == digest
+
+            # Concurrent first requests share a single upstream fetch
+            files["/big.jar"] = os.urandom(1024 * 1024)
+            urls["/big.jar"] = f"http://{host}/big.jar"
+            results = []
+            threads = [threading.Thread(target=lambda: results.append(requests.get(urls["/big.jar"]).content))
+                       for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert upstream_hits["/big.jar"] == 1 and all(r == files["/big.jar"] for r in results)
+
+            # A discovered (untrusted) mirror only gets hash-named files, and each is checked against its name
+            client.uninstall()
+            untrusted = MirrorClient(found[0], hosts=(host,), verify=True).install()
+            manifest = "/mc/game/version_manifest_v2.json"
+            assert requests.get(urls[manifest]).content == files[manifest] and upstream_hits[manifest] == 2
+            jar = f"/v1/objects/{digest}/client.jar"
+            assert requests.get(urls[jar]).content == payload and untrusted.stats == {"mirror": 1, "fallback": 0}
+            tampered = server.store.object_file(digest)
+            os.chmod(tampered, 0o644)
+            with open(tampered, "r+b") as f:
+                f.write(b"evil")
+            assert requests.get(urls[jar]).content == payload and untrusted.stats["fallback"] == 1
+            assert upstream_hits[jar] == 2
+            untrusted.uninstall()
+            client.install()
+
+            # Byte ranges
+            object_url = f"{server.url}/objects/{digest}"
+            r = requests.get(object_url, headers={"Range": "bytes=1000-1999"})
+            assert r.status_code == 206 and r.content == payload[1000:2000], r.status_code
+            assert r.headers["Content-Range"] == f"bytes 1000-1999/{len(payload)}"
+            r = requests.get(object_url, headers={"Range": "bytes=-10"})
+            assert r.status_code == 206 and r.content == payload[-10:]
+            r = requests.get(object_url, headers={"Range": f"bytes={len(payload)}-"})
+            assert r.status_code == 416 and r.headers["Content-Range"] == f"bytes */{len(payload)}"
+            assert requests.head(object_url).headers["Accept-Ranges"] == "bytes"
+            assert requests.get(f"{server.url}/fetch", params={"url": "http://example.com/x"}).status_code == 403
+
+            # A corrupt upstream file is refused by the mirror; the client falls back to the upstream itself
+            corrupt = f"/v1/objects/{'0' * 40}/corrupt.jar"
+            assert requests.get(urls[corrupt]).content == files[corrupt]
+            assert client.stats["fallback"] == 1 and upstream_hits[corrupt] == 2
+
+            # So is anything else that isn't a 200 from the mirror, e.g. a 404
+            r = requests.get(f"http://{host}/missing.jar")
+            assert r.status_code == 404 and upstream_hits["/missing.jar"] == 2 and client.stats["fallback"] == 2
+        finally:
+            server.stop()
+
+        # With the mirror gone, downloads still work
+        path = "/net/example/lib/1.0/lib-1.0.jar"
+        assert requests.get(urls[path], timeout=5).content == files[path]
+        assert client.stats["fallback"] == 3
+        client.uninstall()
+        assert requests.Session.send is _original_send
+    upstream.shutdown()
+    upstream.server_close()
+    print("lan_mirror self-test passed")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Share downloads between launchers on the LAN.")
+    parser.add_argument("--self-test", action="store_true", help="Check the mirror against a local upstream")
+    parser.add_argument("--discover", action="store_true", help="List mirrors on the LAN")
+    parser.add_argument("--serve", action="store_true", help="Run a mirror in the foreground")
+    parser.add_argument("--port", type=int, default=MIRROR_PORT)
+    args = parser.parse_args()
+    if args.self_test:
+        self_test()
+    elif args.discover:
+        print("\n".join(discover()) or "No mirrors found")
+    elif args.serve:
+        server = MirrorServer(port=args.port, verbose=True)
+        print(f"LAN mirror serving {server.store.cache.cache_dir} on port {server.port}")
+        server.serve_forever()
+    else:
+        parser.print_help()
@@ -0,0 +1,186 @@
+import os
+import re
+import time
+import sqlite3
+import threading
+from cds_archive import LOADED_PATTERNS, java_version
+
+# ----------------------------------------
+# Constants
+# ----------------------------------------
+TELEMETRY_FILE = "launcher_telemetry.sqlite"
+
+# Phases in launch order; times are milliseconds since launch_minecraft was called
+COMMAND_RESOLVED = "command_resolved"
+JVM_SPAWNED = "jvm_spawned"
+FIRST_OUTPUT = "first_output"
+SETTING_USER = "setting_user"
+RESOURCES_LOADED = "resources_loaded"
+WORLD_JOINED = "world_joined"
+PHASES = (COMMAND_RESOLVED, JVM_SPAWNED, FIRST_OUTPUT, SETTING_USER, RESOURCES_LOADED, WORLD_JOINED)
+
+# Phases detected from the game's log output
+OUTPUT_PATTERNS = [
+    (SETTING_USER, [re.compile(r"Setting user: ")]),
+    (RESOURCES_LOADED, LOADED_PATTERNS),
+    (WORLD_JOINED, [
+        re.compile(r"logged in with entity id"),  # Singleplayer (integrated server)
+        re.compile(r"Connecting to \S+, \d+"),     # Multiplayer
+    ]),
+]
+
+
+def jvm_profile(command, cds_mode=None):
+    """Short description of the JVM setup a launch used, e.g. "java17 -Xmx4096M cds=use"."""
+    major, _line = java_version(command[0])
+    heap = next((arg for arg in command if arg.startswith("-Xmx")), "")
+    return " ".join(part for part in (f"java{major or '?'}", heap, f"cds={cds_mode or 'off'}") if part)
+
+
+# ----------------------------------------
+# Timeline
+# ----------------------------------------
+
+class LaunchTimeline:
+    """
+    Timestamps of one launch's startup phases. The launcher marks the phases
+    it controls; the rest are found by feeding it the game's output lines.
+    """
+
+    def __init__(self, version):
+        self.version = version
+        self.profile = ""
+        self.started_at = time.time()
+        self.exit_code = None
+        self.phases = {}
+        self._start = time.perf_counter()
+        self._pending = list(OUTPUT_PATTERNS)
+
+    def mark(self, phase):
+        if phase not in self.phases:
+            self.phases[phase] = (time.perf_counter() - self._start) * 1000
+
+    def feed(self, line):
+        """Checks one line of game output for phase markers."""
+        if FIRST_OUTPUT not in self.phases:
+            self.mark(FIRST_OUTPUT)
+        if not self._pending:
+            return
+        for entry in self._pending:
+            phase, patterns = entry
+            if any(p.search(line) for p in patterns):
+                self.mark(phase)
+                self._pending.remove(entry)
+                break
+
+    def describe(self):
+        return ", ".join(f"{phase} {self.phases[phase] / 1000:.2f}s" for phase in PHASES if phase in self.phases)
+
+
+# ----------------------------------------
+# History
+# ----------------------------------------
+
+class TelemetryStore:
+    """Launch timelines in a local SQLite history, with per-version / per-JVM-profile trends."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS launches ("
+            " id INTEGER PRIMARY KEY, started_at REAL, version TEXT, profile TEXT, exit_code INTEGER)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS phases ("
+            " launch_id INTEGER, phase TEXT, ms REAL, PRIMARY KEY (launch_id, phase))"
+        )
+        self._db.commit()
+
+    def record(self, timeline):
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO launches (started_at, version, profile, exit_code) VALUES (?, ?, ?, ?)",
+                (timeline.started_at, timeline.version, timeline.profile, timeline.exit_code)
+            )
+            self._db.executemany(
+                "INSERT INTO phases VALUES (?, ?, ?)",
+                [(cursor.lastrowid, phase, ms) for phase, ms in timeline.phases.items()]
+            )
+            self._db.commit()
+            return cursor.lastrowid
+
+    def history(self, version=None, limit=20):
+        """Most recent launches first, each as a dict with a phases mapping."""
+        query = "SELECT id, started_at, version, profile, exit_code FROM launches"
+        params = []
+        if version:
+            query += " WHERE version = ?"
+            params.append(version)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+            launches = []
+            for launch_id, started_at, v, profile, exit_code in rows:
+                phases = dict(self._db.execute("SELECT phase, ms FROM phases WHERE launch_id = ?", (launch_id,)))
+                launches.append({"id": launch_id, "started_at": started_at, "version": v,
+                                 "profile": profile, "exit_code": exit_code, "phases": phases})
+        return launches
+
+    def trends(self, version=None):
+        """Median ms per phase for every (version, JVM profile) pair, with launch counts."""
+        query = "SELECT l.version, l.profile, p.phase, p.ms FROM launches l JOIN phases p ON p.launch_id = l.id"
+        params = []
+        if version:
+            query += " WHERE l.version = ?"
+            params.append(version)
+        groups = {}
+        with self._lock:
+            counts = dict(
+                ((v, profile), n) for v, profile, n in
+                self._db.execute("SELECT version, profile, COUNT(*) FROM launches GROUP BY version, profile")
+            )
+            for v, profile, phase, ms in self._db.execute(query, params):
+                groups.setdefault((v, profile), {}).setdefault(phase, []).append(ms)
+        result = []
+        for (v, profile), phases in sorted(groups.items()):
+            result.append({
+                "version": v,
+                "profile": profile,
+                "launches": counts.get((v, profile), 0),
+                "median_ms": {phase: round(_median(phases[phase]), 1) for phase in PHASES if phase in phases},
+            })
+        return result
+
+    def deltas(self, tag, version=None):
+        """
+        For every (version, JVM profile) launched both with and without `tag`
+        appended to its profile, the median ms per phase with it minus without.
+        """
+        groups = {(t["version"], t["profile"]): t for t in self.trends(version)}
+        suffix = " " + tag
+        result = []
+        for (v, profile), tagged in sorted(groups.items()):
+            base = groups.get((v, profile[:-len(suffix)])) if profile.endswith(suffix) else None
+            if base is None:
+                continue
+            result.append({
+                "version": v,
+                "profile": base["profile"],
+                "launches": {"without": base["launches"], "with": tagged["launches"]},
+                "delta_ms": {phase: round(tagged["median_ms"][phase] - base["median_ms"][phase], 1)
+                             for phase in PHASES if phase in tagged["median_ms"] and phase in base["median_ms"]},
+            })
+        return result
+
+    def close(self):
+        self._db.close()
+
+
+def _median(values):
+    values = sorted(values)
+    mid = len(values) // 2
+    return values[mid] if len(values) % 2 else (values[mid - 1] + values[mid]) / 2
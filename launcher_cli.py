@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import socket
+import argparse
+import threading
+import socketserver
+import minecraft_launcher_lib
+from launcher_core import LauncherCore
+from install_queue import PRIORITY_BATCH, PRIORITY_NORMAL, DONE
+from modpack import lock_pack, install_pack
+from instances import InstanceManager
+from world_regions import RegionTool, list_worlds, TICKS_PER_SECOND
+from server_ping import PING_TIMEOUT
+from page_cache import PREWARM_TAG
+from lan_mirror import MirrorServer, discover, MIRROR_PORT, DISCOVERY_TIMEOUT
+
+# ----------------------------------------
+# Constants
+# ----------------------------------------
+SOCKET_NAME = "launcher_daemon.sock"
+
+
+# ----------------------------------------
+# Command Handling (shared by the CLI and the daemon)
+# ----------------------------------------
+
+def handle_request(core, request):
+    """Runs one request dict against a LauncherCore and returns a JSON-serialisable result."""
+    command = request.get("command")
+
+    if command == "list":
+        if request.get("available"):
+            versions = core.available_versions(types=request.get("types") or None)
+        else:
+            versions = core.installed_versions(types=request.get("types") or None)
+        return [{"id": v["id"], "type": v["type"]} for v in versions]
+
+    if command == "install":
+        modloader = request.get("modloader", "Vanilla")
+        # Batches (e.g. an overnight test matrix) yield to interactive installs and launches
+        priority = PRIORITY_BATCH if len(request["versions"]) > 1 else PRIORITY_NORMAL
+        jobs = [core.install(version, modloader, priority=priority) for version in request["versions"]]
+        if not request.get("wait", True):
+            return [{"version": j.version, "modloader": j.modloader, "state": j.state} for j in jobs]
+        for job in jobs:
+            job.wait()
+        return [
+            {"version": j.version, "modloader": j.modloader, "state": j.state,
+             "error": str(j.error) if j.error else None}
+            for j in jobs
+        ]
+
+    if command == "verify":
+        return core.verify(request.get("versions"), repair=request.get("repair", False)).summary()
+
+    if command == "launch":
+        pid, log_path = core.launch_detached(request["version"], request.get("username"), request.get("server"))
+        return {"pid": pid, "log": log_path}
+
+    if command == "cds":
+        if request.get("action") == "train":
+            return core.train_cds(request["version"], request.get("username"))
+        if request.get("action") == "clear":
+            archives = core.cds_archives.archives()
+            for archive in archives:
+                core.cds_archives.remove(archive["key"])
+            return {"removed": len(archives)}
+        return core.cds_archives.archives()
+
+    if command == "pack":
+        pack_path = request["pack"]
+        if request.get("action") == "lock":
+            lock = lock_pack(pack_path, update=request.get("update", False), store=core.modloader_cache)
+        else:
+            lock = install_pack(pack_path, request.get("instance") or core.minecraft_dir,
+                                update=request.get("update", False), install_loader=request.get("loader", True),
+                                store=core.modloader_cache)
+            core.version_index.reconcile()
+        return {"name": lock["name"], "minecraft": lock["minecraft"], "loader": lock["loader"],
+                "mods": {m["name"]: m["version"] for m in lock["mods"]}}
+
+    if command == "instance":
+        manager = InstanceManager(core.modloader_cache)
+        instance, action = request.get("instance") or core.minecraft_dir, request["action"]
+        if action == "snapshot":
+            return {"snapshot": manager.snapshot(instance, request.get("name"))}
+        if action == "clone":
+            if request.get("name"):
+                return manager.clone_snapshot(instance, request["name"], request["target"])
+            if request.get("count"):
+                return manager.clone_many(instance, request["target"], request["count"])
+            return manager.clone(instance, request["target"])
+        if action == "diff":
+            return manager.diff(instance, request["name"], request.get("against"))
+        if action == "rollback":
+            return manager.rollback(instance, request["name"])
+        return manager.snapshots(instance)
+
+    if command == "world":
+        minecraft_dir = request.get("instance") or core.minecraft_dir
+        if request["action"] == "list":
+            return [os.path.basename(w) for w in list_worlds(minecraft_dir)]
+        world = request["world"]
+        if not os.path.isdir(world):
+            world = os.path.join(minecraft_dir, "saves", world)
+        min_inhabited = int(request.get("min_inhabited", 60) * TICKS_PER_SECOND)
+        tool = RegionTool(world)
+        if request["action"] == "analyze":
+            return tool.analyze(min_inhabited, chunks=request.get("chunks", False))
+        return tool.compact(min_inhabited if request.get("prune") else None, dry_run=request.get("dry_run", False))
+
+    if command == "servers":
+        servers, action = core.server_list, request["action"]
+        if action == "add":
+            servers.add(request["name"], request["address"])
+        elif action == "remove":
+            servers.remove(request["name"])
+        elif action == "ping":
+            results = servers.refresh(request.get("timeout") or PING_TIMEOUT)
+            return {name: result.to_dict() for name, result in results.items()}
+        elif action == "best":
+            return {"best": core.best_server(refresh=not request.get("cached"))}
+        return {name: servers.stats(name) for name in servers.servers}
+
+    if command == "mirror":
+        if request["action"] == "discover":
+            return discover(request.get("timeout") or DISCOVERY_TIMEOUT)
+        return core.mirror.summary() if core.mirror else {"url": None}
+
+    if command == "telemetry":
+        if request.get("prewarm_deltas"):
+            return core.telemetry.deltas(PREWARM_TAG, request.get("version"))
+        if request.get("history"):
+            return core.telemetry.history(request.get("version"), limit=request["history"])
+        return core.telemetry.trends(request.get("version"))
+
+    if command == "prewarm":
+        result = {"manifest": core.prewarm(), "installed": len(core.installed_versions())}
+        if request.get("version"):
+            result["page_cache"] = core.prewarm_version(request["version"]).result()
+        return result
+
+    if command == "settings":
+        key, value = request.get("key"), request.get("value")
+        if key is None:
+            return core.settings
+        if value is not None:
+            # Values are given as JSON where possible so numbers stay numbers
+            try:
+                value = json.loads(value)
+            except ValueError:
+                pass
+            core.settings_store.update({key: value})
+            if key == "mirror":
+                core.configure_mirror()
+        return {key: core.settings.get(key)}
+
+    raise ValueError(f"Unknown command: {command}")
+
+
+# ----------------------------------------
+# Daemon
+# ----------------------------------------
+
+class _DaemonHandler(socketserver.StreamRequestHandler):
+    """One JSON request line in, one JSON response line out."""
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        stopping = False
+        try:
+            request = json.loads(line)
+            if request.get("command") == "stop":
+                stopping = True
+                response = {"ok": True, "result": "stopping"}
+            else:
+                response = {"ok": True, "result": handle_request(self.server.core, request)}
+        except Exception as e:
+            response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+        self.wfile.flush()
+        if stopping:
+            # shutdown() blocks until serve_forever() returns, so it can't run on a handler thread
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+
+class LauncherDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Long-running launcher process behind a Unix socket. It keeps one
+    LauncherCore alive, so the version index watcher, the in-memory version
+    manifest, minecraft_launcher_lib's response caches and warm HTTP
+    connections survive between scripted commands.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, core):
+        self.core = core
+        self.socket_path = socket_path
+        if os.path.exists(socket_path):
+            if _daemon_alive(socket_path):
+                raise RuntimeError(f"A launcher daemon is already listening on {socket_path}")
+            os.remove(socket_path)  # Stale socket from a daemon that died
+        super().__init__(socket_path, _DaemonHandler)
+        os.chmod(socket_path, 0o600)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.remove(self.socket_path)
+        except OSError:
+            pass
+
+
+def _daemon_alive(socket_path):
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.connect(socket_path)
+        return True
+    except OSError:
+        return False
+
+
+def send_to_daemon(socket_path, request):
+    """Sends a request to a running daemon. Returns the response dict, or None if no daemon is running."""
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.connect(socket_path)
+            s.sendall((json.dumps(request) + "\n").encode("utf-8"))
+            with s.makefile("r", encoding="utf-8") as f:
+                line = f.readline()
+    except (ConnectionRefusedError, FileNotFoundError):
+        return None
+    return json.loads(line)
+
+
+# ----------------------------------------
+# Command Line
+# ----------------------------------------
+
+def exit_status(request, result):
+    """1 if the command ran but didn't do its job: install jobs that didn't finish, files verify left broken."""
+    if request["command"] == "install" and request.get("wait", True) and any(r["state"] != DONE for r in result):
+        return 1
+    if request["command"] == "verify" and (result["unrepaired"] or (result["failed"] and not request.get("repair"))):
+        return 1
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Headless Minecraft launcher.")
+    parser.add_argument("--minecraft-dir", help="Minecraft directory (default: the standard one)")
+    parser.add_argument("--socket", help="Daemon socket path (default: <minecraft-dir>/" + SOCKET_NAME + ")")
+    parser.add_argument("--no-daemon", action="store_true", help="Run in-process even if a daemon is running")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("list", help="List installed (or available) versions")
+    p.add_argument("--available", action="store_true", help="List versions from Mojang instead")
+    p.add_argument("--type", dest="types", action="append", help="Only this version type (repeatable)")
+
+    p = sub.add_parser("install", help="Install one or more versions")
+    p.add_argument("versions", nargs="+")
+    p.add_argument("--modloader", default="Vanilla", choices=["Vanilla", "Forge", "Fabric"])
+    p.add_argument("--no-wait", dest="wait", action="store_false", help="Queue and return (daemon only)")
+
+    p = sub.add_parser("verify", help="Check installed files against their manifests")
+    p.add_argument("versions", nargs="*", help="Versions to check (default: all installed)")
+    p.add_argument("--repair", action="store_true", help="Re-download files that are missing or corrupt")
+
+    p = sub.add_parser("launch", help="Launch a version")
+    p.add_argument("version")
+    p.add_argument("--username")
+    p.add_argument("--server", help="host[:port], or best for the saved server with the lowest ping")
+
+    p = sub.add_parser("cds", help="Manage Class Data Sharing archives (faster JVM startup)")
+    p.add_argument("action", choices=["list", "train", "clear"])
+    p.add_argument("version", nargs="?", help="Version to record an archive for (train)")
+    p.add_argument("--username")
+
+    p = sub.add_parser("pack", help="Resolve (lock) or install a mod pack")
+    p.add_argument("action", choices=["lock", "install"])
+    p.add_argument("pack", help="Pack manifest (JSON)")
+    p.add_argument("--instance", help="Install into this directory instead of the Minecraft directory")
+    p.add_argument("--update", action="store_true", help="Re-resolve even if the lockfile is current")
+    p.add_argument("--no-loader", dest="loader", action="store_false", help="Only install the mods")
+
+    p = sub.add_parser("instance", help="Snapshot, clone, diff or roll back an instance directory")
+    p.add_argument("action", choices=["list", "snapshot", "clone", "diff", "rollback"])
+    p.add_argument("target", nargs="?", help="New directory (clone), or a prefix with --count")
+    p.add_argument("--instance", help="Instance directory (default: the Minecraft directory)")
+    p.add_argument("--name", help="Snapshot to create, compare, restore or clone from")
+    p.add_argument("--against", help="diff: compare with this snapshot instead of the live instance")
+    p.add_argument("--count", type=int, help="clone: make this many copies named <target>-1..N")
+
+    p = sub.add_parser("world", help="Analyze or compact a world's region files")
+    p.add_argument("action", choices=["list", "analyze", "compact"])
+    p.add_argument("world", nargs="?", help="World name under saves/, or a world directory")
+    p.add_argument("--instance", help="Minecraft directory holding saves/ (default: the Minecraft directory)")
+    p.add_argument("--min-inhabited", type=float, default=60, metavar="SECONDS",
+                   help="Chunks players spent less time near count as stale (default: 60)")
+    p.add_argument("--prune", action="store_true", help="compact: also delete stale chunks")
+    p.add_argument("--dry-run", action="store_true", help="compact: only report the sizes")
+    p.add_argument("--chunks", action="store_true", help="analyze: include every chunk")
+
+    p = sub.add_parser("servers", help="Saved servers: add, remove, ping them all, or pick the fastest")
+    p.add_argument("action", choices=["list", "add", "remove", "ping", "best"])
+    p.add_argument("name", nargs="?")
+    p.add_argument("address", nargs="?", help="add: host[:port]")
+    p.add_argument("--timeout", type=float, help="ping: seconds per server (default: %s)" % PING_TIMEOUT)
+    p.add_argument("--cached", action="store_true", help="best: use the recorded history instead of pinging")
+
+    p = sub.add_parser("mirror", help="Share downloads on the LAN: serve this launcher's cache, or find a mirror")
+    p.add_argument("action", choices=["serve", "discover", "status"])
+    p.add_argument("--port", type=int, default=MIRROR_PORT, help="serve: HTTP port (default: %s)" % MIRROR_PORT)
+    p.add_argument("--timeout", type=float, help="discover: seconds to wait for replies (default: %s)" % DISCOVERY_TIMEOUT)
+
+    p = sub.add_parser("telemetry", help="Show launch startup timings per version and JVM profile")
+    p.add_argument("--version", help="Only this version")
+    p.add_argument("--history", type=int, metavar="N", help="Show the last N launches instead of trends")
+    p.add_argument("--prewarm-deltas", action="store_true",
+                   help="Median ms per phase of page-cache prewarmed launches minus cold ones")
+
+    p = sub.add_parser("prewarm", help="Load the version index and manifest ahead of a launch")
+    p.add_argument("--version", help="Also pull this version's jars, libraries and assets into the page cache")
+
+    p = sub.add_parser("settings", help="Show or change launcher settings")
+    p.add_argument("key", nargs="?")
+    p.add_argument("value", nargs="?")
+
+    sub.add_parser("daemon", help="Run the launcher daemon in the foreground")
+    sub.add_parser("stop", help="Stop a running daemon")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "cds" and args.action == "train" and not args.version:
+        parser.error("cds train needs a version")
+    if args.command == "instance" and args.action == "clone" and not args.target:
+        parser.error("instance clone needs a target directory")
+    if args.command == "instance" and args.action in ("diff", "rollback") and not args.name:
+        parser.error(f"instance {args.action} needs --name")
+    if args.command == "servers" and args.action in ("add", "remove") and not args.name:
+        parser.error(f"servers {args.action} needs a name")
+    if args.command == "servers" and args.action == "add" and not args.address:
+        parser.error("servers add needs an address")
+    if args.command == "world" and args.action != "list" and not args.world:
+        parser.error(f"world {args.action} needs a world")
+    request = {k: v for k, v in vars(args).items() if k not in ("minecraft_dir", "socket", "no_daemon")}
+    if args.command == "install":
+        request["wait"] = args.wait  # The daemon queues and returns unless told to wait
+    if request.get("world") and os.path.isdir(request["world"]):
+        request["world"] = os.path.abspath(request["world"])
+    for key in ("pack", "instance", "target"):
+        if request.get(key):
+            request[key] = os.path.abspath(request[key])  # The daemon runs in a different directory
+
+    minecraft_dir = args.minecraft_dir
+    if minecraft_dir is None:
+        minecraft_dir = minecraft_launcher_lib.utils.get_minecraft_directory()
+    socket_path = args.socket or os.path.join(minecraft_dir, SOCKET_NAME)
+
+    if args.command == "mirror" and args.action == "serve":
+        # Serves the per-user object store the installs share; files this instance already has seed it
+        server = MirrorServer(minecraft_dir=minecraft_dir, port=args.port)
+        print(f"LAN mirror listening on port {server.port}")
+        server.serve_forever()
+        return 0
+
+    if args.command == "daemon":
+        core = LauncherCore(minecraft_dir)
+        core.prewarm()
+        server = LauncherDaemon(socket_path, core)
+        print(f"Launcher daemon listening on {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            core.close()
+        return 0
+
+    if not args.no_daemon:
+        response = send_to_daemon(socket_path, request)
+        if response is not None:
+            if not response["ok"]:
+                print(response["error"], file=sys.stderr)
+                return 1
+            print(json.dumps(response["result"], indent=2))
+            return exit_status(request, response["result"])
+    if args.command == "stop":
+        print("No launcher daemon is running.", file=sys.stderr)
+        return 1
+
+    # No daemon: do the work in this process (an install has to finish before we exit)
+    core = LauncherCore(minecraft_dir)
+    request["wait"] = True
+    try:
+        core.version_index.reconcile()
+        result = handle_request(core, request)
+    except Exception as e:
+        print(f"{type(e).__name__}: {e}", file=sys.stderr)
+        return 1
+    finally:
+        core.close()
+    print(json.dumps(result, indent=2))
+    return exit_status(request, result)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+import os
+import time
+import subprocess
+import threading
+import functools
+import minecraft_launcher_lib
+from launcher_settings import SettingsStore, MINE4K_CONFIG
+from version_index import VersionIndex
+from install_queue import InstallScheduler, install_modloader_version, PRIORITY_NORMAL
+from modloader_cache import ModloaderCache, CACHE_DIR_NAME
+from install_verify import InstallVerifier
+from natives_cache import NativesCache
+from cds_archive import CdsArchives, wait_until_loaded, TRAINING_TIMEOUT
+from version_manifest import shared_manifest
+from server_ping import ServerList, SERVERS_FILE, parse_address
+from lan_mirror import use_mirror
+from page_cache import PageCachePrewarmer, PREWARM_TAG
+from launch_telemetry import (
+    LaunchTimeline, TelemetryStore, TELEMETRY_FILE, COMMAND_RESOLVED, JVM_SPAWNED, jvm_profile
+)
+
+# ----------------------------------------
+# Constants
+# ----------------------------------------
+LAUNCH_LOG_DIR = "launcher_logs"
+LOG_FOLLOW_INTERVAL = 0.2  # Seconds between reads of a detached game's log file
+
+
+def find_java():
+    try:
+        return minecraft_launcher_lib.utils.get_java_executable()
+    except Exception:
+        return "java"  # Fallback to system PATH
+
+
+def default_settings():
+    return {
+        "java_path": find_java(),
+        "ram": 4096,
+        "resolution": "1280x720",
+        "server_ip": "",
+        "last_username": "Player",
+        "auth_method": "offline",
+        "use_cds": True,
+        "mirror": ""  # "" for direct downloads, "auto" to discover a LAN mirror (hash-named files only), or a mirror URL
+    }
+
+
+class LauncherCore:
+    """
+    Everything a launcher does that isn't a widget: settings, the installed
+    version index, the version manifest, the install queue and building and
+    spawning the game command. The Tk launchers, the CLI and the daemon all
+    drive this same object.
+    """
+
+    def __init__(self, minecraft_dir=None, config_name=MINE4K_CONFIG, defaults=None):
+        self.minecraft_dir = minecraft_dir or minecraft_launcher_lib.utils.get_minecraft_directory()
+        os.makedirs(self.minecraft_dir, exist_ok=True)
+
+        self.settings_store = SettingsStore(
+            os.path.join(self.minecraft_dir, config_name),
+            defaults if defaults is not None else default_settings()
+        )
+        self.settings = self.settings_store.load()
+        self.version_index = VersionIndex(self.minecraft_dir)
+        # Loader bundles, mod jars and instance snapshots live with this Minecraft directory
+        self.modloader_cache = ModloaderCache(os.path.join(self.minecraft_dir, CACHE_DIR_NAME))
+        self.install_scheduler = InstallScheduler(
+            self.minecraft_dir, installer=functools.partial(install_modloader_version, cache=self.modloader_cache)
+        )
+        self.natives_cache = NativesCache(self.minecraft_dir)
+        self.cds_archives = CdsArchives(self.minecraft_dir)
+        self.telemetry = TelemetryStore(os.path.join(self.minecraft_dir, TELEMETRY_FILE))
+        self.server_list = ServerList(os.path.join(self.minecraft_dir, SERVERS_FILE))
+        self.page_cache = PageCachePrewarmer(self.minecraft_dir)
+        self.mirror = None
+        if self.settings.get("mirror"):
+            # Discovery waits for replies; downloads go direct until (and unless) a mirror answers
+            threading.Thread(target=self.configure_mirror, name="MirrorDiscovery", daemon=True).start()
+
+    # ---------------- Versions ----------------
+    def start_watching(self):
+        """Starts the background reconcile + watcher of the installed version index."""
+        self.version_index.start()
+
+    def installed_versions(self, types=None):
+        versions = self.version_index.installed_versions()
+        if types:
+            versions = [v for v in versions if v["type"] in types]
+        return versions
+
+    def available_versions(self, types=("release",), refresh=False):
+        """Mojang's version list as shared VersionRecords, cached for MANIFEST_TTL seconds."""
+        return shared_manifest().versions(types, refresh=refresh)
+
+    def prewarm(self):
+        """Loads everything a launch needs ahead of time: index, manifest and the lib's HTTP caches."""
+        self.version_index.reconcile()
+        self.start_watching()
+        try:
+            self.available_versions(refresh=True)
+        except Exception as e:
+            print(f"Could not fetch version manifest: {e}")
+            return False
+        return True
+
+    def prewarm_version(self, version):
+        """Starts pulling `version`'s launch files into the page cache; returns a Future of the report."""
+        return self.page_cache.prewarm(version, self.settings.get("java_path"))
+
+    # ---------------- Servers ----------------
+    def best_server(self, refresh=True):
+        """Pings the saved servers (unless `refresh` is False) and returns the lowest-latency address, or None."""
+        if refresh:
+            self.server_list.refresh()
+        name = self.server_list.best()
+        return self.server_list.servers[name]["address"] if name else None
+
+    # ---------------- LAN Mirror ----------------
+    def configure_mirror(self):
+        """Applies the "mirror" setting; returns the mirror URL downloads now go through, or None."""
+        try:
+            self.mirror = use_mirror(self.settings.get("mirror"))
+        except OSError as e:
+            print(f"Could not set up the LAN mirror: {e}")
+            self.mirror = None
+        return self.mirror.url if self.mirror else None
+
+    # ---------------- Installing ----------------
+    def install(self, version, modloader="Vanilla", callback=None, on_done=None, priority=PRIORITY_NORMAL):
+        """Queues an install; returns the InstallJob. Refreshes the index when it finishes."""
+        def done(job):
+            self.version_index.reconcile()
+            if on_done:
+                on_done(job)
+        return self.install_scheduler.submit(version, modloader, callback=callback, on_done=done, priority=priority)
+
+    def verify(self, versions=None, repair=False, callback=None):
+        """Checks installed files against their manifests (all installed versions by default). Returns a VerifyReport."""
+        if not versions:
+            versions = [v["id"] for v in self.installed_versions()]
+        verifier = InstallVerifier(self.minecraft_dir)
+        try:
+            return verifier.verify(versions, repair=repair, callback=callback)
+        finally:
+            verifier.close()
+
+    # ---------------- Launching ----------------
+    def launch_options(self, username=None, server=None, version=None):
+        """Builds minecraft_launcher_lib launch options from the current settings."""
+        settings = self.settings
+        try:
+            ram = int(settings["ram"])
+        except (TypeError, ValueError):
+            ram = 4096
+        options = {
+            "username": username or settings.get("last_username", "Player"),
+            "jvmArguments": [
+                f"-Xmx{ram}M",
+                f"-Xms{ram // 2}M",
+                f"-Dminecraft.resolution={settings['resolution']}"
+            ],
+        }
+        server = settings.get("server_ip", "") if server is None else server
+        if server == "best":
+            server = self.best_server()
+            if server is None:
+                raise RuntimeError("None of the saved servers answered a ping")
+        if server:
+            # The game takes the port separately; "host:port" as the server would not resolve
+            host, port = parse_address(server)
+            options["server"] = host
+            options["port"] = str(port)
+        if settings.get("java_path"):
+            options["executablePath"] = settings["java_path"]
+        if version:
+            # Shared, pre-extracted natives instead of versions/<id>/natives and LWJGL's per-launch temp copy
+            try:
+                natives_dir = self.natives_cache.prepare(version)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Natives cache unavailable for {version}, using the default directory: {e}")
+                natives_dir = None
+            if natives_dir:
+                options["nativesDirectory"] = natives_dir
+        return options
+
+    def build_command(self, version, username=None, server=None):
+        return minecraft_launcher_lib.command.get_minecraft_command(
+            version, self.minecraft_dir, self.launch_options(username, server, version)
+        )
+
+    def launch(self, version, username=None, server=None, stdout=None, detach=False, on_output=None, on_exit=None):
+        """
+        Spawns the game. By default its output (merged stdout/stderr) is read on a
+        background thread and each line passed to `on_output`; pass a file for
+        `stdout` to log instead. `detach` starts it in its own session so it
+        outlives the launcher (CLI/daemon use). The launch's startup timeline is
+        recorded in the telemetry history and passed to `on_exit` when the game exits.
+        """
+        timeline = LaunchTimeline(version)
+        command = self.build_command(version, username, server)
+        timeline.mark(COMMAND_RESOLVED)
+        if username:
+            self.settings["last_username"] = username
+            self.settings_store.save()
+        process = self._spawn(command, stdout, detach, label=version, timeline=timeline)
+        if stdout is None:
+            threading.Thread(
+                target=self._watch_output, args=(process, timeline, on_output, on_exit),
+                name="GameOutput", daemon=True
+            ).start()
+        return process
+
+    def _watch_output(self, process, timeline, on_output=None, on_exit=None):
+        for line in process.stdout:
+            timeline.feed(line)
+            if on_output:
+                on_output(line.rstrip("\n"))
+        self._finish_timeline(process, timeline, on_exit)
+
+    def _follow_log(self, process, timeline, log_path):
+        """Feeds a detached game's log file to its timeline as it is written."""
+        with open(log_path, "r", errors="replace") as f:
+            partial = ""
+            while True:
+                line = f.readline()
+                if line:
+                    partial += line
+                    if partial.endswith("\n"):
+                        timeline.feed(partial)
+                        partial = ""
+                elif process.poll() is not None:
+                    break
+                else:
+                    time.sleep(LOG_FOLLOW_INTERVAL)
+        self._finish_timeline(process, timeline)
+
+    def _finish_timeline(self, process, timeline, on_exit=None):
+        timeline.exit_code = process.wait()
+        try:
+            self.telemetry.record(timeline)
+        except Exception as e:
+            print(f"Could not record launch telemetry: {e}")
+        if on_exit:
+            on_exit(timeline)
+
+    def _spawn(self, command, stdout, detach, label=None, use_cds=None, timeline=None):
+        mode = None
+        if self.settings.get("use_cds", True) if use_cds is None else use_cds:
+            # Class Data Sharing archive for this java + classpath (recorded on first launch)
+            command, mode = self.cds_archives.apply(command, label=label)
+        if timeline is not None:
+            timeline.profile = jvm_profile(command, mode)
+            if label and self.page_cache.is_warm(label):
+                timeline.profile += " " + PREWARM_TAG
+        process = subprocess.Popen(
+            command,
+            cwd=self.minecraft_dir,
+            stdout=subprocess.PIPE if stdout is None else stdout,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            text=True,
+            start_new_session=detach,
+        )
+        if timeline is not None:
+            timeline.mark(JVM_SPAWNED)
+        if mode == "train":
+            def finished():
+                process.wait()
+                self.cds_archives.training_finished(command)
+            threading.Thread(target=finished, name="CdsTraining", daemon=True).start()
+        return process
+
+    def train_cds(self, version, username=None, timeout=TRAINING_TIMEOUT):
+        """
+        Records a CDS archive for `version` with a scripted start: launches the game,
+        waits until it has finished loading, then shuts it down so the JVM writes the archive.
+        Returns {"archive": path or None, "loaded": bool}.
+        """
+        command = self.build_command(version, username, server="")
+        key = self.cds_archives.key(command)
+        if key is None:
+            return {"archive": None, "loaded": False}
+        self.cds_archives.remove(key)  # Re-record from scratch
+        process = self._spawn(command, None, False, label=version, use_cds=True)
+        loaded = wait_until_loaded(process.stdout, timeout)
+        process.terminate()  # A normal JVM shutdown, which is when the archive is dumped
+        try:
+            process.communicate(timeout=120)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+        path = self.cds_archives.archive_path(key)
+        return {"archive": path if os.path.isfile(path) else None, "loaded": loaded}
+
+    def launch_log_path(self, version):
+        log_dir = os.path.join(self.minecraft_dir, LAUNCH_LOG_DIR)
+        os.makedirs(log_dir, exist_ok=True)
+        return os.path.join(log_dir, f"{version}-{time.strftime('%Y%m%d-%H%M%S')}.log")
+
+    def launch_detached(self, version, username=None, server=None):
+        """Launches the game in its own session with output going to a log file. Returns (pid, log_path)."""
+        timeline = LaunchTimeline(version)
+        command = self.build_command(version, username, server)  # Fails before any log file is created
+        timeline.mark(COMMAND_RESOLVED)
+        log_path = self.launch_log_path(version)
+        with open(log_path, "w") as log_file:
+            process = self._spawn(command, log_file, detach=True, label=version, timeline=timeline)
+        # Only completes if this process outlives the game (the daemon does; a one-shot CLI call doesn't)
+        threading.Thread(target=self._follow_log, args=(process, timeline, log_path), name="GameLog", daemon=True).start()
+        return process.pid, log_path
+
+    def close(self):
+        self.version_index.stop()
+        self.page_cache.shutdown()
+        self.install_scheduler.shutdown(cancel=False)
+        self.settings_store.flush()
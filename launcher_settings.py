@@ -0,0 +1,243 @@
+import os
+import json
+import copy
+import time
+import atexit
+import tempfile
+import threading
+
+# ----------------------------------------
+# Constants
+# ----------------------------------------
+SCHEMA_VERSION = 1
+DEBOUNCE_SECONDS = 0.5  # Coalesce bursts of saves into a single write
+
+# Every config file the launchers have ever written, newest naming first.
+# A store whose own file is missing imports the most recently modified one.
+PYLAUNCHER_CONFIG = "PyLauncher_settings.json"        # client.py / seeklauncherv0.py
+MINE4K_CONFIG = "mineseek4k_config.json"              # mine4k.py
+MINESEEK4K_CONFIG = "mineseek4k_launcher_config.json"  # seeklauncherv0.1
+KNOWN_CONFIG_FILES = [MINESEEK4K_CONFIG, MINE4K_CONFIG, PYLAUNCHER_CONFIG]
+
+
+# ----------------------------------------
+# Utility Functions
+# ----------------------------------------
+
+def atomic_write_json(path, data, indent=4):
+    """
+    Write data as JSON to path without ever leaving a half-written file behind.
+    The JSON goes to a temp file in the same directory, is fsync'd, and then
+    renamed over the target, so readers see either the old or the new file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    # Persist the rename itself (not supported on Windows)
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def _migrate_v0_to_v1(data):
+    """Unversioned files from any launcher -> schema 1 (int RAM, profile list, last_username)."""
+    try:
+        data["ram"] = int(data.get("ram", 4096))
+    except (TypeError, ValueError):
+        data["ram"] = 4096
+
+    # mine4k.py kept a single username/auth pair, seeklauncherv0.1 keeps a profile list.
+    # Schema 1 carries both so any launcher can read a file written by another.
+    profiles = data.get("profiles")
+    if not profiles:
+        data["profiles"] = [{
+            "username": data.get("last_username", "Player"),
+            "auth_method": data.get("auth_method", "offline"),
+            "uuid": "",
+        }]
+        data["active_profile"] = 0
+    active = data.get("active_profile", 0)
+    if not 0 <= active < len(data["profiles"]):
+        active = data["active_profile"] = 0
+    data.setdefault("last_username", data["profiles"][active].get("username", "Player"))
+    data.setdefault("auth_method", data["profiles"][active].get("auth_method", "offline"))
+    return data
+
+
+# Migration steps keyed by the schema version they upgrade *from*
+MIGRATIONS = {
+    0: _migrate_v0_to_v1,
+}
+
+
+def migrate(data):
+    """Upgrade a loaded settings dict to SCHEMA_VERSION, one step at a time."""
+    version = data.get("schema_version", 0)
+    while version < SCHEMA_VERSION:
+        data = MIGRATIONS[version](data)
+        version += 1
+    data["schema_version"] = version
+    return data
+
+
+# ----------------------------------------
+# Settings Store
+# ----------------------------------------
+
+class SettingsStore:
+    """
+    In-memory settings model backed by a JSON file.
+
+    `data` is a plain dict the launcher reads and mutates on the UI thread.
+    `save()` snapshots it and hands the snapshot to a background writer which
+    waits `delay` seconds for further saves before writing the newest snapshot
+    atomically. `flush()` forces the pending write out immediately; it also
+    runs at interpreter exit so a quick close never loses the last change.
+    `on_written(error)` callbacks given to save() run on the writing thread
+    once the write that covers that save has finished (error is None on
+    success), so a UI can report the real outcome.
+    """
+
+    def __init__(self, path, defaults, delay=DEBOUNCE_SECONDS, legacy_files=KNOWN_CONFIG_FILES):
+        self.path = path
+        self.defaults = defaults
+        self.delay = delay
+        self.legacy_files = legacy_files
+        self.data = {}
+
+        self._cond = threading.Condition()
+        self._pending = None      # Newest snapshot waiting to be written
+        self._callbacks = []      # on_written callbacks of the saves the pending snapshot covers
+        self._deadline = 0.0      # monotonic() time at which the pending write is due
+        self._generation = 0      # Bumped on every save(); newer snapshots win
+        self._written = 0         # Generation of the snapshot currently on disk
+        self._write_lock = threading.Lock()
+        self._writer = None
+        self._closed = False
+        atexit.register(self.flush)
+
+    # ---------------- Loading ----------------
+    def load(self):
+        """Populate `data` from disk (or a legacy config file) over the defaults."""
+        loaded, source = self._read_first_available()
+        self.data.clear()
+        self.data.update(copy.deepcopy(self.defaults))
+        if loaded is not None:
+            self.data.update(migrate(loaded))
+        self.data["schema_version"] = SCHEMA_VERSION
+
+        # Write the migrated result to our own file so the import only happens once
+        if source is not None and source != self.path:
+            self.save()
+        return self.data
+
+    def _read_first_available(self):
+        """Return (settings, path) from our own file, else the newest legacy file."""
+        candidates = [self.path]
+        directory = os.path.dirname(self.path)
+        legacy = [os.path.join(directory, name) for name in self.legacy_files]
+        legacy = [p for p in legacy if p != self.path and os.path.exists(p)]
+        legacy.sort(key=os.path.getmtime, reverse=True)
+        candidates.extend(legacy)
+
+        for candidate in candidates:
+            if not os.path.exists(candidate):
+                continue
+            try:
+                with open(candidate, "r") as f:
+                    loaded = json.load(f)
+                if isinstance(loaded, dict):
+                    return loaded, candidate
+            except (OSError, ValueError) as e:
+                print(f"Error loading settings from {candidate}: {e}")
+        return None, None
+
+    # ---------------- Saving ----------------
+    def save(self, on_written=None):
+        """Schedule a debounced write of the current `data`."""
+        snapshot = copy.deepcopy(self.data)
+        with self._cond:
+            if self._closed:
+                return
+            self._generation += 1
+            if on_written is not None:
+                self._callbacks.append(on_written)
+            self._pending = (self._generation, snapshot)
+            self._deadline = time.monotonic() + self.delay
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._writer_loop, name="SettingsWriter", daemon=True)
+                self._writer.start()
+            self._cond.notify()
+
+    def update(self, values, on_written=None):
+        """Merge values into `data` and schedule a save."""
+        self.data.update(values)
+        self.save(on_written)
+
+    def flush(self):
+        """Write any pending snapshot now, on the calling thread."""
+        with self._cond:
+            pending, callbacks = self._take_pending()
+            self._cond.notify()
+        if pending is not None:
+            self._write(*pending, callbacks)
+
+    def close(self):
+        """Flush and stop the background writer."""
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+    def _writer_loop(self):
+        """Background thread: wait for the debounce deadline, then write the newest snapshot."""
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                remaining = self._deadline - time.monotonic()
+                if remaining > 0:
+                    # A newer save() may push the deadline back while we wait
+                    self._cond.wait(remaining)
+                    continue
+                pending, callbacks = self._take_pending()
+            self._write(*pending, callbacks)
+
+    def _take_pending(self):
+        """Hand over the pending snapshot and its callbacks (caller holds `_cond`)."""
+        pending, self._pending = self._pending, None
+        callbacks, self._callbacks = self._callbacks, []
+        return pending, callbacks
+
+    def _write(self, generation, snapshot, callbacks=()):
+        error = None
+        with self._write_lock:
+            # flush() and the writer thread can race; never let an older snapshot overwrite a newer one.
+            # The newer snapshot already on disk includes this one, so its callbacks still succeed.
+            if generation > self._written:
+                try:
+                    atomic_write_json(self.path, snapshot)
+                    self._written = generation
+                except OSError as e:
+                    print(f"Error saving settings to {self.path}: {e}")
+                    error = e
+        for callback in callbacks:
+            callback(error)
@@ -2,13 +2,19 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import minecraft_launcher_lib
-import subprocess
 import os
-import json
 import sys
+import asyncio
 import platform
 from threading import Thread
 from datetime import datetime
+from launcher_settings import MINE4K_CONFIG
+from launcher_core import LauncherCore, find_java, default_settings
+from install_progress import ProgressMonitor
+from install_queue import CANCELLED, DONE
+from net_loop import TkDispatcher
+from world_regions import RegionTool, list_worlds, TICKS_PER_SECOND
+from server_ping import ping
 
 class MineSeek4KLauncher:
     def __init__(self, root):
@@ -18,36 +24,26 @@ class MineSeek4KLauncher:
         
         # Configuration
         self.minecraft_dir = minecraft_launcher_lib.utils.get_minecraft_directory()
-        self.config_path = os.path.join(self.minecraft_dir, "mineseek4k_config.json")
-        self.default_settings = {
-            "java_path": self.find_java(),
-            "ram": 4096,
-            "resolution": "1280x720",
-            "server_ip": "",
-            "last_username": "Player",
-            "auth_method": "offline"
-        }
-        self.settings = self.default_settings.copy()
-        
-        # Create necessary directories
-        os.makedirs(self.minecraft_dir, exist_ok=True)
-        
-        # Load settings
-        self.load_settings()
+        
+        # Settings, the installed-version index and the install queue live in the
+        # UI-free core (shared with launcher_cli.py); this class only adds widgets.
+        self.core = LauncherCore(self.minecraft_dir, MINE4K_CONFIG, default_settings())
+        self.settings_store = self.core.settings_store
+        self.settings = self.core.settings
+        self.version_index = self.core.version_index
+        self.install_scheduler = self.core.install_scheduler
+        self.core.start_watching()
+        self.index_generation = -1
+        self.dispatcher = TkDispatcher(self.root)  # Hands worker-thread results back to the Tk loop
         
         # UI Setup
         self.create_notebook()
         self.load_installed_versions()
+        self.root.after(1000, self.poll_version_index)
         
         # Start version list loading
         Thread(target=self.load_online_versions, daemon=True).start()
 
-    def find_java(self):
-        try:
-            return minecraft_launcher_lib.utils.get_java_executable()
-        except Exception:
-            return "java"  # Fallback to system PATH
-
     def create_notebook(self):
         self.notebook = ttk.Notebook(self.root)
         
@@ -59,18 +55,24 @@ class MineSeek4KLauncher:
         self.install_frame = ttk.Frame(self.notebook)
         self.create_install_tab()
         
+        # Worlds Tab
+        self.worlds_frame = ttk.Frame(self.notebook)
+        self.create_worlds_tab()
+        
         # Settings Tab
         self.settings_frame = ttk.Frame(self.notebook)
         self.create_settings_tab()
         
         self.notebook.add(self.play_frame, text="Play")
         self.notebook.add(self.install_frame, text="Install")
+        self.notebook.add(self.worlds_frame, text="Worlds")
         self.notebook.add(self.settings_frame, text="Settings")
         self.notebook.pack(expand=True, fill="both")
 
     def create_play_tab(self):
         ttk.Label(self.play_frame, text="Version:").grid(row=0, column=0, padx=5, pady=5)
         self.version_combobox = ttk.Combobox(self.play_frame, state="readonly")
+        self.version_combobox.bind("<<ComboboxSelected>>", lambda e: self.version_selected())
         self.version_combobox.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
         
         ttk.Label(self.play_frame, text="Username:").grid(row=1, column=0, padx=5, pady=5)
@@ -81,6 +83,12 @@ class MineSeek4KLauncher:
         ttk.Label(self.play_frame, text="Server IP:").grid(row=2, column=0, padx=5, pady=5)
         self.server_entry = ttk.Entry(self.play_frame)
         self.server_entry.grid(row=2, column=1, padx=5, pady=5, sticky="ew")
+        server_tools = ttk.Frame(self.play_frame)
+        server_tools.grid(row=2, column=2, padx=5, pady=5, sticky="w")
+        ttk.Button(server_tools, text="Ping", command=self.ping_server).pack(side="left")
+        ttk.Button(server_tools, text="Fastest Saved", command=self.pick_fastest_server).pack(side="left", padx=5)
+        self.server_status = ttk.Label(server_tools, text="")
+        self.server_status.pack(side="left")
         
         ttk.Button(self.play_frame, text="Launch Minecraft", command=self.launch_minecraft).grid(
             row=3, column=0, columnspan=2, padx=5, pady=10, sticky="ew")
@@ -91,6 +99,58 @@ class MineSeek4KLauncher:
         self.play_frame.grid_rowconfigure(4, weight=1)
         self.play_frame.grid_columnconfigure(1, weight=1)
 
+    def version_selected(self):
+        version = self.version_combobox.get()
+        self.install_scheduler.prioritize(version)
+        if version not in self.version_index:
+            return
+        # Read the jars and assets into the page cache while the user fills in the rest
+        future = self.core.prewarm_version(version)
+        future.add_done_callback(lambda f: self.dispatcher.call_soon(self.show_prewarm, f.result()))
+
+    def show_prewarm(self, report):
+        if report["stopped"] == "superseded":
+            return
+        line = f"Prewarmed {report['version']}: {report['files']} files, {report['bytes'] / 1024 ** 2:.0f} MB"
+        if report["stopped"]:
+            line += f" (stopped: {report['stopped']})"
+        self.log(line)
+
+    def ping_server(self):
+        address = self.server_entry.get().strip()
+        if not address:
+            return
+        self.server_status["text"] = "Pinging..."
+
+        def work():
+            result = asyncio.run(ping(address))
+            self.dispatcher.call_soon(self.show_server_status, result.describe())
+        Thread(target=work, daemon=True).start()
+
+    def pick_fastest_server(self):
+        if not self.core.server_list.servers:
+            messagebox.showinfo("Servers", "No saved servers yet (launcher_cli.py servers add NAME ADDRESS).")
+            return
+        self.server_status["text"] = f"Pinging {len(self.core.server_list.servers)} servers..."
+
+        def work():
+            address = self.core.best_server()
+            self.dispatcher.call_soon(self.use_fastest_server, address)
+        Thread(target=work, daemon=True).start()
+
+    def use_fastest_server(self, address):
+        if address is None:
+            self.show_server_status("None of the saved servers answered")
+            return
+        self.server_entry.delete(0, "end")
+        self.server_entry.insert(0, address)
+        stats = next(self.core.server_list.stats(name) for name, entry in self.core.server_list.servers.items()
+                     if entry["address"] == address)
+        self.show_server_status(f"{stats['median_rtt_ms']:.0f} ms median, {stats['players']} players")
+
+    def show_server_status(self, text):
+        self.server_status["text"] = text
+
     def create_install_tab(self):
         self.version_tree = ttk.Treeview(self.install_frame, columns=("type", "date"), show="headings")
         self.version_tree.heading("#0", text="Version")
@@ -108,9 +168,116 @@ class MineSeek4KLauncher:
         self.progress = ttk.Progressbar(self.install_frame, mode="determinate")
         self.progress.grid(row=1, column=2, padx=5, sticky="ew")
         
+        self.progress_label = ttk.Label(self.install_frame, text="")
+        self.progress_label.grid(row=2, column=0, columnspan=2, padx=5, sticky="w")
+        ttk.Button(self.install_frame, text="Cancel Installs", command=self.cancel_installs).grid(
+            row=2, column=2, padx=5, sticky="e")
+        # Install threads only write plain counters; this samples them from the Tk loop
+        self.progress_monitor = ProgressMonitor(self.root, self.show_progress)
+        
         self.install_frame.grid_rowconfigure(0, weight=1)
         self.install_frame.grid_columnconfigure(0, weight=1)
 
+    def create_worlds_tab(self):
+        self.world_tree = ttk.Treeview(self.worlds_frame, columns=("size", "chunks", "reclaimable", "stale"))
+        self.world_tree.heading("#0", text="World")
+        self.world_tree.heading("size", text="Region Files")
+        self.world_tree.heading("chunks", text="Chunks")
+        self.world_tree.heading("reclaimable", text="Reclaimable")
+        self.world_tree.heading("stale", text="Stale Chunks")
+        self.world_tree.grid(row=0, column=0, columnspan=5, sticky="nsew")
+        
+        ttk.Button(self.worlds_frame, text="Analyze", command=self.analyze_world).grid(row=1, column=0, padx=5, pady=5)
+        ttk.Button(self.worlds_frame, text="Compact", command=self.compact_world).grid(row=1, column=1, padx=5, pady=5)
+        
+        self.prune_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.worlds_frame, text="Prune chunks visited less than (s):",
+                        variable=self.prune_var).grid(row=1, column=2, padx=5, sticky="e")
+        self.min_inhabited_spin = ttk.Spinbox(self.worlds_frame, from_=0, to=3600, increment=30, width=6)
+        self.min_inhabited_spin.set(60)
+        self.min_inhabited_spin.grid(row=1, column=3, padx=5, sticky="w")
+        
+        self.world_status = ttk.Label(self.worlds_frame, text="")
+        self.world_status.grid(row=2, column=0, columnspan=5, padx=5, sticky="w")
+        
+        self.worlds_frame.grid_rowconfigure(0, weight=1)
+        self.worlds_frame.grid_columnconfigure(4, weight=1)
+        self.load_worlds()
+
+    def load_worlds(self):
+        self.world_tree.delete(*self.world_tree.get_children())
+        for world in list_worlds(self.minecraft_dir):
+            self.world_tree.insert("", "end", iid=world, text=os.path.basename(world), values=("", "", "", ""))
+
+    def selected_world(self):
+        selected = self.world_tree.selection()
+        if not selected:
+            messagebox.showerror("Error", "Select a world first!")
+            return None
+        return selected[0]
+
+    def min_inhabited_ticks(self):
+        return int(float(self.min_inhabited_spin.get()) * TICKS_PER_SECOND)
+
+    def analyze_world(self, world=None):
+        world = world or self.selected_world()
+        if not world:
+            return
+        self.world_status["text"] = f"Analyzing {os.path.basename(world)}..."
+        min_inhabited = self.min_inhabited_ticks()
+        
+        def work():
+            # Runs on a worker thread; region files are read on a process pool
+            try:
+                report = RegionTool(world).analyze(min_inhabited)
+                self.dispatcher.call_soon(self.show_world_report, report)
+            except Exception as e:
+                self.dispatcher.call_soon(self.world_failed, world, e)
+        
+        Thread(target=work, daemon=True).start()
+
+    def show_world_report(self, report):
+        mib = 1024 * 1024
+        self.world_tree.item(report["world"], values=(
+            f"{report['file_bytes'] / mib:.1f} MiB", report["chunks"],
+            f"{report['reclaimable_bytes'] / mib:.1f} MiB", report["stale_chunks"]))
+        status = f"{os.path.basename(report['world'])}: {report['regions']} region files"
+        if report["errors"]:
+            status += f", {len(report['errors'])} with unreadable chunks (left untouched)"
+        self.world_status["text"] = status
+
+    def compact_world(self):
+        world = self.selected_world()
+        if not world:
+            return
+        min_inhabited = self.min_inhabited_ticks() if self.prune_var.get() else None
+        prompt = f"Compact the region files of {os.path.basename(world)}?"
+        if min_inhabited is not None:
+            prompt += f"\n\nChunks visited for less than {self.min_inhabited_spin.get()} s are deleted and will regenerate."
+        if not messagebox.askyesno("Compact World", prompt):
+            return
+        self.world_status["text"] = f"Compacting {os.path.basename(world)}..."
+        
+        def work():
+            try:
+                result = RegionTool(world).compact(min_inhabited)
+                self.dispatcher.call_soon(self.world_compacted, result)
+            except Exception as e:
+                self.dispatcher.call_soon(self.world_failed, world, e)
+        
+        Thread(target=work, daemon=True).start()
+
+    def world_compacted(self, result):
+        mib = 1024 * 1024
+        self.world_status["text"] = (
+            f"{os.path.basename(result['world'])}: {result['before_bytes'] / mib:.1f} MiB -> "
+            f"{result['after_bytes'] / mib:.1f} MiB, {result['pruned_chunks']} chunks pruned")
+        self.analyze_world(result["world"])  # The selection may have changed while compacting
+
+    def world_failed(self, world, error):
+        self.world_status["text"] = f"{os.path.basename(world)}: {error}"
+        messagebox.showerror("World Error", str(error))
+
     def create_settings_tab(self):
         ttk.Label(self.settings_frame, text="Java Path:").grid(row=0, column=0, sticky="w")
         self.java_entry = ttk.Entry(self.settings_frame)
@@ -132,19 +299,24 @@ class MineSeek4KLauncher:
             row=3, column=0, columnspan=3, pady=10)
 
     def load_installed_versions(self):
-        versions = minecraft_launcher_lib.utils.get_installed_versions(self.minecraft_dir)
+        self.index_generation = self.version_index.generation
+        versions = self.version_index.installed_versions()
         installed = [v["id"] for v in versions if v["type"] == "release"]
         self.version_combobox["values"] = installed
-        if installed:
+        if installed and not self.version_combobox.get():
             self.version_combobox.current(0)
+            self.version_selected()
+
+    def poll_version_index(self):
+        if self.version_index.generation != self.index_generation:
+            self.load_installed_versions()
+        self.root.after(1000, self.poll_version_index)
 
     def load_online_versions(self):
         try:
-            versions = minecraft_launcher_lib.utils.get_version_list()
-            for version in versions:
-                if version["type"] == "release":
-                    self.version_tree.insert("", "end", text=version["id"], 
-                                          values=(version["type"], version["releaseTime"]))
+            for version in self.core.available_versions(types=("release",)):
+                self.version_tree.insert("", "end", text=version.id,
+                                      values=(version.type, version.release_time))
         except Exception as e:
             self.log(f"Error loading versions: {e}")
 
@@ -157,33 +329,39 @@ class MineSeek4KLauncher:
         version = self.version_tree.item(selected[0])["text"]
         modloader = self.modloader_var.get()
         
-        def install_task():
-            try:
-                self.install_btn["state"] = "disabled"
-                self.progress["value"] = 0
-                
-                def update_progress(current, total):
-                    self.progress["value"] = (current / total) * 100
-                    self.root.update_idletasks()
-                
-                if modloader == "Forge":
-                    minecraft_launcher_lib.forge.install_forge_version(version, self.minecraft_dir, callback=update_progress)
-                elif modloader == "Fabric":
-                    minecraft_launcher_lib.fabric.install_fabric(version, self.minecraft_dir, callback=update_progress)
-                else:
-                    minecraft_launcher_lib.install.install_minecraft_version(version, self.minecraft_dir, callback=update_progress)
-                
-                self.log(f"Successfully installed {version}")
-                self.load_installed_versions()
-                
-            except Exception as e:
-                self.log(f"Installation failed: {e}")
-                messagebox.showerror("Install Error", str(e))
-            finally:
-                self.install_btn["state"] = "normal"
-                self.progress["value"] = 0
+        if self.install_scheduler.get(version, modloader):
+            self.log(f"{modloader} {version} is already queued")
+            return
+        
+        tracker = self.progress_monitor.track(f"{modloader} {version}")
+        
+        def install_done(job):
+            # Runs on the install worker thread; the widgets are updated from the Tk loop
+            tracker.finish("cancelled" if job.state == CANCELLED else job.error)
+            self.dispatcher.call_soon(self.install_finished, job)
         
-        Thread(target=install_task, daemon=True).start()
+        self.core.install(version, modloader, callback=tracker.callbacks(), on_done=install_done)
+
+    def install_finished(self, job):
+        if job.state == DONE:
+            self.log(f"Successfully installed {job.version}")
+        elif job.state == CANCELLED:
+            self.log(f"Installation of {job.version} cancelled")
+        else:
+            self.log(f"Installation failed: {job.error}")
+            messagebox.showerror("Install Error", str(job.error))
+
+    def cancel_installs(self):
+        self.install_scheduler.cancel_all()
+
+    def show_progress(self, samples):
+        """Called from the Tk loop by the progress monitor with one sample per running install."""
+        active = [s for s in samples if not s.finished]
+        if active:
+            self.progress["value"] = sum(s.fraction for s in active) / len(active) * 100
+        else:
+            self.progress["value"] = 0
+        self.progress_label["text"] = "\n".join(s.describe() for s in samples)
 
     def launch_minecraft(self):
         version = self.version_combobox.get()
@@ -196,30 +374,33 @@ class MineSeek4KLauncher:
             messagebox.showerror("Error", "Enter a username!")
             return
         
-        self.settings["last_username"] = username
-        self.save_settings()
+        if self.install_scheduler.get(version, "Vanilla"):
+            # Still being installed: move it to the front of the queue instead of launching a broken install
+            self.install_scheduler.prioritize(version)
+            messagebox.showinfo("Installing", f"{version} is still installing and has been moved to the front of the queue.")
+            return
         
-        options = {
-            "username": username,
-            "jvmArguments": [
-                f"-Xmx{self.settings['ram']}M",
-                f"-Xms{self.settings['ram']//2}M",
-                f"-Dminecraft.resolution={self.settings['resolution']}"
-            ],
-            "server": self.server_entry.get(),
-            "executablePath": self.settings["java_path"]
-        }
+        self.save_settings()
         
         try:
-            command = minecraft_launcher_lib.command.get_minecraft_command(version, self.minecraft_dir, options)
-            subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            # The core drains the game's output (so a full pipe can never stall it) and times its startup;
+            # both callbacks run on its reader thread, so they are handed to the Tk loop
+            self.core.launch(
+                version, username, server=self.server_entry.get(),
+                on_output=lambda line: self.dispatcher.call_soon(self.log, line),
+                on_exit=lambda timeline: self.dispatcher.call_soon(self.game_exited, timeline)
+            )
             self.log(f"Launched Minecraft {version}")
         except Exception as e:
             self.log(f"Launch failed: {e}")
             messagebox.showerror("Launch Error", str(e))
 
+    def game_exited(self, timeline):
+        self.log(f"Minecraft exited with code {timeline.exit_code}")
+        self.log(f"Startup timeline ({timeline.profile}): {timeline.describe()}")
+
     def browse_java(self):
-        initial = self.settings["java_path"] or self.find_java()
+        initial = self.settings["java_path"] or find_java()
         path = filedialog.askopenfilename(title="Select Java Executable", initialfile=initial)
         if path:
             self.java_entry.delete(0, "end")
@@ -227,26 +408,20 @@ class MineSeek4KLauncher:
 
     def save_settings(self):
         try:
-            self.settings.update({
+            self.settings_store.update({
                 "java_path": self.java_entry.get(),
                 "ram": int(self.ram_spin.get()),
                 "resolution": self.res_entry.get()
-            })
-            
-            with open(self.config_path, "w") as f:
-                json.dump(self.settings, f)
-            
-            self.log("Settings saved successfully")
+            }, on_written=lambda error: self.dispatcher.call_soon(self.settings_written, error))
         except Exception as e:
             messagebox.showerror("Save Error", f"Failed to save settings: {e}")
 
-    def load_settings(self):
-        if os.path.exists(self.config_path):
-            try:
-                with open(self.config_path, "r") as f:
-                    self.settings.update(json.load(f))
-            except Exception as e:
-                self.log(f"Error loading settings: {e}")
+    def settings_written(self, error):
+        # The store writes in the background; report what actually reached the disk
+        if error is None:
+            self.log("Settings saved successfully")
+        else:
+            messagebox.showerror("Save Error", f"Failed to save settings: {error}")
 
     def log(self, message):
         timestamp = datetime.now().strftime("[%H:%M:%S] ")
@@ -3,6 +3,7 @@ from tkinter import ttk
 import minecraft_launcher_lib
 import subprocess
 import os
+from version_index import VersionIndex, get_available_versions
 
 class MinecraftLauncher:
     def __init__(self, root):
@@ -11,6 +12,9 @@ class MinecraftLauncher:
         
         # Minecraft directory
         self.minecraft_dir = minecraft_launcher_lib.utils.get_minecraft_directory()
+        self.version_index = VersionIndex(self.minecraft_dir)
+        self.version_index.start()
+        self.index_generation = -1
         
         # Variables
         self.versions = []
@@ -20,8 +24,9 @@ class MinecraftLauncher:
         # Setup UI
         self.setup_ui()
         
-        # Load versions
+        # Load versions, and reload them whenever the background reconcile or the watcher changes the index
         self.load_versions()
+        self.root.after(1000, self.poll_version_index)
 
     def setup_ui(self):
         # Username
@@ -39,13 +44,20 @@ class MinecraftLauncher:
 
     def load_versions(self):
         # Get available versions and reverse order to show newest first
-        self.versions = minecraft_launcher_lib.utils.get_available_versions(self.minecraft_dir)
+        # Installed versions come from the persistent index instead of re-parsing every version JSON
+        self.index_generation = self.version_index.generation
+        self.versions = get_available_versions(self.version_index)
         self.versions = [v["id"] for v in self.versions if v["type"] == "release"]
         self.versions.reverse()
         self.version_combobox["values"] = self.versions
-        if self.versions:
+        if self.versions and self.selected_version.get() not in self.versions:
             self.selected_version.set(self.versions[0])
 
+    def poll_version_index(self):
+        if self.version_index.generation != self.index_generation:
+            self.load_versions()
+        self.root.after(1000, self.poll_version_index)
+
     def launch_minecraft(self):
         version = self.selected_version.get()
         player_name = self.username.get()
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+import os
+import json
+import time
+import stat
+import shutil
+import hashlib
+import argparse
+import tempfile
+import threading
+import minecraft_launcher_lib
+from minecraft_launcher_lib._helper import get_library_path
+
+# ----------------------------------------
+# Constants
+# ----------------------------------------
+CACHE_DIR_NAME = "modloader_cache"
+# Where Forge's processors write: remapped client jars under net/minecraft/client/<game version>-<mcp version>/,
+# the patched client under net/minecraftforge/forge/<forge version>/
+FORGE_OUTPUT_DIRS = ((("net", "minecraft", "client"), "game"), (("net", "minecraftforge", "forge"), "loader"))
+HASH_CHUNK = 1024 * 1024
+
+
+# ----------------------------------------
+# Utility Functions
+# ----------------------------------------
+
+def sha1_file(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def library_paths(version_json):
+    """Paths (relative to the Minecraft directory) of the libraries a version JSON declares."""
+    paths = []
+    for lib in version_json.get("libraries", []):
+        artifact = lib.get("downloads", {}).get("artifact")
+        if artifact and artifact.get("path"):
+            paths.append(os.path.join("libraries", *artifact["path"].split("/")))
+        elif "name" in lib:
+            paths.append(get_library_path(lib["name"], ""))
+    return [os.path.normpath(path) for path in paths]
+
+
+def forge_outputs(minecraft_dir, game_version, loader_version):
+    """Files Forge's install processors wrote for this release; other releases' outputs don't match."""
+    files = []
+    for parts, keyed_by in FORGE_OUTPUT_DIRS:
+        top = os.path.join(minecraft_dir, "libraries", *parts)
+        try:
+            names = os.listdir(top)
+        except FileNotFoundError:
+            continue
+        for name in names:
+            ours = name == loader_version if keyed_by == "loader" else name.startswith(game_version + "-")
+            if not ours:
+                continue
+            for dirpath, _dirnames, filenames in os.walk(os.path.join(top, name)):
+                files.extend(os.path.relpath(os.path.join(dirpath, f), minecraft_dir) for f in filenames)
+    return files
+
+
+def bundle_files(minecraft_dir, version_id, loader, game_version, loader_version):
+    """
+    What a loader install produced, taken from what its version JSON declares:
+    the JSON itself, its libraries and, for Forge, the processor outputs. Files
+    written meanwhile by other installs (of other versions) are not included.
+    """
+    version_dir = os.path.join("versions", version_id)
+    json_path = os.path.join(version_dir, version_id + ".json")
+    with open(os.path.join(minecraft_dir, json_path), "r") as f:
+        version_json = json.load(f)
+    paths = {json_path, os.path.join(version_dir, version_id + ".jar")}
+    paths.update(library_paths(version_json))
+    if loader == "forge":
+        paths.update(forge_outputs(minecraft_dir, game_version, loader_version))
+    return [path for path in paths if os.path.isfile(os.path.join(minecraft_dir, path))]
+
+
+def link_or_copy(src, dst):
+    """Hardlinks src to dst (falling back to a copy across filesystems)."""
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def latest_loader_version(loader, game_version):
+    """The newest Forge or Fabric release for `game_version`, or None if it can't be looked up (offline)."""
+    try:
+        if loader.lower() == "fabric":
+            return minecraft_launcher_lib.fabric.get_latest_loader_version()
+        if loader.lower() == "forge":
+            return minecraft_launcher_lib.forge.find_forge_version(game_version)
+    except Exception as e:
+        print(f"Could not look up the latest {loader} loader: {e}")
+    return None
+
+
+def default_cache_dir():
+    """One cache per user, shared by every instance directory."""
+    return os.path.join(minecraft_launcher_lib.utils.get_minecraft_directory(), CACHE_DIR_NAME)
+
+
+# ----------------------------------------
+# Modloader Cache
+# ----------------------------------------
+
+class ModloaderCache:
+    """
+    Content-addressed cache of everything a Forge or Fabric install produces.
+
+    A cold install runs the normal minecraft_launcher_lib installer and then
+    records the files the loader's version JSON declares - the JSON itself,
+    its libraries and, for Forge, the processor outputs (patched client
+    jars, mappings). Installs of other versions running at the same time
+    can't leak into the bundle. Files are stored once by SHA-1
+    under objects/ and described by a bundle manifest keyed by loader, game
+    version and loader version.
+
+    A warm install hardlinks the bundle into the target instance and lets
+    install_minecraft_version() verify it, which needs no network as long as
+    the vanilla base version is present. No installer jar is downloaded and
+    no Forge processor runs. Cached objects are read-only, so a hardlinked
+    library can never be rewritten in place through an instance.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.objects_dir = os.path.join(self.cache_dir, "objects")
+        self.bundles_dir = os.path.join(self.cache_dir, "bundles")
+        self._lock = threading.Lock()
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.bundles_dir, exist_ok=True)
+
+    # ---------------- Bundles ----------------
+    def _bundle_path(self, loader, game_version, loader_version):
+        return os.path.join(self.bundles_dir, f"{loader.lower()}-{game_version}-{loader_version}.json")
+
+    def lookup(self, loader, game_version, loader_version=None):
+        """Returns the bundle for the exact loader version, or the newest cached one if it is None."""
+        if loader_version:
+            path = self._bundle_path(loader, game_version, loader_version)
+            candidates = [path] if os.path.exists(path) else []
+        else:
+            prefix = f"{loader.lower()}-{game_version}-"
+            candidates = [
+                os.path.join(self.bundles_dir, name) for name in os.listdir(self.bundles_dir)
+                if name.startswith(prefix) and name.endswith(".json")
+            ]
+            candidates.sort(key=os.path.getmtime, reverse=True)
+        for path in candidates:
+            try:
+                with open(path, "r") as f:
+                    bundle = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable modloader bundle {path}: {e}")
+                continue
+            # The name prefix for "1.20" also matches "1.20-rc1" bundles
+            if bundle.get("game_version") == game_version:
+                return bundle
+        return None
+
+    # ---------------- Objects ----------------
+    def object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def add_object(self, src, digest=None, move=False):
+        """Adds a file to the object store (read-only) and returns its SHA-1. `move` consumes src."""
+        digest = digest or sha1_file(src)
+        obj = self.object_path(digest)
+        if os.path.exists(obj):
+            if move:
+                os.remove(src)
+            return digest
+        os.makedirs(os.path.dirname(obj), exist_ok=True)
+        tmp = obj + f".{os.getpid()}.{threading.get_ident()}.tmp"
+        if move:
+            os.replace(src, tmp)
+        else:
+            shutil.copyfile(src, tmp)
+        os.chmod(tmp, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+        os.replace(tmp, obj)
+        return digest
+
+    def store(self, loader, game_version, loader_version, version_id, minecraft_dir, rel_paths):
+        """Copies rel_paths (relative to minecraft_dir) into the cache and writes the bundle manifest."""
+        files = []
+        for rel_path in sorted(rel_paths):
+            digest = self.add_object(os.path.join(minecraft_dir, rel_path))
+            obj = self.object_path(digest)
+            files.append({"path": rel_path.replace(os.sep, "/"), "sha1": digest, "size": os.path.getsize(obj)})
+
+        bundle = {
+            "loader": loader,
+            "game_version": game_version,
+            "loader_version": loader_version,
+            "version_id": version_id,
+            "created": time.time(),
+            "files": files,
+        }
+        path = self._bundle_path(loader, game_version, loader_version)
+        with self._lock:
+            with open(path + ".tmp", "w") as f:
+                json.dump(bundle, f, indent=4)
+            os.replace(path + ".tmp", path)
+        return bundle
+
+    def replay(self, bundle, minecraft_dir):
+        """Materializes a bundle into minecraft_dir. Files already present with the right size are kept."""
+        for entry in bundle["files"]:
+            dst = os.path.join(minecraft_dir, *entry["path"].split("/"))
+            if os.path.isfile(dst) and os.path.getsize(dst) == entry["size"]:
+                continue
+            obj = self.object_path(entry["sha1"])
+            if not os.path.exists(obj):
+                raise FileNotFoundError(f"Modloader cache object missing: {obj}")
+            if entry["path"].startswith("versions/"):
+                # Version JSONs are rewritten by some tools; never share their inode with the cache
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                shutil.copyfile(obj, dst)
+                os.chmod(dst, stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP | stat.S_IROTH)
+            else:
+                link_or_copy(obj, dst)
+
+    # ---------------- Installing ----------------
+    def install(self, modloader, version, minecraft_dir, callback=None, loader_version=None):
+        """
+        Installs Forge or Fabric for Minecraft `version`, replaying from the cache when possible.
+        For Forge, `version` may also be a full Forge version such as "1.20.1-47.1.0".
+        Returns the installed version id.
+        """
+        callback = callback or {}
+        loader = modloader.lower()
+        game_version = version
+        if loader == "forge" and "-" in version:
+            # "-" separates the Forge build; Minecraft ids like "1.21-rc1" (Fabric, vanilla) keep theirs
+            game_version = version.split("-")[0]
+            loader_version = version
+        if loader_version is None:
+            # Pin the newest release first so a new Forge/Fabric release is picked up; offline,
+            # fall back to the newest cached bundle
+            loader_version = latest_loader_version(loader, game_version)
+
+        bundle = self.lookup(loader, game_version, loader_version)
+        if bundle is not None:
+            callback.get("setStatus", lambda s: None)(f"Restoring {modloader} {bundle['loader_version']} from cache")
+            self.replay(bundle, minecraft_dir)
+            # Verifies the restored files and fills in the vanilla base (offline if it is already installed)
+            minecraft_launcher_lib.install.install_minecraft_version(bundle["version_id"], minecraft_dir, callback=callback)
+            return bundle["version_id"]
+
+        existing = set(os.listdir(os.path.join(minecraft_dir, "versions"))) \
+            if os.path.isdir(os.path.join(minecraft_dir, "versions")) else set()
+        if loader == "forge":
+            loader_version = loader_version or minecraft_launcher_lib.forge.find_forge_version(game_version)
+            if loader_version is None:
+                raise ValueError(f"No Forge release found for Minecraft {game_version}")
+            minecraft_launcher_lib.forge.install_forge_version(loader_version, minecraft_dir, callback=callback)
+            version_id = minecraft_launcher_lib.forge.forge_to_installed_version(loader_version)
+        elif loader == "fabric":
+            loader_version = loader_version or minecraft_launcher_lib.fabric.get_latest_loader_version()
+            minecraft_launcher_lib.fabric.install_fabric(game_version, minecraft_dir, loader_version=loader_version, callback=callback)
+            version_id = f"fabric-loader-{loader_version}-{game_version}"
+        else:
+            raise ValueError(f"Unsupported modloader: {modloader}")
+
+        if version_id in existing:
+            # Reinstall over an existing loader: its files may have been changed since, so don't cache
+            return version_id
+        if not os.path.isfile(os.path.join(minecraft_dir, "versions", version_id, version_id + ".json")):
+            # Older Forge releases install under a different id; replay couldn't find it
+            return version_id
+        try:
+            files = bundle_files(minecraft_dir, version_id, loader, game_version, loader_version)
+            self.store(loader, game_version, loader_version, version_id, minecraft_dir, files)
+        except (OSError, ValueError) as e:
+            print(f"Could not cache {modloader} {loader_version}: {e}")
+        return version_id
+
+
+# ----------------------------------------
+# Benchmark
+# ----------------------------------------
+
+def benchmark_cold_vs_warm(modloader, version, runs=1):
+    """
+    Installs the loader into a fresh instance with an empty cache (cold, network),
+    then into `runs` more fresh instances from the populated cache (warm).
+    The vanilla base is installed before timing so only the loader install is measured.
+    Returns {"cold": seconds, "warm": [seconds, ...]}.
+    """
+    results = {"cold": None, "warm": []}
+    with tempfile.TemporaryDirectory(prefix="modloader-bench-") as root:
+        cache = ModloaderCache(os.path.join(root, "cache"))
+        vanilla = os.path.join(root, "vanilla")
+        minecraft_launcher_lib.install.install_minecraft_version(version, vanilla)
+
+        def fresh_instance(name):
+            path = os.path.join(root, name)
+            shutil.copytree(vanilla, path)
+            return path
+
+        instance = fresh_instance("cold")
+        start = time.perf_counter()
+        cache.install(modloader, version, instance)
+        results["cold"] = time.perf_counter() - start
+
+        for i in range(runs):
+            instance = fresh_instance(f"warm{i}")
+            start = time.perf_counter()
+            cache.install(modloader, version, instance)
+            results["warm"].append(time.perf_counter() - start)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark cold vs warm (cached) modloader installs.")
+    parser.add_argument("modloader", choices=["Forge", "Fabric"])
+    parser.add_argument("version", help="Minecraft version, e.g. 1.20.1")
+    parser.add_argument("--runs", type=int, default=3, help="Number of warm installs")
+    args = parser.parse_args()
+
+    result = benchmark_cold_vs_warm(args.modloader, args.version, args.runs)
+    print(f"{args.modloader} {args.version}")
+    print(f"  cold install: {result['cold']:.2f}s")
+    for i, seconds in enumerate(result["warm"]):
+        print(f"  warm install {i + 1}: {seconds:.2f}s ({result['cold'] / seconds:.1f}x faster)")
@@ -0,0 +1,632 @@
+import os
+import re
+import json
+import shutil
+import hashlib
+import argparse
+import tempfile
+import functools
+import threading
+import http.server
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from launcher_settings import atomic_write_json
+from modloader_cache import ModloaderCache, sha1_file, link_or_copy, latest_loader_version
+from net_loop import NetLoop
+
+# ----------------------------------------
+# Constants
+# ----------------------------------------
+LOCKFILE_SUFFIX = ".lock.json"
+LOCKFILE_VERSION = 1
+INSTALLED_LIST = ".modpack-files.json"  # Inside mods/: which jars the pack put there
+LOCAL_FETCH_WORKERS = 8
+
+_VERSION_TOKEN = re.compile(r"\d+|[A-Za-z]+")
+_CLAUSE = re.compile(r"^\s*(>=|<=|==|!=|~=|>|<|=)?\s*([^\s,]+)\s*$")
+
+
+class ResolutionError(Exception):
+    """Raised when no set of mod versions satisfies the pack's constraints."""
+
+
+class PackError(Exception):
+    """Raised for unreadable pack manifests, missing mods or failed downloads."""
+
+
+# ----------------------------------------
+# Versions and Constraints
+# ----------------------------------------
+
+def version_key(version):
+    """
+    Sort key for mod versions: numbers compare numerically and pre-release
+    words sort before the release ("1.0-beta" < "1.0" < "1.0.1").
+    """
+    key = []
+    for token in _VERSION_TOKEN.findall(version):
+        key.append((1, int(token), "") if token.isdigit() else (0, 0, token.lower()))
+    key.append((0.5, 0, ""))
+    return tuple(key)
+
+
+def parse_constraint(spec):
+    """Parses "*", "1.2.3", ">=0.5, <0.6", "~=1.4" or "1.20.*" into [(op, version)]."""
+    spec = (spec or "*").strip()
+    if spec in ("*", ""):
+        return []
+    clauses = []
+    for part in spec.split(","):
+        match = _CLAUSE.match(part)
+        if not match:
+            raise PackError(f"Invalid version constraint: {spec!r}")
+        op, version = match.groups()
+        clauses.append((op if op and op != "=" else "==", version))
+    return clauses
+
+
+def satisfies(version, spec):
+    """True if `version` meets every clause of `spec` (a string or parsed clauses)."""
+    clauses = parse_constraint(spec) if isinstance(spec, str) or spec is None else spec
+    key = version_key(version)
+    for op, target in clauses:
+        if op in ("==", "!=") and target.endswith(".*"):
+            matched = version == target[:-2] or version.startswith(target[:-1])
+            if matched != (op == "=="):
+                return False
+            continue
+        other = version_key(target)
+        if op == "~=":
+            # Compatible release: >= target and same prefix minus the last component
+            prefix = target.rsplit(".", 1)[0]
+            if key < other or not (version == prefix or version.startswith(prefix + ".")):
+                return False
+        elif not {
+            "==": key == other, "!=": key != other,
+            ">=": key >= other, "<=": key <= other,
+            ">": key > other, "<": key < other,
+        }[op]:
+            return False
+    return True
+
+
+def safe_filename(filename):
+    """True if `filename` is a plain file name that stays inside the directory it is joined to."""
+    return (isinstance(filename, str) and filename not in ("", ".", "..")
+            and not any(c in filename for c in "/\\:\0") and os.path.basename(filename) == filename)
+
+
+# ----------------------------------------
+# Repository
+# ----------------------------------------
+
+class ModVersion:
+    """One downloadable version of a mod, as listed by a repository."""
+
+    __slots__ = ("name", "version", "minecraft", "loaders", "url", "sha1", "size", "filename", "depends", "breaks")
+
+    def __init__(self, name, data, base):
+        self.name = name
+        self.version = data["version"]
+        self.minecraft = data.get("minecraft") or []
+        self.loaders = [loader.lower() for loader in data.get("loaders") or []]
+        url = data["url"]
+        if "://" not in url:
+            url = urllib.parse.urljoin(base, url) if "://" in base else os.path.join(base, url)
+        self.url = url
+        self.sha1 = data["sha1"]
+        self.size = data.get("size")
+        self.filename = data.get("filename") or os.path.basename(urllib.parse.urlsplit(data["url"]).path)
+        if not safe_filename(self.filename):
+            raise PackError(f"{name} {self.version}: unsafe file name {self.filename!r}")
+        self.depends = data.get("depends") or {}
+        self.breaks = data.get("breaks") or {}
+
+    def compatible(self, minecraft, loader):
+        return (not self.minecraft or minecraft in self.minecraft) and (not self.loaders or loader in self.loaders)
+
+    def __repr__(self):
+        return f"<ModVersion {self.name} {self.version}>"
+
+
+class ModRepository:
+    """
+    A mod index: `<source>/mods/<name>.json`, each listing the mod's versions
+    ({"versions": [{"version", "url", "sha1", "size", "minecraft", "loaders",
+    "depends", "breaks"}]}). The source is an http(s) URL or a local
+    directory, so a local mirror can stand in for the real index.
+    Relative download URLs are resolved against the source.
+    """
+
+    def __init__(self, source, net=None):
+        self.source = source
+        self.remote = "://" in source
+        self.base = source.rstrip("/") + "/" if self.remote else os.path.abspath(source)
+        self.net = net
+        self._mods = {}
+
+    def _index_location(self, name):
+        if self.remote:
+            return urllib.parse.urljoin(self.base, f"mods/{urllib.parse.quote(name)}.json")
+        return os.path.join(self.base, "mods", name + ".json")
+
+    def _parse(self, name, data):
+        versions = [ModVersion(name, v, self.base) for v in data.get("versions", [])]
+        versions.sort(key=lambda v: version_key(v.version), reverse=True)
+        self._mods[name] = versions
+
+    def prefetch(self, names):
+        """Loads the index entries of all `names` at once (concurrently for remote repositories)."""
+        names = [n for n in set(names) if n not in self._mods]
+        if not names:
+            return
+        if not self.remote:
+            for name in names:
+                try:
+                    with open(self._index_location(name), "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                except FileNotFoundError:
+                    self._mods[name] = None
+                    continue
+                except (OSError, ValueError) as e:
+                    raise PackError(f"Could not read the index of {name}: {e}")
+                self._parse(name, data)
+            return
+
+        futures = {name: self.net.submit(self.net.client.get(self._index_location(name))) for name in names}
+        for name, future in futures.items():
+            try:
+                response = future.result()
+                if response.status == 404:
+                    self._mods[name] = None
+                    continue
+                data = response.raise_for_status().json()
+            except Exception as e:  # Timeouts, connection errors, HTTP errors, invalid JSON
+                raise PackError(f"Could not fetch the index of {name}: {type(e).__name__}: {e}")
+            self._parse(name, data)
+
+    def known_versions(self, name):
+        """Versions of an already fetched mod ([] if unknown or not fetched yet)."""
+        return self._mods.get(name) or []
+
+    def versions(self, name):
+        if name not in self._mods:
+            self.prefetch([name])
+        if self._mods[name] is None:
+            raise PackError(f"Mod not found in repository: {name}")
+        return self._mods[name]
+
+
+# ----------------------------------------
+# Resolver
+# ----------------------------------------
+
+class Resolver:
+    """
+    Backtracking solver over mod versions.
+
+    Picks the most constrained unresolved mod first (fewest remaining
+    candidates), tries its candidates newest first, adds their dependency
+    constraints and undoes the choice when a later pick runs out of
+    candidates. "breaks" entries exclude combinations in both directions.
+    The dependency graph's index entries are prefetched level by level, so
+    a remote repository is queried in parallel rather than one mod at a time.
+    """
+
+    def __init__(self, repository, minecraft, loader):
+        self.repository = repository
+        self.minecraft = minecraft
+        self.loader = loader.lower()
+        self._failure = None
+
+    def _prefetch_closure(self, roots):
+        seen = set()
+        level = set(roots)
+        while level:
+            self.repository.prefetch(level)
+            seen |= level
+            nxt = set()
+            for name in level:
+                for candidate in self.repository.known_versions(name):
+                    nxt.update(candidate.depends)
+            level = nxt - seen
+
+    def resolve(self, requirements):
+        """requirements: {name: constraint}. Returns {name: ModVersion}."""
+        self._prefetch_closure(requirements)
+        constraints = {name: [(spec, "pack")] for name, spec in requirements.items()}
+        chosen = {}
+        if not self._search(set(requirements), constraints, chosen):
+            raise ResolutionError(self._failure or "No compatible set of mod versions")
+        return chosen
+
+    def _candidates(self, name, constraints, chosen):
+        result = []
+        for candidate in self.repository.versions(name):
+            if not candidate.compatible(self.minecraft, self.loader):
+                continue
+            if not all(satisfies(candidate.version, spec) for spec, _by in constraints.get(name, [])):
+                continue
+            if any(satisfies(chosen[other].version, spec) for other, spec in candidate.breaks.items() if other in chosen):
+                continue
+            if any(name in c.breaks and satisfies(candidate.version, c.breaks[name]) for c in chosen.values()):
+                continue
+            result.append(candidate)
+        return result
+
+    def _search(self, pending, constraints, chosen):
+        if not pending:
+            return True
+        options = {name: self._candidates(name, constraints, chosen) for name in pending}
+        name = min(pending, key=lambda n: (len(options[n]), n))
+        if not options[name]:
+            wanted = ", ".join(f"{spec or '*'} (from {by})" for spec, by in constraints.get(name, []))
+            self._failure = f"No version of {name} for Minecraft {self.minecraft}/{self.loader} satisfies: {wanted}"
+            return False
+
+        for candidate in options[name]:
+            # A dependency we already picked has to satisfy the new constraint
+            if any(dep in chosen and not satisfies(chosen[dep].version, spec) for dep, spec in candidate.depends.items()):
+                continue
+            chosen[name] = candidate
+            added = []
+            for dep, spec in candidate.depends.items():
+                constraints.setdefault(dep, []).append((spec, f"{name} {candidate.version}"))
+                added.append(dep)
+            remaining = (pending - {name}) | {dep for dep in candidate.depends if dep not in chosen}
+            if self._search(remaining, constraints, chosen):
+                return True
+            for dep in added:
+                constraints[dep].pop()
+            del chosen[name]
+        return False
+
+
+# ----------------------------------------
+# Packs and Lockfiles
+# ----------------------------------------
+
+def load_pack(path):
+    """
+    Reads a pack manifest:
+    {"name", "minecraft", "loader", "loader_version" (optional), "repository", "mods": {name: constraint}}
+    A relative repository path is taken relative to the manifest.
+    """
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+        pack = json.loads(raw)
+    except (OSError, ValueError) as e:
+        raise PackError(f"Cannot read pack manifest {path}: {e}")
+    for key in ("minecraft", "loader", "repository", "mods"):
+        if key not in pack:
+            raise PackError(f"Pack manifest {path} is missing '{key}'")
+    if "://" not in pack["repository"]:
+        pack["repository"] = os.path.join(os.path.dirname(os.path.abspath(path)), pack["repository"])
+    pack["manifest_sha1"] = hashlib.sha1(raw).hexdigest()
+    return pack
+
+
+def lockfile_path(pack_path):
+    return os.path.splitext(pack_path)[0] + LOCKFILE_SUFFIX
+
+
+def read_lock(pack_path, pack):
+    """The lockfile for pack, or None if missing or written for a different manifest."""
+    try:
+        with open(lockfile_path(pack_path), "r", encoding="utf-8") as f:
+            lock = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if lock.get("lockfile_version") != LOCKFILE_VERSION or lock.get("manifest_sha1") != pack["manifest_sha1"]:
+        return None
+    if lock.get("loader_version") is None and lock.get("loader", "").lower() in ("forge", "fabric"):
+        return None  # Written before loader versions were pinned
+    return lock
+
+
+def resolve_loader_version(loader, minecraft, store=None):
+    """
+    The loader release a lockfile pins when the pack doesn't: the newest one
+    for `minecraft`, or, offline, the newest one in the modloader cache.
+    """
+    loader = loader.lower()
+    if loader not in ("forge", "fabric"):
+        return None
+    version = latest_loader_version(loader, minecraft)
+    if version:
+        return version
+    bundle = (store or ModloaderCache()).lookup(loader, minecraft)
+    if bundle is None:
+        raise PackError(f"Cannot determine a {loader} loader version for Minecraft {minecraft}; "
+                        "set loader_version in the pack")
+    return bundle["loader_version"]
+
+
+def lock_pack(pack_path, update=False, net=None, store=None, resolve_loader=resolve_loader_version):
+    """
+    Resolves the pack (unless an up-to-date lockfile exists) and writes the
+    lockfile. Returns the lock. The loader version is pinned too, so installing
+    from the lock later gets the same loader, not whatever is newest then.
+    """
+    pack = load_pack(pack_path)
+    if not update:
+        lock = read_lock(pack_path, pack)
+        if lock is not None:
+            return lock
+
+    owns_net = net is None and "://" in pack["repository"]
+    if owns_net:
+        net = NetLoop()
+    try:
+        repository = ModRepository(pack["repository"], net)
+        chosen = Resolver(repository, pack["minecraft"], pack["loader"]).resolve(pack["mods"])
+    finally:
+        if owns_net:
+            net.close()
+
+    lock = {
+        "lockfile_version": LOCKFILE_VERSION,
+        "manifest_sha1": pack["manifest_sha1"],
+        "name": pack.get("name", ""),
+        "minecraft": pack["minecraft"],
+        "loader": pack["loader"],
+        "loader_version": pack.get("loader_version") or resolve_loader(pack["loader"], pack["minecraft"], store),
+        "mods": [
+            {"name": m.name, "version": m.version, "filename": m.filename,
+             "url": m.url, "sha1": m.sha1, "size": m.size}
+            for m in sorted(chosen.values(), key=lambda m: m.name)
+        ],
+    }
+    atomic_write_json(lockfile_path(pack_path), lock)
+    return lock
+
+
+# ----------------------------------------
+# Fetching and Installing
+# ----------------------------------------
+
+def fetch_mods(lock, store=None, net=None):
+    """
+    Makes sure every locked jar is in the content-addressed store, downloading
+    the missing ones in parallel and verifying each against its SHA-1 (and
+    size) before it is added. Returns the number of jars downloaded.
+    """
+    store = store or ModloaderCache()
+    missing = [m for m in lock["mods"] if not os.path.exists(store.object_path(m["sha1"]))]
+    if not missing:
+        return 0
+
+    tmp_dir = tempfile.mkdtemp(prefix=".modpack-", dir=store.cache_dir)
+    errors = []
+
+    def verify_and_store(mod, path):
+        if mod.get("size") is not None and os.path.getsize(path) != mod["size"]:
+            raise PackError(f"{mod['name']} {mod['version']}: size mismatch")
+        digest = sha1_file(path)
+        if digest != mod["sha1"]:
+            raise PackError(f"{mod['name']} {mod['version']}: SHA-1 mismatch ({digest} != {mod['sha1']})")
+        store.add_object(path, digest, move=True)
+
+    try:
+        remote = [m for m in missing if "://" in m["url"]]
+        local = [m for m in missing if "://" not in m["url"]]
+
+        if remote:
+            owns_net = net is None
+            net = net or NetLoop()
+            try:
+                pending = [(m, os.path.join(tmp_dir, m["sha1"])) for m in remote]
+                futures = [(m, path, net.submit(net.client.download(m["url"], path))) for m, path in pending]
+                for mod, path, future in futures:
+                    try:
+                        future.result()
+                        verify_and_store(mod, path)
+                    except Exception as e:
+                        errors.append(f"{mod['name']}: {e}")
+            finally:
+                if owns_net:
+                    net.close()
+
+        def copy_local(mod):
+            path = os.path.join(tmp_dir, mod["sha1"])
+            shutil.copyfile(mod["url"], path)
+            verify_and_store(mod, path)
+
+        with ThreadPoolExecutor(max_workers=LOCAL_FETCH_WORKERS) as pool:
+            for mod, future in [(m, pool.submit(copy_local, m)) for m in local]:
+                try:
+                    future.result()
+                except Exception as e:
+                    errors.append(f"{mod['name']}: {e}")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if errors:
+        raise PackError("Failed to fetch mods:\n  " + "\n  ".join(errors))
+    return len(missing)
+
+
+def install_pack(pack_path, minecraft_dir, update=False, install_loader=True, store=None, callback=None):
+    """
+    Locks (if needed), fetches and installs a pack into minecraft_dir: the
+    loader through the modloader cache, then every mod hardlinked from the
+    object store into mods/. Jars a previous install of a pack put there and
+    that are no longer locked are removed; other files in mods/ are left alone.
+    Returns the lock.
+    """
+    store = store or ModloaderCache()
+    lock = lock_pack(pack_path, update=update, store=store)
+    # Validate the whole lock before fetching or installing anything
+    unsafe = [mod["filename"] for mod in lock["mods"] if not safe_filename(mod["filename"])]
+    if unsafe:
+        raise PackError(f"Lockfile has unsafe mod file names: {', '.join(map(repr, unsafe))}")
+    fetch_mods(lock, store)
+
+    if install_loader:
+        store.install(lock["loader"].capitalize(), lock["minecraft"], minecraft_dir,
+                      callback=callback, loader_version=lock.get("loader_version"))
+
+    mods_dir = os.path.join(minecraft_dir, "mods")
+    os.makedirs(mods_dir, exist_ok=True)
+    listing = os.path.join(mods_dir, INSTALLED_LIST)
+    try:
+        with open(listing, "r", encoding="utf-8") as f:
+            previous = set(json.load(f))
+    except (OSError, ValueError):
+        previous = set()
+
+    current = set()
+    for mod in lock["mods"]:
+        dst = os.path.join(mods_dir, mod["filename"])
+        current.add(mod["filename"])
+        if os.path.isfile(dst) and os.path.samefile(dst, store.object_path(mod["sha1"])):
+            continue
+        link_or_copy(store.object_path(mod["sha1"]), dst)
+    for filename in previous - current:
+        if not safe_filename(filename):
+            continue  # Never delete outside mods/, whatever the listing says
+        try:
+            os.remove(os.path.join(mods_dir, filename))
+        except FileNotFoundError:
+            pass
+    atomic_write_json(listing, sorted(current))
+    return lock
+
+
+# ----------------------------------------
+# Self Test
+# ----------------------------------------
+
+def self_test():
+    """
+    Resolves, locks and installs packs against a local stand-in repository,
+    served both as a directory and over HTTP, and checks the chosen versions,
+    backtracking, the lockfile round-trip, unreadable index entries and
+    unsafe file names.
+    """
+    class QuietHandler(http.server.SimpleHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    def stub_loader(loader, minecraft, store=None):
+        return "0.15.11"
+
+    with tempfile.TemporaryDirectory(prefix="modpack-test-") as root:
+        repo = os.path.join(root, "repo")
+        os.makedirs(os.path.join(repo, "mods"))
+        os.makedirs(os.path.join(repo, "files"))
+
+        def publish(name, versions):
+            entries = []
+            for version, extra in versions:
+                filename = f"{name}-{version}.jar"
+                body = f"{name} {version}".encode()
+                with open(os.path.join(repo, "files", filename), "wb") as f:
+                    f.write(body)
+                entry = {"version": version, "url": f"files/{filename}", "sha1": hashlib.sha1(body).hexdigest(),
+                         "size": len(body), "minecraft": ["1.20.1"], "loaders": ["fabric"]}
+                entry.update(extra)
+                entries.append(entry)
+            with open(os.path.join(repo, "mods", name + ".json"), "w") as f:
+                json.dump({"versions": entries}, f)
+
+        # alpha 2.0 needs beta >= 2.0, which gamma breaks: the solver has to back off to alpha 1.0
+        publish("alpha", [("3.0", {"minecraft": ["1.21"]}),
+                          ("2.0", {"depends": {"beta": ">=2.0"}}),
+                          ("1.0", {"depends": {"beta": ">=1.0"}})])
+        publish("beta", [("2.0", {}), ("1.0", {})])
+        publish("gamma", [("1.0", {"breaks": {"beta": ">=2.0"}})])
+        publish("delta", [("1.0", {"depends": {"beta": ">=3.0"}})])
+        publish("evil", [("1.0", {"filename": "../../evil.jar"})])
+        with open(os.path.join(repo, "mods", "broken.json"), "w") as f:
+            f.write("{not json")
+
+        local = ModRepository(repo)
+        chosen = Resolver(local, "1.20.1", "fabric").resolve({"alpha": "*", "gamma": "*"})
+        assert {n: m.version for n, m in chosen.items()} == {"alpha": "1.0", "beta": "1.0", "gamma": "1.0"}, chosen
+        chosen = Resolver(ModRepository(repo), "1.20.1", "fabric").resolve({"alpha": "*"})
+        assert chosen["alpha"].version == "2.0" and chosen["beta"].version == "2.0", chosen
+        try:
+            Resolver(ModRepository(repo), "1.20.1", "fabric").resolve({"delta": "*"})
+            raise AssertionError("unsatisfiable pack resolved")
+        except ResolutionError as e:
+            assert "beta" in str(e), e
+        try:
+            ModRepository(repo).versions("evil")
+            raise AssertionError("unsafe file name accepted")
+        except PackError:
+            pass
+
+        # The same repository over HTTP resolves identically
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=repo))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        net = NetLoop()
+        try:
+            remote = ModRepository(f"http://127.0.0.1:{server.server_address[1]}/", net)
+            chosen = Resolver(remote, "1.20.1", "fabric").resolve({"alpha": "*", "gamma": "*"})
+            assert {n: m.version for n, m in chosen.items()} == {"alpha": "1.0", "beta": "1.0", "gamma": "1.0"}
+            for repository in (remote, local):
+                try:
+                    repository.versions("broken")
+                    raise AssertionError("invalid index accepted")
+                except PackError as e:
+                    assert "broken" in str(e), e
+        finally:
+            net.close()
+            server.shutdown()
+            server.server_close()
+
+        # Lockfile round-trip: written once with a pinned loader, reused until the manifest changes
+        pack_path = os.path.join(root, "pack.json")
+        pack = {"name": "test", "minecraft": "1.20.1", "loader": "fabric", "repository": "repo",
+                "mods": {"alpha": "*", "gamma": "*"}}
+        with open(pack_path, "w") as f:
+            json.dump(pack, f)
+        lock = lock_pack(pack_path, resolve_loader=stub_loader)
+        assert lock["loader_version"] == "0.15.11" and [m["version"] for m in lock["mods"]] == ["1.0"] * 3
+        assert read_lock(pack_path, load_pack(pack_path)) == lock
+        assert lock_pack(pack_path, resolve_loader=None) == lock  # Up to date: nothing is resolved again
+        pack["mods"] = {"alpha": "*"}
+        with open(pack_path, "w") as f:
+            json.dump(pack, f)
+        assert read_lock(pack_path, load_pack(pack_path)) is None
+
+        # Install from the lock, then update: jars come from the store and stale ones are removed
+        store = ModloaderCache(os.path.join(root, "cache"))
+        instance = os.path.join(root, "instance")
+        lock = lock_pack(pack_path, resolve_loader=stub_loader)
+        install_pack(pack_path, instance, install_loader=False, store=store)
+        assert sorted(os.listdir(os.path.join(instance, "mods"))) == [INSTALLED_LIST, "alpha-2.0.jar", "beta-2.0.jar"]
+        pack["mods"] = {"alpha": "==1.0"}
+        with open(pack_path, "w") as f:
+            json.dump(pack, f)
+        lock_pack(pack_path, resolve_loader=stub_loader)
+        install_pack(pack_path, instance, install_loader=False, store=store)
+        assert sorted(os.listdir(os.path.join(instance, "mods"))) == [INSTALLED_LIST, "alpha-1.0.jar", "beta-2.0.jar"]
+
+        # A tampered lockfile can't write outside mods/, and is refused before the loader is installed
+        lock = read_lock(pack_path, load_pack(pack_path))
+        lock["mods"][0]["filename"] = "../escaped.jar"
+        atomic_write_json(lockfile_path(pack_path), lock)
+
+        def no_install(*args, **kwargs):
+            raise AssertionError("loader installed from an unvalidated lockfile")
+        store.install = no_install
+        try:
+            install_pack(pack_path, instance, store=store)
+            raise AssertionError("unsafe lockfile installed")
+        except PackError:
+            pass
+        assert not os.path.exists(os.path.join(instance, "escaped.jar"))
+    print("modpack self-test passed")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resolve and install mod packs.")
+    parser.add_argument("--self-test", action="store_true", help="Check the resolver and lockfiles against a local repository")
+    args = parser.parse_args()
+    if args.self_test:
+        self_test()
+    else:
+        parser.print_help()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+import os
+import json
+import stat
+import time
+import shutil
+import hashlib
+import zipfile
+import platform
+import argparse
+import tempfile
+import minecraft_launcher_lib
+from minecraft_launcher_lib._helper import inherit_json, parse_rule_list, get_library_path
+from minecraft_launcher_lib.natives import get_natives
+
+# ----------------------------------------
+# Constants
+# ----------------------------------------
+CACHE_DIR_NAME = "natives_cache"
+NATIVE_SUFFIXES = (".so", ".dll", ".dylib", ".jnilib")
+READ_ONLY = stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH
+# platform.machine() -> the arch suffix LWJGL 3 uses in "natives-<os>-<arch>"; the plain "natives-<os>" jar is x64
+NATIVE_ARCHES = {"x86_64": "", "amd64": "", "arm64": "arm64", "aarch64": "arm64", "armv7l": "arm32",
+                 "armv8l": "arm32", "i386": "x86", "i686": "x86", "x86": "x86"}
+
+
+# ----------------------------------------
+# Utility Functions
+# ----------------------------------------
+
+def native_arch():
+    """This machine's LWJGL natives arch suffix ("" for x64)."""
+    machine = platform.machine().lower()
+    return NATIVE_ARCHES.get(machine, machine)
+
+
+def native_jars(version, minecraft_dir):
+    """
+    Returns [(jar_path, sha1_or_None, exclude, flatten)] for every natives jar
+    this platform needs for `version`.
+
+    Old versions list natives as "classifiers" with an "extract" exclude list
+    and are unpacked as-is. Newer versions ship them as ordinary libraries
+    named "...:natives-<os>"; the game's LWJGL would extract those to a temp
+    directory on every start, so their shared libraries are flattened into
+    the natives directory where java.library.path finds them first. Their
+    rules only test the OS, so every arch's jar (natives-windows, -x86,
+    -arm64) passes; since flattening would let them overwrite each other,
+    only the one for this machine's arch is kept (the plain jar if there is
+    no arch-specific one).
+    """
+    with open(os.path.join(minecraft_dir, "versions", version, version + ".json"), "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if "inheritsFrom" in data:
+        data = inherit_json(data, minecraft_dir)
+
+    jars = []
+    flattened = {}  # (group, artifact, version) -> {arch: jar entry}
+    for lib in data.get("libraries", []):
+        if "rules" in lib and not parse_rule_list(lib["rules"], {}):
+            continue
+        downloads = lib.get("downloads", {})
+        # get_natives() runs platform.architecture(), which forks `file`; only call it when needed
+        native = get_natives(lib) if "natives" in lib else ""
+        if native:
+            classifier = downloads.get("classifiers", {}).get(native, {})
+            lib_path, extension = os.path.splitext(get_library_path(lib["name"], minecraft_dir))
+            exclude = lib.get("extract", {}).get("exclude", [])
+            jars.append((f"{lib_path}-{native}{extension}", classifier.get("sha1"), exclude, False))
+        elif lib["name"].count(":") >= 3 and lib["name"].split(":")[3].startswith("natives-"):
+            artifact = downloads.get("artifact", {})
+            parts = lib["name"].split(":")
+            arch = parts[3].split("-", 2)[2] if parts[3].count("-") >= 2 else ""
+            flattened.setdefault(tuple(parts[:3]), {})[arch] = (
+                get_library_path(lib["name"], minecraft_dir), artifact.get("sha1"), ["META-INF/"], True
+            )
+    arch = native_arch()
+    for by_arch in flattened.values():
+        if arch in by_arch:
+            jars.append(by_arch[arch])
+        elif "" in by_arch:
+            jars.append(by_arch[""])
+    return jars
+
+
+def cache_key(jars):
+    """Content address of a natives set: the jars' SHA-1s (or size+mtime if unknown) plus how they're unpacked."""
+    h = hashlib.sha1()
+    for path, sha1, exclude, flatten in sorted(jars, key=lambda j: j[0]):
+        if sha1 is None:
+            st = os.stat(path)
+            sha1 = f"{os.path.basename(path)}:{st.st_size}:{st.st_mtime_ns}"
+        h.update(f"{sha1}|{','.join(exclude)}|{int(flatten)}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def extract_jars(jars, target):
+    """Unpacks natives jars into target the way the launcher library (or, for flattened jars, LWJGL) would."""
+    os.makedirs(target, exist_ok=True)
+    for path, _sha1, exclude, flatten in jars:
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                name = info.filename
+                if info.is_dir() or any(name.startswith(e) for e in exclude):
+                    continue
+                if flatten:
+                    if not name.endswith(NATIVE_SUFFIXES):
+                        continue
+                    dst = os.path.join(target, os.path.basename(name))
+                else:
+                    dst = os.path.realpath(os.path.join(target, name))
+                    if not dst.startswith(os.path.realpath(target) + os.sep):
+                        continue  # Zip slip
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                with zf.open(info) as src, open(dst, "wb") as out:
+                    shutil.copyfileobj(src, out)
+
+
+# ----------------------------------------
+# Natives Cache
+# ----------------------------------------
+
+class NativesCache:
+    """
+    Natives extracted once per distinct set of native jars and shared by
+    every launch and every instance that needs the same set.
+
+    Each set lives in natives_cache/<key>/, where the key is derived from
+    the jars' SHA-1s, so two versions using the same LWJGL build share one
+    directory. Directories are populated under a temporary name and renamed
+    into place, so a concurrent launch never sees a half-extracted set.
+    Extracted files are read-only.
+    """
+
+    def __init__(self, minecraft_dir, cache_dir=None):
+        self.minecraft_dir = minecraft_dir
+        self.cache_dir = cache_dir or os.path.join(minecraft_dir, CACHE_DIR_NAME)
+        self._resolved = {}  # version -> (version JSON stamps, natives dir); skips re-parsing JSON per launch
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _json_stamps(self, version):
+        """(mtime_ns, size) of the version JSON and of the one it inherits from."""
+        path = os.path.join(self.minecraft_dir, "versions", version, version + ".json")
+        st = os.stat(path)
+        stamps = [(version, st.st_mtime_ns, st.st_size)]
+        with open(path, "r", encoding="utf-8") as f:
+            parent = json.load(f).get("inheritsFrom")
+        if parent:
+            st = os.stat(os.path.join(self.minecraft_dir, "versions", parent, parent + ".json"))
+            stamps.append((parent, st.st_mtime_ns, st.st_size))
+        return tuple(stamps)
+
+    def prepare(self, version):
+        """Returns the natives directory for `version`, extracting it on first use. None if it has no natives."""
+        stamps = self._json_stamps(version)
+        known = self._resolved.get(version)
+        if known and known[0] == stamps and (known[1] is None or os.path.isdir(known[1])):
+            return known[1]
+
+        jars = native_jars(version, self.minecraft_dir)
+        target = os.path.join(self.cache_dir, cache_key(jars)) if jars else None
+        if target and not os.path.isdir(target):
+            self._extract(jars, target)
+        self._resolved[version] = (stamps, target)
+        return target
+
+    def _extract(self, jars, target):
+
+        tmp = tempfile.mkdtemp(prefix=".extract-", dir=self.cache_dir)
+        try:
+            extract_jars(jars, tmp)
+            for dirpath, _dirnames, filenames in os.walk(tmp):
+                for name in filenames:
+                    os.chmod(os.path.join(dirpath, name), READ_ONLY)
+            os.chmod(tmp, 0o755)
+            try:
+                os.rename(tmp, target)
+            except OSError:
+                if not os.path.isdir(target):
+                    raise
+                # Another launch extracted the same set first; use theirs
+        finally:
+            if os.path.isdir(tmp):
+                shutil.rmtree(tmp, ignore_errors=True)
+
+    def prune(self, keep_versions):
+        """Removes cached sets not used by any of keep_versions. Returns the number removed."""
+        keep = set()
+        for version in keep_versions:
+            try:
+                jars = native_jars(version, self.minecraft_dir)
+            except (OSError, ValueError):
+                continue
+            if jars:
+                keep.add(cache_key(jars))
+        removed = 0
+        for name in os.listdir(self.cache_dir):
+            if name not in keep and not name.startswith("."):  # Dot-names are extractions in progress
+                shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+                removed += 1
+        return removed
+
+
+# ----------------------------------------
+# Benchmark
+# ----------------------------------------
+
+def benchmark_launch_prep(version, minecraft_dir, runs=5):
+    """
+    Times preparing natives for one launch: extracting into a fresh directory
+    (what happens today on every start) against a warm cache lookup.
+    Returns {"extract": [seconds, ...], "cached": [seconds, ...]}.
+    """
+    results = {"extract": [], "cached": []}
+    with tempfile.TemporaryDirectory(prefix="natives-bench-") as root:
+        for i in range(runs):
+            start = time.perf_counter()
+            extract_jars(native_jars(version, minecraft_dir), os.path.join(root, f"run{i}"))
+            results["extract"].append(time.perf_counter() - start)
+
+        cache_dir = os.path.join(root, "cache")
+        NativesCache(minecraft_dir, cache_dir).prepare(version)
+        for _ in range(runs):
+            # A fresh NativesCache each time, so this is a disk cache hit (as in a new launcher process)
+            start = time.perf_counter()
+            NativesCache(minecraft_dir, cache_dir).prepare(version)
+            results["cached"].append(time.perf_counter() - start)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark per-launch natives extraction against the natives cache.")
+    parser.add_argument("version", help="An installed version, e.g. 1.20.1")
+    parser.add_argument("--minecraft-dir", help="Minecraft directory (default: the standard one)")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    minecraft_dir = args.minecraft_dir or minecraft_launcher_lib.utils.get_minecraft_directory()
+    result = benchmark_launch_prep(args.version, minecraft_dir, args.runs)
+    extract = sum(result["extract"]) / len(result["extract"])
+    cached = sum(result["cached"]) / len(result["cached"])
+    print(f"{args.version} natives")
+    print(f"  extract per launch: {extract * 1000:.1f} ms")
+    print(f"  cached lookup:      {cached * 1000:.2f} ms ({extract / cached:.0f}x faster)")
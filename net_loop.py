@@ -0,0 +1,331 @@
+import os
+import ssl
+import json
+import queue
+import asyncio
+import threading
+import urllib.parse
+
+# ----------------------------------------
+# Constants
+# ----------------------------------------
+PER_HOST_LIMIT = 6          # Concurrent requests per host, like a browser
+DEFAULT_TIMEOUT = 30.0      # Seconds per exchange (connect + headers + body), counted once a host slot is free
+CONNECT_TIMEOUT = 10.0
+IDLE_TIMEOUT = 60.0         # Idle keep-alive connections older than this are dropped
+MAX_REDIRECTS = 5
+CHUNK_SIZE = 64 * 1024
+USER_AGENT = "PyLauncher/1.0"
+DISPATCH_INTERVAL_MS = 50   # How often the Tk loop drains finished network results
+
+
+class HttpError(Exception):
+    """Raised by Response.raise_for_status() for 4xx/5xx responses."""
+
+    def __init__(self, url, status, reason):
+        super().__init__(f"HTTP {status} {reason} for {url}")
+        self.url = url
+        self.status = status
+
+
+class Response:
+    def __init__(self, url, status, reason, headers, body):
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers  # Lower-cased header names
+        self.body = body        # bytes, or None when streamed to a file
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise HttpError(self.url, self.status, self.reason)
+        return self
+
+    def json(self):
+        return json.loads(self.body)
+
+
+# ----------------------------------------
+# Async HTTP/1.1 Client
+# ----------------------------------------
+
+class AsyncHttpClient:
+    """
+    Minimal HTTP/1.1 client on asyncio streams with keep-alive pooling.
+
+    Connections are pooled per (scheme, host, port) and reused until the
+    server closes them or they sit idle for IDLE_TIMEOUT. A per-host
+    semaphore caps concurrent requests; the timeout covers each exchange
+    (and each redirect hop) from the moment it holds a slot, so time spent
+    queued behind other requests to the same host never counts against it.
+    Must be used from the event loop that owns it.
+    """
+
+    def __init__(self, per_host_limit=PER_HOST_LIMIT, timeout=DEFAULT_TIMEOUT):
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self._idle = {}     # key -> [(reader, writer, idle_since)]
+        self._limits = {}   # key -> asyncio.Semaphore
+        self._ssl = ssl.create_default_context()
+
+    # ---------------- Public API ----------------
+    async def get(self, url, headers=None, timeout=None):
+        return await self.request("GET", url, headers=headers, timeout=timeout)
+
+    async def request(self, method, url, headers=None, body=None, timeout=None, sink=None):
+        """Performs a request, following redirects. `sink(bytes)` receives the body instead of buffering it."""
+        return await self._request(method, url, headers or {}, body, sink, timeout or self.timeout)
+
+    async def download(self, url, path, timeout=None):
+        """Streams url to path (via a temp file + rename). Returns the Response."""
+        tmp_path = path + ".part"
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        try:
+            with open(tmp_path, "wb") as f:
+                response = await self.request("GET", url, sink=f.write, timeout=timeout)
+            response.raise_for_status()
+            os.replace(tmp_path, path)
+            return response
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    async def close(self):
+        for connections in self._idle.values():
+            for _reader, writer, _since in connections:
+                writer.close()
+        self._idle.clear()
+
+    # ---------------- Internals ----------------
+    async def _request(self, method, url, headers, body, sink, timeout):
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urllib.parse.urlsplit(url)
+            response = await self._send(method, parts, headers, body, sink, timeout)
+            if response.status in (301, 302, 303, 307, 308) and "location" in response.headers:
+                url = urllib.parse.urljoin(url, response.headers["location"])
+                if response.status == 303:
+                    method, body = "GET", None
+                continue
+            return response
+        raise HttpError(url, 310, "Too many redirects")
+
+    async def _send(self, method, parts, headers, body, sink, timeout):
+        scheme = parts.scheme.lower()
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, parts.hostname, port)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+
+        limit = self._limits.get(key)
+        if limit is None:
+            limit = self._limits[key] = asyncio.Semaphore(self.per_host_limit)
+
+        async with limit:
+            # The timeout starts here, not while waiting for the slot
+            return await asyncio.wait_for(self._send_on_pool(key, method, parts, target, headers, body, sink), timeout)
+
+    async def _send_on_pool(self, key, method, parts, target, headers, body, sink):
+        written = 0
+
+        def counted(data):
+            nonlocal written
+            written += len(data)
+            sink(data)
+
+        # A pooled connection may have been closed by the server; retry once on a fresh one,
+        # but only if none of the body has reached the caller's sink yet
+        for attempt in range(2):
+            reader, writer, reused = await self._acquire(key)
+            try:
+                response, keep_alive = await self._exchange(
+                    reader, writer, method, parts, target, headers, body, counted if sink is not None else None
+                )
+            except ConnectionError:
+                writer.close()
+                if reused and attempt == 0 and method in ("GET", "HEAD") and not written:
+                    continue
+                raise
+            except BaseException:
+                writer.close()  # Timeouts/cancellation leave the stream in an unknown state
+                raise
+            if keep_alive:
+                self._idle.setdefault(key, []).append((reader, writer, asyncio.get_running_loop().time()))
+            else:
+                writer.close()
+            return response
+
+    async def _acquire(self, key):
+        now = asyncio.get_running_loop().time()
+        pool = self._idle.get(key, [])
+        while pool:
+            reader, writer, since = pool.pop()
+            if now - since < IDLE_TIMEOUT and not reader.at_eof() and not writer.is_closing():
+                return reader, writer, True
+            writer.close()
+        scheme, host, port = key
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=self._ssl if scheme == "https" else None),
+            CONNECT_TIMEOUT
+        )
+        return reader, writer, False
+
+    async def _exchange(self, reader, writer, method, parts, target, headers, body, sink):
+        host = parts.hostname if parts.port is None else f"{parts.hostname}:{parts.port}"
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {host}", f"User-Agent: {USER_AGENT}",
+                 "Accept-Encoding: identity", "Connection: keep-alive"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        if body is not None:
+            lines.append(f"Content-Length: {len(body)}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (body or b""))
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed before response")
+        version, status, reason = (status_line.decode("latin-1").rstrip("\r\n").split(" ", 2) + [""])[:3]
+        status = int(status)
+
+        response_headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        chunks = []
+        write = sink if sink is not None else chunks.append
+        if status in (301, 302, 303, 307, 308) and "location" in response_headers:
+            write = lambda data: None  # Redirect bodies never reach the caller's sink
+        delimited = True
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            pass
+        elif response_headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size = int((await reader.readline()).split(b";")[0].strip(), 16)
+                if size == 0:
+                    # Skip trailers
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                write(await reader.readexactly(size))
+                await reader.readexactly(2)
+        elif "content-length" in response_headers:
+            remaining = int(response_headers["content-length"])
+            while remaining:
+                data = await reader.readexactly(min(CHUNK_SIZE, remaining))
+                write(data)
+                remaining -= len(data)
+        else:
+            # Body runs to EOF; the connection can't be reused
+            delimited = False
+            while True:
+                data = await reader.read(CHUNK_SIZE)
+                if not data:
+                    break
+                write(data)
+
+        keep_alive = (
+            delimited
+            and version == "HTTP/1.1"
+            and response_headers.get("connection", "").lower() != "close"
+        )
+        url = urllib.parse.urlunsplit(parts)
+        return Response(url, status, reason, response_headers, b"".join(chunks) if sink is None else None), keep_alive
+
+
+# ----------------------------------------
+# Event Loop Thread + Tk Delivery
+# ----------------------------------------
+
+class TkDispatcher:
+    """
+    Runs callables on the Tk thread. Any thread may call `call_soon()`; the
+    queue is drained from root.after(), so widgets are only ever touched
+    from the Tk event loop.
+    """
+
+    def __init__(self, root, interval_ms=DISPATCH_INTERVAL_MS):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.queue = queue.Queue()
+        self.root.after(self.interval_ms, self._drain)
+
+    def call_soon(self, func, *args):
+        self.queue.put((func, args))
+
+    def _drain(self):
+        try:
+            while True:
+                func, args = self.queue.get_nowait()
+                try:
+                    func(*args)
+                except Exception as e:
+                    print(f"Error in network callback: {e}")
+        except queue.Empty:
+            pass
+        self.root.after(self.interval_ms, self._drain)
+
+
+class NetLoop:
+    """
+    One asyncio event loop on one background thread, owning one pooled
+    AsyncHttpClient. All launcher HTTP traffic goes through it, so dozens of
+    concurrent downloads cost a single thread. Results are handed to the Tk
+    thread through a TkDispatcher (or run directly if none is given).
+    """
+
+    def __init__(self, dispatcher=None, per_host_limit=PER_HOST_LIMIT, timeout=DEFAULT_TIMEOUT):
+        self.dispatcher = dispatcher
+        self.loop = asyncio.new_event_loop()
+        self.client = AsyncHttpClient(per_host_limit=per_host_limit, timeout=timeout)
+        self._thread = threading.Thread(target=self._run, name="NetLoop", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """Schedules a coroutine on the network loop; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def _deliver(self, future, on_done, on_error):
+        def done(f):
+            try:
+                callback, value = on_done, f.result()
+            except BaseException as e:
+                if on_error is None:
+                    print(f"Network request failed: {e}")
+                    return
+                callback, value = on_error, e
+            if callback is None:
+                return
+            if self.dispatcher is not None:
+                self.dispatcher.call_soon(callback, value)
+            else:
+                callback(value)
+        future.add_done_callback(done)
+        return future
+
+    def fetch(self, url, on_done=None, on_error=None, headers=None, timeout=None):
+        """GETs url and delivers the Response (or the exception) to the Tk thread."""
+        return self._deliver(self.submit(self.client.get(url, headers=headers, timeout=timeout)), on_done, on_error)
+
+    def download(self, url, path, on_done=None, on_error=None, timeout=None):
+        """Streams url to path and delivers the Response (or the exception) to the Tk thread."""
+        return self._deliver(self.submit(self.client.download(url, path, timeout=timeout)), on_done, on_error)
+
+    def run_blocking(self, func, *args, on_done=None, on_error=None):
+        """
+        Runs a blocking call (e.g. a minecraft_launcher_lib function) on the loop's
+        bounded executor instead of an ad-hoc Thread, delivering the result like fetch().
+        """
+        async def call():
+            return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+        return self._deliver(self.submit(call()), on_done, on_error)
+
+    def close(self):
+        self.submit(self.client.close()).result(timeout=5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
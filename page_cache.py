@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+import os
+import time
+import shutil
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+import minecraft_launcher_lib
+from install_verify import expected_files
+
+# ----------------------------------------
+# Constants
+# ----------------------------------------
+PREWARM_WORKERS = 4                     # Enough to keep a disk's queue busy with metadata reads in flight
+MEMORY_FRACTION = 0.25                  # Never ask the kernel to cache more than this share of available memory...
+MAX_BUDGET = 2 * 1024 ** 3              # ...or this much
+DEFAULT_BUDGET = 512 * 1024 ** 2        # When available memory can't be read
+MIN_AVAILABLE = 256 * 1024 ** 2         # Stop prewarming if available memory falls below this
+PRESSURE_CHECK_BYTES = 64 * 1024 ** 2   # Re-read available memory after this many bytes
+WARM_FOR = 10 * 60                      # Seconds a finished prewarm counts as warm for launch telemetry
+READ_CHUNK = 1024 * 1024
+JVM_FILES = (("lib", "modules"), ("lib", "server", "libjvm.so"), ("lib", "server", "classes.jsa"))
+
+PREWARM_TAG = "prewarmed"               # Appended to the telemetry profile of launches that followed a prewarm
+
+
+# ----------------------------------------
+# Utility Functions
+# ----------------------------------------
+
+def memory_available():
+    """Bytes the kernel could hand out without swapping (MemAvailable), or None if unknown."""
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def default_budget():
+    available = memory_available()
+    if available is None:
+        return DEFAULT_BUDGET
+    return int(min(MAX_BUDGET, available * MEMORY_FRACTION))
+
+
+def java_files(java_path):
+    """The JVM's own startup files (module image, libjvm, default CDS archive) for a java executable."""
+    java = shutil.which(java_path) if java_path else None
+    if not java:
+        return []
+    java_home = os.path.dirname(os.path.dirname(os.path.realpath(java)))
+    return [os.path.join(java_home, *parts) for parts in JVM_FILES]
+
+
+def launch_files(version, minecraft_dir, java_path=None):
+    """
+    The files a launch of `version` reads, in the order it reads them: the
+    JVM, the client jar and libraries, the logging config and asset index,
+    then the asset objects. Only files that exist are returned, as (path, size).
+    """
+    paths = java_files(java_path) + [entry["path"] for entry in expected_files(version, minecraft_dir)]
+    files = []
+    for path in paths:
+        try:
+            files.append((path, os.path.getsize(path)))
+        except OSError:
+            continue
+    return files
+
+
+def will_need(path):
+    """Asks the kernel to read a whole file into the page cache, without waiting for it."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        else:
+            # No fadvise (macOS, Windows): reading it through has the same effect, synchronously
+            while os.read(fd, READ_CHUNK):
+                pass
+    finally:
+        os.close(fd)
+
+
+def drop_cached(path):
+    """Asks the kernel to drop a file's clean pages from the page cache (benchmarks only)."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+# ----------------------------------------
+# Prewarmer
+# ----------------------------------------
+
+class PageCachePrewarmer:
+    """
+    Pulls the files a version's launch will read into the page cache while
+    the user is still in the launcher, so a cold launch on a spinning disk
+    or a network home directory reads from memory instead.
+
+    prewarm() plans the files on a background thread and hands them to a
+    small thread pool that issues posix_fadvise(WILLNEED) per file; the
+    kernel does the reading. The total is capped by a budget derived from
+    MemAvailable, which is re-checked as we go, so prewarming never pushes
+    a machine under memory pressure into evicting something more useful.
+    Selecting another version supersedes the previous prewarm.
+    """
+
+    def __init__(self, minecraft_dir, workers=PREWARM_WORKERS):
+        self.minecraft_dir = minecraft_dir
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="PageCache")
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._finished = {}  # version -> time.monotonic() of its last complete prewarm
+
+    def prewarm(self, version, java_path=None, budget=None):
+        """Starts prewarming `version`; returns a Future of the report dict."""
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        future = Future()
+        threading.Thread(
+            target=self._run, args=(future, generation, version, java_path, budget),
+            name="PageCachePlan", daemon=True
+        ).start()
+        return future
+
+    def is_warm(self, version):
+        finished = self._finished.get(version)
+        return finished is not None and time.monotonic() - finished < WARM_FOR
+
+    def _run(self, future, generation, version, java_path, budget):
+        start = time.perf_counter()
+        budget = budget or default_budget()
+        report = {"version": version, "files": 0, "bytes": 0, "skipped": 0, "budget": budget, "stopped": None}
+        try:
+            files = launch_files(version, self.minecraft_dir, java_path)
+            pending, submitted, next_check = [], 0, PRESSURE_CHECK_BYTES
+            for i, (path, size) in enumerate(files):
+                if generation != self._generation:
+                    report["stopped"] = "superseded"
+                elif submitted + size > budget:
+                    report["stopped"] = "budget"
+                elif submitted >= next_check:
+                    next_check += PRESSURE_CHECK_BYTES
+                    available = memory_available()
+                    if available is not None and available < MIN_AVAILABLE:
+                        report["stopped"] = "memory"
+                if report["stopped"]:
+                    report["skipped"] = len(files) - i
+                    break
+                pending.append(self._pool.submit(will_need, path))
+                submitted += size
+            wait(pending)
+            for f in pending:
+                if not f.cancelled() and f.exception() is None:
+                    report["files"] += 1
+            report["bytes"] = submitted
+            if report["stopped"] is None:
+                self._finished[version] = time.monotonic()
+        except Exception as e:
+            report["stopped"] = f"{type(e).__name__}: {e}"
+        report["seconds"] = round(time.perf_counter() - start, 3)
+        future.set_result(report)
+
+    def shutdown(self):
+        with self._lock:
+            self._generation += 1  # Stops a running plan at its next file
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ----------------------------------------
+# Benchmark
+# ----------------------------------------
+
+def _read_all(files):
+    start = time.perf_counter()
+    for path, _size in files:
+        with open(path, "rb") as f:
+            while f.read(READ_CHUNK):
+                pass
+    return time.perf_counter() - start
+
+
+def benchmark_cold_vs_warm(version, minecraft_dir, java_path=None, runs=3):
+    """
+    Times reading every file a launch of `version` reads, after dropping them
+    from the page cache (cold) and after dropping them and prewarming (warm).
+    Dropping only evicts clean, unmapped pages, so on a busy machine "cold"
+    can be partly warm. Returns {"cold": [s, ...], "warm": [s, ...], "prewarm": [report, ...]}.
+    """
+    files = launch_files(version, minecraft_dir, java_path)
+    results = {"cold": [], "warm": [], "prewarm": []}
+    prewarmer = PageCachePrewarmer(minecraft_dir)
+    try:
+        for _ in range(runs):
+            for path, _size in files:
+                drop_cached(path)
+            results["cold"].append(_read_all(files))
+            for path, _size in files:
+                drop_cached(path)
+            report = prewarmer.prewarm(version, java_path, budget=MAX_BUDGET).result()
+            time.sleep(1.0)  # WILLNEED only queues the reads; give the disk the time the user spends clicking
+            results["prewarm"].append(report)
+            results["warm"].append(_read_all(files))
+    finally:
+        prewarmer.shutdown()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark reading a version's launch files cold against prewarmed.")
+    parser.add_argument("version", help="An installed version, e.g. 1.20.1")
+    parser.add_argument("--minecraft-dir", help="Minecraft directory (default: the standard one)")
+    parser.add_argument("--java", help="Java executable whose runtime files to include")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    minecraft_dir = args.minecraft_dir or minecraft_launcher_lib.utils.get_minecraft_directory()
+    result = benchmark_cold_vs_warm(args.version, minecraft_dir, args.java, args.runs)
+    cold = sum(result["cold"]) / len(result["cold"])
+    warm = sum(result["warm"]) / len(result["warm"])
+    report = result["prewarm"][-1]
+    print(f"{args.version}: {report['files']} files, {report['bytes'] / 1024 ** 2:.1f} MiB "
+          f"(budget {default_budget() / 1024 ** 2:.0f} MiB)")
+    print(f"  cold read:      {cold * 1000:.1f} ms")
+    print(f"  prewarmed read: {warm * 1000:.1f} ms ({(cold - warm) * 1000:.1f} ms saved, "
+          f"prewarm took {report['seconds'] * 1000:.1f} ms)")
@@ -0,0 +1,206 @@
+import os
+import math
+import time
+import argparse
+import statistics
+import pygame
+
+# Audio configuration constants
+SAMPLE_RATE = 44100
+DEFAULT_BUFFER = 512     # Samples per mixer callback: smaller is lower latency but costs more wakeups
+DEFAULT_VOICES = 8       # Fixed number of mixer channels sound effects may use
+LATENCY_PROBE_MS = 50    # Length of the silent sound used to measure output latency
+
+# Priorities: a sound may only steal a voice that is playing something of equal or lower priority
+PRIORITY_LOW = 0         # e.g. wall bounces
+PRIORITY_NORMAL = 1      # e.g. paddle hits
+PRIORITY_HIGH = 2        # e.g. scoring
+
+
+def init_audio(buffer=DEFAULT_BUFFER, frequency=SAMPLE_RATE):
+    """Pre-initializes the mixer (stereo, so sounds can be panned). Call before pygame.init()."""
+    pygame.mixer.pre_init(frequency, -16, 2, buffer)
+
+
+def buffer_latency(buffer=DEFAULT_BUFFER):
+    """
+    The output latency a mixer buffer of `buffer` samples adds, in ms: one
+    buffer is mixed ahead of what the device is playing. Uses the mixer's
+    actual frequency when it is initialized.
+    """
+    init = pygame.mixer.get_init()
+    frequency = init[0] if init else SAMPLE_RATE
+    return buffer / frequency * 1000
+
+
+def measure_latency(trials=5):
+    """
+    Measures how late the mixer's end event for a short sound arrives
+    compared with the sound's nominal length, in ms (median of `trials`).
+    This is the jitter of the mixer callback and event delivery as the game
+    loop sees it, not the output latency: sound reaches the speakers about
+    buffer_latency() later still, which pygame cannot observe. Returns None
+    if the mixer isn't initialized.
+    """
+    init = pygame.mixer.get_init()
+    if not init:
+        return None
+    frequency, size, channels = init
+    frame_bytes = abs(size) // 8 * channels
+    probe = pygame.mixer.Sound(buffer=bytes(frame_bytes * (frequency * LATENCY_PROBE_MS // 1000)))
+    # Probe on an extra channel past the others: find_channel(True) would take over
+    # one of VoiceManager's reserved voices and leave its name and priority stale
+    num_channels = pygame.mixer.get_num_channels()
+    pygame.mixer.set_num_channels(num_channels + 1)
+    channel = pygame.mixer.Channel(num_channels)
+    end_event = pygame.event.custom_type()
+    channel.set_endevent(end_event)
+    delays = []
+    try:
+        for _ in range(trials):
+            pygame.event.clear(end_event)
+            start = time.perf_counter()
+            channel.play(probe)
+            deadline = start + 1.0
+            while not pygame.event.get(end_event) and time.perf_counter() < deadline:
+                time.sleep(0.0005)
+            delays.append(max(0.0, (time.perf_counter() - start) * 1000 - LATENCY_PROBE_MS))
+    finally:
+        channel.set_endevent()
+        channel.stop()
+        pygame.mixer.set_num_channels(num_channels)
+    return statistics.median(delays)
+
+
+# One mixer channel and what it is currently playing
+class Voice:
+    def __init__(self, channel):
+        self.channel = channel
+        self.name = None
+        self.priority = -1
+        self.started = 0.0
+
+    def busy(self):
+        return self.channel.get_busy()
+
+
+class VoiceManager:
+    """
+    Plays sound effects on a fixed pool of voices (mixer channels).
+
+    - When every voice is busy, the new sound takes the voice playing the
+      oldest sound of the lowest priority, but only if that priority is not
+      higher than its own; otherwise the new sound is dropped.
+    - Each sound plays at most `max_per_frame` times per frame, so a hundred
+      balls hitting the wall in one frame make one bounce, not a hundred.
+    - Sounds are panned by a position from 0.0 (left) to 1.0 (right).
+    """
+
+    def __init__(self, voices=DEFAULT_VOICES):
+        pygame.mixer.set_num_channels(voices)
+        pygame.mixer.set_reserved(voices)  # Sound.play() elsewhere can't take our voices behind our back
+        self.voices = [Voice(pygame.mixer.Channel(i)) for i in range(voices)]
+        self.sounds = {}
+        self.frame_counts = {}
+        self.stats = {"played": 0, "stolen": 0, "rate_limited": 0, "dropped": 0}
+        self.stereo = pygame.mixer.get_init()[2] >= 2
+
+    def add(self, name, sound, priority=PRIORITY_NORMAL, max_per_frame=1, volume=1.0):
+        self.sounds[name] = (sound, priority, max_per_frame, volume)
+
+    def begin_frame(self):
+        """Call once per game frame to reset the per-frame rate limits."""
+        self.frame_counts.clear()
+
+    def _pick_voice(self, priority):
+        victim = None
+        for voice in self.voices:
+            if not voice.busy():
+                return voice, False
+            if voice.priority <= priority and (
+                    victim is None or (voice.priority, voice.started) < (victim.priority, victim.started)):
+                victim = voice
+        return victim, True
+
+    def play(self, name, pan=0.5):
+        """Plays a registered sound. Returns the Channel used, or None if it was rate limited or dropped."""
+        sound, priority, max_per_frame, volume = self.sounds[name]
+        count = self.frame_counts.get(name, 0)
+        if count >= max_per_frame:
+            self.stats["rate_limited"] += 1
+            return None
+        self.frame_counts[name] = count + 1  # A dropped attempt still uses up this frame's turn
+        voice, stealing = self._pick_voice(priority)
+        if voice is None:
+            self.stats["dropped"] += 1
+            return None
+        if stealing:
+            self.stats["stolen"] += 1
+        voice.channel.play(sound)
+        if self.stereo:
+            # Constant-power pan law: equal loudness as a sound moves across the field
+            angle = min(max(pan, 0.0), 1.0) * math.pi / 2
+            voice.channel.set_volume(volume * math.cos(angle), volume * math.sin(angle))
+        else:
+            voice.channel.set_volume(volume)
+        voice.name, voice.priority, voice.started = name, priority, time.perf_counter()
+        self.stats["played"] += 1
+        return voice.channel
+
+    def active(self):
+        return sum(1 for voice in self.voices if voice.busy())
+
+
+# ----------------------------------------
+# Headless Check
+# ----------------------------------------
+
+def headless_check(buffers=(256, 512, 1024, 2048), voices=DEFAULT_VOICES, frames=120, hits_per_frame=200):
+    """
+    Runs the voice manager under the dummy audio driver: a multi-ball scene
+    firing `hits_per_frame` bounce sounds every frame, plus scoring sounds.
+    Checks the pool never exceeds its voices, rate limits hold and scoring
+    sounds are never dropped. Returns {buffer: stats} with measured latency.
+    """
+    from Pong4kv0 import generate_sound
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    results = {}
+    for buffer in buffers:
+        init_audio(buffer)
+        pygame.init()
+        manager = VoiceManager(voices)
+        manager.add("beep", generate_sound(1000, 100), PRIORITY_LOW)
+        manager.add("paddle", generate_sound(800, 100), PRIORITY_NORMAL)
+        manager.add("boop", generate_sound(500, 300), PRIORITY_HIGH, max_per_frame=4)
+        score_misses = 0
+        busy = 0.0
+        for frame in range(frames):
+            start = time.perf_counter()
+            manager.begin_frame()
+            for i in range(hits_per_frame):
+                manager.play("beep" if i % 2 else "paddle", pan=(i % 80) / 80)
+            if frame % 10 == 0 and manager.play("boop", pan=0.0) is None:
+                score_misses += 1
+            assert manager.active() <= voices
+            assert manager.frame_counts.get("beep", 0) <= 1 and manager.frame_counts.get("paddle", 0) <= 1
+            busy += time.perf_counter() - start
+            time.sleep(1 / 60)  # Let sounds finish at game speed
+        per_frame_us = busy * 1e6 / frames
+        assert score_misses == 0, "high-priority sounds were dropped"
+        results[buffer] = dict(manager.stats, nominal_ms=round(buffer_latency(buffer), 1),
+                               end_event_ms=round(measure_latency(), 1), us_per_frame=round(per_frame_us))
+        assert pygame.mixer.get_num_channels() == voices, "the latency probe left its channel behind"
+        pygame.quit()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the Pong voice manager headlessly and measure mixer latency.")
+    parser.add_argument("--buffers", type=int, nargs="+", default=[256, 512, 1024, 2048])
+    parser.add_argument("--voices", type=int, default=DEFAULT_VOICES)
+    args = parser.parse_args()
+
+    for buffer, stats in headless_check(args.buffers, args.voices).items():
+        print(f"buffer {buffer:>5}: latency {stats['nominal_ms']:>5} ms nominal, end event {stats['end_event_ms']} ms late, "
+              f"{stats['played']} played, {stats['stolen']} stolen, {stats['rate_limited']} rate limited, "
+              f"{stats['dropped']} dropped, {stats['us_per_frame']} us/frame")
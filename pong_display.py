@@ -0,0 +1,187 @@
+import os
+import time
+import argparse
+import pygame
+from Pong4kv0 import SCREEN_WIDTH, SCREEN_HEIGHT, BALL_SIZE, PADDLE_WIDTH, PADDLE_HEIGHT, WHITE, BLACK
+
+# Display configuration constants
+MODES = ("fit", "integer", "scaled")
+TEXT_CACHE_SIZE = 256    # Rendered strings kept per output size (scores change rarely, so this is plenty)
+
+
+class Display:
+    """
+    Game logic stays in logical pixels (SCREEN_WIDTH x SCREEN_HEIGHT); the
+    Display maps them to whatever the window is.
+
+    - "fit" scales by any factor that fits the window, "integer" by the
+      largest whole factor (crisp pixels), both letterboxed. Drawing goes
+      straight into the window at output resolution through rect(), blit()
+      and text(), with sprites and glyphs scaled once per output size and
+      cached, so a resize costs one rescale and a frame costs no scaling.
+    - "scaled" lets SDL scale a logical-size window (pygame.SCALED), which is
+      also the only mode that can wait for vsync.
+    - Renderers that work on raw pixels at logical size (party mode) draw
+      into logical_surface(); only then does present() scale a whole frame.
+    """
+
+    def __init__(self, logical_size=(SCREEN_WIDTH, SCREEN_HEIGHT), size=None, fullscreen=False, mode="fit",
+                 vsync=False):
+        if mode not in MODES:
+            raise ValueError(f"Unknown display mode {mode!r}, expected one of {', '.join(MODES)}")
+        self.logical_size = logical_size
+        self.mode = mode
+        self.fullscreen = fullscreen
+        self.vsync = vsync
+        self.sprites = {}        # key: logical-size source surface
+        self._scaled = {}        # key: source scaled for the current output size
+        self._fonts = {}
+        self._text = {}
+        self._logical = None
+        self._logical_used = False
+        self.dirty = []          # Canvas rects drawn since the last clear(), for effects that only touch content
+        self._open(size or logical_size)
+
+    def _open(self, size):
+        if self.mode == "scaled":
+            flags = pygame.SCALED | (pygame.FULLSCREEN if self.fullscreen else 0)
+            self.window = pygame.display.set_mode(self.logical_size, flags, vsync=int(self.vsync))
+        elif self.fullscreen:
+            self.window = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        else:
+            self.window = pygame.display.set_mode(size, pygame.RESIZABLE)
+        width, height = self.window.get_size()
+        logical_w, logical_h = self.logical_size
+        scale = min(width / logical_w, height / logical_h)
+        if self.mode == "integer":
+            scale = max(1, int(scale))
+        self.scale = scale
+        content = pygame.Rect(0, 0, round(logical_w * scale), round(logical_h * scale))
+        content.center = self.window.get_rect().center
+        self.window.fill(BLACK)  # Letterbox bars are painted once per resize, not every frame
+        self.canvas = self.window.subsurface(content.clip(self.window.get_rect()))
+        self._scaled.clear()
+        self._fonts.clear()
+        self._text.clear()
+
+    def handle_event(self, event):
+        """Reopens the window at its new size after a resize. Returns True if the event was a resize."""
+        if event.type == pygame.VIDEORESIZE and self.mode != "scaled" and not self.fullscreen:
+            self._open(event.size)
+            return True
+        return False
+
+    def to_screen(self, rect):
+        """Maps a logical rect to canvas pixels. Edges are rounded separately so neighbours never gap."""
+        x, y, w, h = rect
+        left, top = round(x * self.scale), round(y * self.scale)
+        return pygame.Rect(left, top, round((x + w) * self.scale) - left, round((y + h) * self.scale) - top)
+
+    def clear(self, color=BLACK):
+        self.canvas.fill(color)
+        self.dirty.clear()
+
+    def rect(self, color, rect):
+        self.dirty.append(self.canvas.fill(color, self.to_screen(rect)))
+
+    def add_sprite(self, key, surface):
+        """Registers a logical-size sprite for blit()."""
+        self.sprites[key] = surface
+        self._scaled.pop(key, None)
+
+    def blit(self, key, pos):
+        image = self._scaled.get(key)
+        if image is None:
+            source = self.sprites[key]
+            size = self.to_screen(source.get_rect()).size
+            scale = pygame.transform.scale if self.mode == "integer" else pygame.transform.smoothscale
+            image = self._scaled[key] = scale(source, size).convert_alpha() if source.get_alpha() is not None \
+                else scale(source, size).convert()
+        self.dirty.append(self.canvas.blit(image, (round(pos[0] * self.scale), round(pos[1] * self.scale))))
+
+    def text(self, string, size, color, center):
+        """Draws `string` with the default font at logical point `size`, rendered at output size and cached."""
+        key = (string, size, color)
+        image = self._text.get(key)
+        if image is None:
+            font = self._fonts.get(size)
+            if font is None:
+                font = self._fonts[size] = pygame.font.Font(None, max(1, round(size * self.scale)))
+            if len(self._text) >= TEXT_CACHE_SIZE:
+                self._text.clear()
+            image = self._text[key] = font.render(string, True, color)
+        self.dirty.append(self.canvas.blit(
+            image, image.get_rect(center=(round(center[0] * self.scale), round(center[1] * self.scale)))))
+
+    def logical_surface(self):
+        """A logical-size surface for pixel-level renderers; present() scales it onto the canvas."""
+        if self.scale == 1 and self.canvas.get_size() == self.logical_size:
+            return self.canvas
+        if self._logical is None:
+            self._logical = pygame.Surface(self.logical_size).convert()
+        self._logical_used = True
+        return self._logical
+
+    def present(self):
+        if self._logical_used:
+            scale = pygame.transform.scale if self.mode == "integer" else pygame.transform.smoothscale
+            scale(self._logical, self.canvas.get_size(), self.canvas)
+            self._logical_used = False
+        pygame.display.flip()
+
+
+def solid_sprite(width, height, color=WHITE):
+    image = pygame.Surface((width, height))
+    image.fill(color)
+    return image
+
+
+# ----------------------------------------
+# Benchmark
+# ----------------------------------------
+
+def render_ms(size, mode="fit", frames=120, logical=False):
+    """
+    Mean ms to draw and present the classic Pong scene at an output size.
+    With `logical`, the scene is drawn at logical size and the whole frame
+    is scaled every frame instead, for comparison.
+    """
+    display = Display(size=size, mode=mode)
+    display.add_sprite("paddle", solid_sprite(PADDLE_WIDTH, PADDLE_HEIGHT))
+    display.add_sprite("ball", solid_sprite(BALL_SIZE, BALL_SIZE))
+    font = pygame.font.Font(None, 36)
+    start = time.perf_counter()
+    for frame in range(frames):
+        ball = (frame * 5 % SCREEN_WIDTH, frame * 3 % SCREEN_HEIGHT)
+        if logical:
+            surface = display.logical_surface()
+            surface.fill(BLACK)
+            pygame.draw.rect(surface, WHITE, (20, 250, PADDLE_WIDTH, PADDLE_HEIGHT))
+            pygame.draw.rect(surface, WHITE, (SCREEN_WIDTH - 30, 250, PADDLE_WIDTH, PADDLE_HEIGHT))
+            pygame.draw.rect(surface, WHITE, (*ball, BALL_SIZE, BALL_SIZE))
+            text = font.render(f"{frame // 60}   0", True, WHITE)
+            surface.blit(text, text.get_rect(center=(SCREEN_WIDTH // 2, 30)))
+        else:
+            display.clear()
+            display.blit("paddle", (20, 250))
+            display.blit("paddle", (SCREEN_WIDTH - 30, 250))
+            display.blit("ball", ball)
+            display.text(f"{frame // 60}   0", 36, WHITE, (SCREEN_WIDTH // 2, 30))
+        display.present()
+    return (time.perf_counter() - start) * 1000 / frames
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare cached pre-scaled rendering with scaling every frame.")
+    parser.add_argument("--sizes", nargs="+", default=["800x600", "1920x1080", "2560x1440", "3840x2160"])
+    parser.add_argument("--mode", choices=("fit", "integer"), default="fit")
+    parser.add_argument("--frames", type=int, default=120)
+    args = parser.parse_args()
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    for text in args.sizes:
+        size = tuple(int(n) for n in text.split("x"))
+        cached = render_ms(size, args.mode, args.frames)
+        scaled = render_ms(size, args.mode, args.frames, logical=True)
+        print(f"{text:>10}: {cached:6.2f} ms/frame cached pre-scaled, {scaled:6.2f} ms/frame scaling every frame")
@@ -0,0 +1,387 @@
+import time
+import argparse
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from Pong4kv0 import SCREEN_WIDTH, SCREEN_HEIGHT, BALL_SIZE, PADDLE_WIDTH, PADDLE_HEIGHT, PADDLE_SPEED, AI_SPEED
+
+# Environment configuration constants
+STAY, UP, DOWN = 0, 1, 2     # Discrete actions for the agent's (left) paddle
+N_ACTIONS = 3
+OBS_DIM = 6                  # ball x, ball y, ball dx, ball dy, agent paddle y, opponent paddle y (all scaled)
+SCORE_LIMIT = 5              # An episode ends when either side reaches this score...
+MAX_STEPS = 10_000           # ...or after this many frames
+PLAYER_X = 20                                  # Same paddle positions as Pong4kv0
+OPPONENT_X = SCREEN_WIDTH - 20 - PADDLE_WIDTH
+VELOCITY_SCALE = 10.0        # Velocities are divided by this in observations
+
+_ACTION_DY = np.array([0, -PADDLE_SPEED, PADDLE_SPEED], dtype=np.float32)
+
+
+# Many Pong games stepped together: every piece of state is one array with an entry per environment
+class PongVecEnv:
+    """
+    reset()/step() over the Pong4kv0 rules for num_envs games at once.
+
+    The agent controls the left paddle; the right paddle plays the game's
+    built-in AI. step() returns (obs, reward, terminated, truncated, info)
+    like a gymnasium vector env, and games that finish are reset
+    automatically. obs, reward, terminated and truncated are the same
+    preallocated arrays on every call (copy them to keep a history); the
+    step itself allocates nothing.
+    """
+
+    def __init__(self, num_envs, frame_skip=1, seed=None, buffers=None):
+        self.num_envs = num_envs
+        self.frame_skip = frame_skip
+        self.rng = np.random.default_rng(seed)
+        n = num_envs
+        f32 = np.float32
+
+        # Game state
+        self.bx, self.by, self.vx, self.vy = (np.zeros(n, f32) for _ in range(4))
+        self.py = np.zeros(n, f32)   # Agent paddle top
+        self.oy = np.zeros(n, f32)   # Opponent paddle top
+        self.agent_score = np.zeros(n, np.int32)
+        self.opponent_score = np.zeros(n, np.int32)
+        self.steps = np.zeros(n, np.int32)
+
+        # Outputs (optionally views into shared memory, see SubprocVecEnv)
+        if buffers is None:
+            buffers = (np.zeros((n, OBS_DIM), f32), np.zeros(n, f32), np.zeros(n, bool), np.zeros(n, bool))
+        self.obs, self.reward, self.terminated, self.truncated = buffers
+
+        # Scratch space reused every frame
+        self._a, self._b, self._rand = np.zeros(n, f32), np.zeros(n, f32), np.zeros(n, np.float64)
+        self._m1, self._m2, self._m3, self._done, self._running = (np.zeros(n, bool) for _ in range(5))
+        self._all = np.ones(n, bool)
+
+    # ---------------- Episode handling ----------------
+    def _launch(self, where):
+        """Ball.launch for the environments in mask `where`: center, dx +-4, dy in -3..3 (0 becomes 2)."""
+        np.copyto(self.bx, SCREEN_WIDTH // 2 - BALL_SIZE // 2, where=where)
+        np.copyto(self.by, SCREEN_HEIGHT // 2 - BALL_SIZE // 2, where=where)
+        self.rng.random(out=self._rand)
+        np.less(self._rand, 0.5, out=self._m3)
+        np.multiply(self._m3, -8, out=self._a)
+        self._a += 4
+        np.copyto(self.vx, self._a, where=where)
+        self.rng.random(out=self._rand)
+        np.multiply(self._rand, 7, out=self._a)
+        np.floor(self._a, out=self._a)
+        self._a -= 3
+        np.equal(self._a, 0, out=self._m3)
+        np.copyto(self._a, 2, where=self._m3)
+        np.copyto(self.vy, self._a, where=where)
+
+    def _reset_where(self, where):
+        middle = (SCREEN_HEIGHT - PADDLE_HEIGHT) // 2
+        np.copyto(self.py, middle, where=where)
+        np.copyto(self.oy, middle, where=where)
+        np.copyto(self.agent_score, 0, where=where)
+        np.copyto(self.opponent_score, 0, where=where)
+        np.copyto(self.steps, 0, where=where)
+        self._launch(where)
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self._reset_where(self._all)
+        self._observe()
+        return self.obs
+
+    def _observe(self):
+        np.multiply(self.bx, 1 / SCREEN_WIDTH, out=self.obs[:, 0])
+        np.multiply(self.by, 1 / SCREEN_HEIGHT, out=self.obs[:, 1])
+        np.multiply(self.vx, 1 / VELOCITY_SCALE, out=self.obs[:, 2])
+        np.multiply(self.vy, 1 / VELOCITY_SCALE, out=self.obs[:, 3])
+        np.multiply(self.py, 1 / SCREEN_HEIGHT, out=self.obs[:, 4])
+        np.multiply(self.oy, 1 / SCREEN_HEIGHT, out=self.obs[:, 5])
+
+    # ---------------- Rules ----------------
+    def _paddle_hit(self, paddle_x, paddle_y, out):
+        """Ball/paddle rect overlap (colliderect) for every environment, written into `out`."""
+        a, m = self._a, self._m3
+        np.less(self.bx, paddle_x + PADDLE_WIDTH, out=out)
+        np.greater(self.bx, paddle_x - BALL_SIZE, out=m)
+        out &= m
+        np.add(paddle_y, PADDLE_HEIGHT, out=a)
+        np.less(self.by, a, out=m)
+        out &= m
+        np.subtract(paddle_y, BALL_SIZE, out=a)
+        np.greater(self.by, a, out=m)
+        out &= m
+
+    def _bounce_off_paddle(self, paddle_y, new_x, where):
+        """The ball's response to a paddle hit: move it outside, add spin by hit position, reverse dx."""
+        a, b = self._a, self._b
+        np.copyto(self.bx, new_x, where=where)
+        np.subtract(self.by, paddle_y, out=a)
+        a += (BALL_SIZE - PADDLE_HEIGHT) / 2             # ball center - paddle center
+        np.multiply(a, 2 / (PADDLE_HEIGHT / 2), out=b)   # hit_position * 2
+        np.add(self.vy, b, out=self.vy, where=where)
+        np.negative(self.vx, out=self.vx, where=where)
+
+    def _frame(self, actions):
+        a, b, m1, m2 = self._a, self._b, self._m1, self._m2
+
+        # Agent paddle
+        np.take(_ACTION_DY, actions, out=a)
+        self.py += a
+        np.clip(self.py, 0, SCREEN_HEIGHT - PADDLE_HEIGHT, out=self.py)
+
+        # Opponent AI: chase the ball once it comes over the middle toward it, otherwise drift to the center
+        np.greater(self.vx, 0, out=m1)
+        np.greater(self.bx, SCREEN_WIDTH // 2, out=m2)
+        m1 &= m2
+        b.fill(SCREEN_HEIGHT // 2)
+        np.add(self.by, BALL_SIZE / 2, out=a)
+        np.copyto(b, a, where=m1)
+        np.subtract(b, self.oy, out=a)
+        a -= PADDLE_HEIGHT / 2
+        np.sign(a, out=a)
+        a *= AI_SPEED
+        self.oy += a
+        np.clip(self.oy, 0, SCREEN_HEIGHT - PADDLE_HEIGHT, out=self.oy)
+
+        # Ball
+        self.bx += self.vx
+        self.by += self.vy
+        np.less_equal(self.by, 0, out=m1)
+        np.copyto(self.by, 0, where=m1)
+        np.greater_equal(self.by, SCREEN_HEIGHT - BALL_SIZE, out=m2)
+        np.copyto(self.by, SCREEN_HEIGHT - BALL_SIZE, where=m2)
+        m1 |= m2
+        np.negative(self.vy, out=self.vy, where=m1)
+
+        # Paddles (the opponent's only if the agent's wasn't hit, like the if/elif in the game loop)
+        self._paddle_hit(PLAYER_X, self.py, m1)
+        self._bounce_off_paddle(self.py, PLAYER_X + PADDLE_WIDTH, m1)
+        self._paddle_hit(OPPONENT_X, self.oy, m2)
+        np.logical_not(m1, out=m1)
+        m2 &= m1
+        self._bounce_off_paddle(self.oy, OPPONENT_X - BALL_SIZE, m2)
+
+        # Scoring (rewards only count for games still running during this step's skipped frames)
+        np.less(self.bx, 0, out=m1)
+        np.greater(self.bx, SCREEN_WIDTH, out=m2)
+        np.logical_not(self._done, out=self._running)
+        m1 &= self._running
+        m2 &= self._running
+        self.opponent_score += m1
+        self.agent_score += m2
+        np.subtract(self.reward, m1, out=self.reward)
+        np.add(self.reward, m2, out=self.reward)
+        m1 |= m2
+        self._launch(m1)
+
+        self.steps += self._running
+        np.greater_equal(self.agent_score, SCORE_LIMIT, out=m1)
+        np.greater_equal(self.opponent_score, SCORE_LIMIT, out=m2)
+        m1 |= m2
+        self.terminated |= m1
+        np.greater_equal(self.steps, MAX_STEPS, out=m2)
+        self.truncated |= m2
+        np.logical_or(self.terminated, self.truncated, out=self._done)
+
+    def step(self, actions):
+        """actions: int array (num_envs,) of STAY/UP/DOWN, repeated for frame_skip frames."""
+        self.reward.fill(0)
+        self.terminated.fill(False)
+        self.truncated.fill(False)
+        self._done.fill(False)
+        for _ in range(self.frame_skip):
+            self._frame(actions)
+        if self._done.any():
+            self._reset_where(self._done)  # Autoreset: obs below is the first of the next game
+        self._observe()
+        return self.obs, self.reward, self.terminated, self.truncated, {}
+
+    def close(self):
+        pass
+
+
+# ----------------------------------------
+# Subprocess Vector Env
+# ----------------------------------------
+
+def _shared_array(shm, shape, dtype, offset):
+    array = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+    return array, offset + array.nbytes
+
+
+def _layout(num_envs):
+    """(shape, dtype) of each shared block: actions, obs, reward, terminated, truncated."""
+    return [((num_envs,), np.int64), ((num_envs, OBS_DIM), np.float32), ((num_envs,), np.float32),
+            ((num_envs,), bool), ((num_envs,), bool)]
+
+
+def _attach(shm, num_envs):
+    arrays, offset = [], 0
+    for shape, dtype in _layout(num_envs):
+        array, offset = _shared_array(shm, shape, dtype, offset)
+        arrays.append(array)
+    return arrays
+
+
+def _worker(conn, shm_name, num_envs, start, stop, frame_skip, seed):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    actions, obs, reward, terminated, truncated = _attach(shm, num_envs)
+    env = PongVecEnv(stop - start, frame_skip, seed,
+                     buffers=(obs[start:stop], reward[start:stop], terminated[start:stop], truncated[start:stop]))
+    mine = actions[start:stop]
+    try:
+        while True:
+            command = conn.recv()
+            if command == "step":
+                env.step(mine)
+            elif command == "reset":
+                env.reset()
+            elif command == "close":
+                break
+            conn.send(None)
+    finally:
+        del actions, obs, reward, terminated, truncated, mine, env
+        shm.close()
+
+
+class SubprocVecEnv:
+    """
+    PongVecEnv split across worker processes. Actions and results live in
+    one shared memory block that every worker writes its slice of, so a
+    step sends only a short command per worker through a pipe.
+    """
+
+    def __init__(self, num_envs, workers=None, frame_skip=1, seed=None):
+        self.num_envs = num_envs
+        workers = min(workers or mp.cpu_count(), num_envs)
+        size = sum(int(np.prod(shape)) * np.dtype(dtype).itemsize for shape, dtype in _layout(num_envs))
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self._actions, self.obs, self.reward, self.terminated, self.truncated = _attach(self._shm, num_envs)
+        bounds = np.linspace(0, num_envs, workers + 1).astype(int)
+        seeds = np.random.SeedSequence(seed).spawn(workers)
+        self._conns, self._procs = [], []
+        for i in range(workers):
+            parent, child = mp.Pipe()
+            proc = mp.Process(target=_worker, daemon=True, args=(
+                child, self._shm.name, num_envs, bounds[i], bounds[i + 1], frame_skip, seeds[i]))
+            proc.start()
+            self._conns.append(parent)
+            self._procs.append(proc)
+
+    def _broadcast(self, command):
+        for conn in self._conns:
+            conn.send(command)
+        for conn in self._conns:
+            conn.recv()
+
+    def reset(self, seed=None):
+        self._broadcast("reset")
+        return self.obs
+
+    def step(self, actions):
+        self._actions[:] = actions
+        self._broadcast("step")
+        return self.obs, self.reward, self.terminated, self.truncated, {}
+
+    def close(self):
+        for conn in self._conns:
+            conn.send("close")
+        for proc in self._procs:
+            proc.join()
+        del self._actions, self.obs, self.reward, self.terminated, self.truncated
+        self._shm.close()
+        self._shm.unlink()
+
+
+def make_vec_env(num_envs, frame_skip=1, workers=0, seed=None):
+    """In-process PongVecEnv, or a SubprocVecEnv when workers > 0."""
+    if workers:
+        return SubprocVecEnv(num_envs, workers, frame_skip, seed)
+    return PongVecEnv(num_envs, frame_skip, seed)
+
+
+# ----------------------------------------
+# Training (cross-entropy method over linear policies)
+# ----------------------------------------
+
+def train_linear_policy(generations=30, population=64, episodes=8, elite=0.2, frame_skip=4, workers=0, seed=0, log=print):
+    """
+    Trains a linear paddle policy (action = argmax(obs @ W + b)) with the
+    cross-entropy method. Every candidate of a generation plays its episodes
+    in one vector env of population * episodes games. Returns (W, b).
+    """
+    rng = np.random.default_rng(seed)
+    n_params = (OBS_DIM + 1) * N_ACTIONS
+    mean, std = np.zeros(n_params), np.ones(n_params)
+    env = make_vec_env(population * episodes, frame_skip, workers, seed)
+    owner = np.repeat(np.arange(population), episodes)
+    features = np.ones((population * episodes, OBS_DIM + 1), np.float32)
+    try:
+        for generation in range(generations):
+            params = rng.normal(mean, std, (population, n_params)).astype(np.float32)
+            params[0] = mean  # Candidate 0 is the current policy itself, so its progress can be logged
+            weights = params.reshape(population, OBS_DIM + 1, N_ACTIONS)[owner]
+            obs = env.reset()
+            returns = np.zeros(population * episodes)
+            finished = np.zeros(population * episodes, bool)
+            while not finished.all():
+                features[:, :OBS_DIM] = obs
+                actions = np.einsum("ni,nia->na", features, weights).argmax(axis=1)
+                obs, reward, terminated, truncated, _info = env.step(actions)
+                returns += reward * ~finished
+                finished |= terminated | truncated
+            scores = returns.reshape(population, episodes).mean(axis=1)
+            best = params[np.argsort(scores)[-max(2, int(population * elite)):]]
+            mean, std = best.mean(axis=0), best.std(axis=0) + 0.05
+            log(f"generation {generation + 1}: policy return {scores[0]:+.2f}, best candidate {scores.max():+.2f}")
+    finally:
+        env.close()
+    params = mean.reshape(OBS_DIM + 1, N_ACTIONS)
+    return params[:OBS_DIM], params[OBS_DIM]
+
+
+# ----------------------------------------
+# Benchmark
+# ----------------------------------------
+
+def benchmark_throughput(num_envs=1024, steps=500, frame_skip=1, workers=0):
+    """Random-action steps per second (and game frames per second) for one vector env configuration."""
+    env = make_vec_env(num_envs, frame_skip, workers, seed=0)
+    actions = np.random.default_rng(0).integers(0, N_ACTIONS, (16, num_envs))
+    try:
+        env.reset()
+        for i in range(10):
+            env.step(actions[i % 16])
+        start = time.perf_counter()
+        for i in range(steps):
+            env.step(actions[i % 16])
+        elapsed = time.perf_counter() - start
+    finally:
+        env.close()
+    rate = num_envs * steps / elapsed
+    return {"num_envs": num_envs, "workers": workers, "frame_skip": frame_skip,
+            "steps_per_sec": round(rate), "frames_per_sec": round(rate * frame_skip)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vectorized Pong environment: throughput benchmark and training.")
+    parser.add_argument("--envs", type=int, nargs="+", default=[1, 64, 1024, 8192])
+    parser.add_argument("--steps", type=int, default=300)
+    parser.add_argument("--frame-skip", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=0, help="Subprocess workers (0 = in-process)")
+    parser.add_argument("--train", action="store_true", help="Train a linear policy instead of benchmarking")
+    parser.add_argument("--generations", type=int, default=30)
+    args = parser.parse_args()
+
+    if args.train:
+        start = time.perf_counter()
+        W, b = train_linear_policy(args.generations, frame_skip=args.frame_skip or 4, workers=args.workers)
+        print(f"Trained in {time.perf_counter() - start:.0f} s")
+        print("W =", np.round(W.astype(float), 3).tolist())
+        print("b =", np.round(b.astype(float), 3).tolist())
+    else:
+        for n in args.envs:
+            result = benchmark_throughput(n, args.steps, args.frame_skip, args.workers)
+            print(f"{n:>6} envs  workers={args.workers}  frame_skip={args.frame_skip}: "
+                  f"{result['steps_per_sec']:>12,} steps/s  {result['frames_per_sec']:>12,} frames/s")
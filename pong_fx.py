@@ -0,0 +1,206 @@
+import os
+import time
+import argparse
+import tracemalloc
+from collections import deque
+import numpy as np
+import pygame
+from Pong4kv0 import SCREEN_WIDTH, SCREEN_HEIGHT, BALL_SIZE, PADDLE_WIDTH, PADDLE_HEIGHT, WHITE
+
+# Effect configuration constants
+EFFECTS = ("trails", "bloom", "scanlines")
+FRAME_BUDGET_MS = 2.0
+TRAIL_INTENSITY = 160    # Gray level a ball leaves behind, halved every frame...
+TRAIL_FRAMES = 8         # ...so it is gone after this many frames (160 >> 8 == 0)
+BLOOM_RADIUS = 12        # Logical pixels the glow reaches past the ball
+BLOOM_STRENGTH = 110     # Glow added right at the ball's edge
+SCANLINE_LEVEL = 128     # Odd rows are multiplied by this / 256
+SCANLINE_TILE = 64       # Rows of the preallocated scanline pattern; taller regions take several blits
+TIMING_SMOOTHING = 0.1   # Weight of the newest frame in the per-effect ms readout
+
+
+class PostFX:
+    """
+    CRT-style effects applied to a Display's canvas after the frame is drawn:
+    motion trails and bloom around the ball, then scanlines.
+
+    NumPy builds the glow kernel and the scanline pattern into surfaces once
+    per window size (through pygame.surfarray); each frame then only runs
+    SDL blend blits of those buffers onto the canvas, which allocate nothing
+    (NumPy ufuncs on strided surfarray views allocate iterator buffers on
+    every call). Only the region that has content is touched: the rects the
+    Display drew this frame, the ball's last TRAIL_FRAMES rects and the glow
+    around the ball. The black background stays black under every effect,
+    so the rest of the frame is skipped. A trail is the ball's recent rects,
+    each stamped at the intensity its age has decayed to, so its cost is
+    bounded per rect rather than by the box around the whole path. `ms`
+    holds a smoothed cost per effect.
+    """
+
+    def __init__(self, display, effects=EFFECTS):
+        self.display = display
+        self.effects = [name for name in EFFECTS if name in effects]
+        self.ms = {name: 0.0 for name in self.effects}
+        self.history = deque(maxlen=TRAIL_FRAMES)
+        self.trail_colors = [(v, v, v) for v in (TRAIL_INTENSITY >> age for age in range(TRAIL_FRAMES))]
+        self._size = None
+
+    def _allocate(self, canvas):
+        self._size = size = canvas.get_size()
+        self.history.clear()
+        # Glow kernel: falls off with the distance from the ball's edge, added with saturation
+        scale = self.display.scale
+        self.radius = radius = max(1, round(BLOOM_RADIUS * scale))
+        ball = max(1, round(BALL_SIZE * scale))
+        axis = np.arange(ball + 2 * radius, dtype=np.float32)
+        dx = np.maximum(np.maximum(radius - axis, axis - (radius + ball - 1)), 0)
+        distance = np.hypot(dx[:, None], dx[None, :])
+        glow = (BLOOM_STRENGTH * np.clip(1 - distance / radius, 0, 1) ** 2).astype(np.uint8)
+        self.glow = pygame.Surface(glow.shape, 0, canvas)
+        pygame.surfarray.blit_array(self.glow, np.repeat(glow[..., None], 3, axis=2))
+        # Scanline pattern, one canvas wide: even rows unchanged, odd rows at SCANLINE_LEVEL / 256
+        pattern = np.full((size[0], SCANLINE_TILE + 1, 3), 255, dtype=np.uint8)
+        pattern[:, 1::2] = SCANLINE_LEVEL
+        self.scanline = pygame.Surface(pattern.shape[:2], 0, canvas)
+        pygame.surfarray.blit_array(self.scanline, pattern)
+
+    def apply(self, ball_rect):
+        """Runs the enabled effects for this frame. `ball_rect` is in logical coordinates."""
+        display = self.display
+        canvas = display.canvas
+        if canvas.get_size() != self._size:
+            self._allocate(canvas)
+        ball = display.to_screen(ball_rect).clip(canvas.get_rect())
+        regions = list(display.dirty)
+        if "trails" in self.effects:
+            start = time.perf_counter()
+            regions.extend(self._trails(canvas, ball))
+            self._time("trails", start)
+        if "bloom" in self.effects:
+            start = time.perf_counter()
+            regions.append(self._bloom(canvas, ball))
+            self._time("bloom", start)
+        if "scanlines" in self.effects:
+            start = time.perf_counter()
+            self._scanlines(canvas, disjoint_rects(regions))
+            self._time("scanlines", start)
+
+    def _time(self, name, start):
+        elapsed = (time.perf_counter() - start) * 1000
+        self.ms[name] += (elapsed - self.ms[name]) * TIMING_SMOOTHING
+
+    def _trails(self, canvas, ball):
+        # A pixel's trail is the intensity of the newest rect covering it, halved once per frame of age:
+        # the max over every recent rect stamped at its own age's intensity
+        self.history.append(ball)
+        for age, rect in enumerate(reversed(self.history)):
+            canvas.fill(self.trail_colors[age], rect, special_flags=pygame.BLEND_RGB_MAX)
+        return self.history
+
+    def _bloom(self, canvas, ball):
+        return canvas.blit(self.glow, (ball.left - self.radius, ball.top - self.radius),
+                           special_flags=pygame.BLEND_RGB_ADD)
+
+    def _scanlines(self, canvas, regions):
+        for rect in regions:
+            # Pattern row 0 is even: start on row 1 of it when the region starts on an odd canvas row
+            for top in range(rect.top, rect.bottom, SCANLINE_TILE):
+                area = pygame.Rect(0, top & 1, rect.width, min(SCANLINE_TILE, rect.bottom - top))
+                canvas.blit(self.scanline, (rect.left, top), area, special_flags=pygame.BLEND_RGB_MULT)
+
+    def readout(self):
+        total = sum(self.ms.values())
+        parts = "  ".join(f"{name} {ms:.2f}" for name, ms in self.ms.items())
+        return f"fx {total:.2f} ms ({parts})"
+
+
+def subtract_rect(rect, other):
+    """The parts of rect outside other, as up to four rects."""
+    if not rect.colliderect(other):
+        return [rect]
+    overlap = rect.clip(other)
+    parts = []
+    if overlap.top > rect.top:
+        parts.append(pygame.Rect(rect.left, rect.top, rect.width, overlap.top - rect.top))
+    if overlap.bottom < rect.bottom:
+        parts.append(pygame.Rect(rect.left, overlap.bottom, rect.width, rect.bottom - overlap.bottom))
+    if overlap.left > rect.left:
+        parts.append(pygame.Rect(rect.left, overlap.top, overlap.left - rect.left, overlap.height))
+    if overlap.right < rect.right:
+        parts.append(pygame.Rect(overlap.right, overlap.top, rect.right - overlap.right, overlap.height))
+    return parts
+
+
+def disjoint_rects(rects):
+    """
+    Splits overlapping rects into pieces that cover the same pixels exactly
+    once, so no pixel is darkened twice by scanlines. Unlike a bounding box
+    of the overlapping rects, the pieces never cover anything the rects don't.
+    """
+    pieces = []
+    for rect in rects:
+        if not rect.width or not rect.height:
+            continue
+        new = [rect]
+        for piece in pieces:
+            new = [part for r in new for part in subtract_rect(r, piece)]
+        pieces.extend(new)
+    return pieces
+
+
+# ----------------------------------------
+# Benchmark
+# ----------------------------------------
+
+def benchmark_effects(size, frames=240, effects=EFFECTS):
+    """
+    Draws the classic scene with a ball crossing the field at an output size
+    and applies the effects. Returns the mean ms per effect and the peak
+    bytes allocated during a steady-state frame (the Rects the blits return).
+    """
+    from pong_display import Display, solid_sprite
+    display = Display(size=size)
+    display.add_sprite("paddle", solid_sprite(PADDLE_WIDTH, PADDLE_HEIGHT))
+    display.add_sprite("ball", solid_sprite(BALL_SIZE, BALL_SIZE))
+    fx = PostFX(display, effects)
+    totals = {name: 0.0 for name in fx.effects}
+    allocated = 0
+    for frame in range(frames):
+        x = 30 + frame * 6 % (SCREEN_WIDTH - 60)
+        y = abs(frame * 5 % (2 * SCREEN_HEIGHT - 20) - SCREEN_HEIGHT + 10)
+        display.clear()
+        display.blit("paddle", (20, 250))
+        display.blit("paddle", (SCREEN_WIDTH - 30, y // 2))
+        display.blit("ball", (x, y))
+        display.text(f"{frame // 60}   0", 36, WHITE, (SCREEN_WIDTH // 2, 30))
+        before = dict(fx.ms)
+        if frame == frames - 1:
+            tracemalloc.start()
+        fx.apply(pygame.Rect(x, y, BALL_SIZE, BALL_SIZE))
+        if frame == frames - 1:
+            allocated = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        for name in totals:
+            # Undo the smoothing to recover this frame's raw cost
+            totals[name] += before[name] + (fx.ms[name] - before[name]) / TIMING_SMOOTHING
+        display.present()
+    return {name: total / frames for name, total in totals.items()}, allocated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the cost of each Pong post-processing effect.")
+    parser.add_argument("--sizes", nargs="+", default=["800x600", "1920x1080", "2560x1440", "3840x2160"])
+    parser.add_argument("--effects", nargs="+", choices=EFFECTS, default=list(EFFECTS))
+    parser.add_argument("--frames", type=int, default=240)
+    args = parser.parse_args()
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    for text in args.sizes:
+        size = tuple(int(n) for n in text.split("x"))
+        ms, allocated = benchmark_effects(size, args.frames, args.effects)
+        total = sum(ms.values())
+        verdict = "within" if total <= FRAME_BUDGET_MS else "OVER"
+        parts = ", ".join(f"{name} {value:.3f}" for name, value in ms.items())
+        print(f"{text:>10}: {total:.3f} ms ({parts}) {verdict} the {FRAME_BUDGET_MS} ms budget, "
+              f"{allocated} B allocated per frame")
@@ -0,0 +1,216 @@
+import os
+import time
+import argparse
+import threading
+import tracemalloc
+import numpy as np
+import pygame
+
+# Music configuration constants
+SAMPLE_RATE = 44100
+CHUNK_SAMPLES = 2048     # ~46 ms of audio synthesized per chunk
+RING_CHUNKS = 4          # Chunks rendered ahead of playback (bounds both memory and how late tempo changes are heard)
+BASE_BPM = 100
+MAX_BPM = 160
+BPM_PER_HIT = 3          # Tempo rises with every paddle hit in the current rally...
+FULL_INTENSITY_RALLY = 12  # ...and all layers are playing once a rally is this long
+STEPS_PER_BAR = 16       # Sixteenth-note step sequencer
+ROOT_HZ = 110.0          # A2
+SCALE = (0, 3, 5, 7, 10, 12, 15)  # Minor pentatonic (semitones above the root)
+MASTER_VOLUME = 0.25
+
+
+# The synthesizer: renders the next chunk of an endless procedural tune (no pygame, so it can be benchmarked alone)
+class Sequencer:
+    def __init__(self, sample_rate=SAMPLE_RATE, seed=None, chunk_samples=CHUNK_SAMPLES):
+        self.sample_rate = sample_rate
+        self.rng = np.random.default_rng(seed)
+        self.bpm = BASE_BPM
+        self.intensity = 0.0
+        self.step = -1
+        self.step_len = 1
+        self.step_pos = 0
+        self.bass_hz = self.lead_hz = ROOT_HZ
+        self.bass_phase = self.lead_phase = 0.0
+        self.play_lead = self.play_hat = False
+        # Preallocated buffers: the time ramp for a step and the mix for a chunk
+        self._ramp = np.arange(sample_rate, dtype=np.float32) / sample_rate
+        self._noise = self.rng.uniform(-1, 1, sample_rate // 20).astype(np.float32)
+        self._mix = np.zeros(chunk_samples, dtype=np.float32)
+
+    def set_rally(self, rally):
+        """Called by the game; read by the synthesis thread at the next step boundary."""
+        self.bpm = min(MAX_BPM, BASE_BPM + rally * BPM_PER_HIT)
+        self.intensity = min(1.0, rally / FULL_INTENSITY_RALLY)
+
+    def _next_step(self):
+        self.step = (self.step + 1) % STEPS_PER_BAR
+        self.step_len = int(self.sample_rate * 60 / self.bpm / 4)
+        self.step_pos = 0
+        if self.step % 4 == 0:
+            # Bass on each beat: root on the bar, otherwise root or fifth
+            self.bass_hz = ROOT_HZ / 2 * (1.5 if self.step and self.rng.random() < 0.5 else 1.0)
+        # More layers join as the rally goes on: lead arpeggio, then hi-hats
+        self.play_lead = self.intensity > 0.25 and (self.intensity > 0.6 or self.step % 2 == 0)
+        self.play_hat = self.intensity > 0.5 and self.step % 2 == 1
+        if self.play_lead:
+            octave = 2 if self.intensity > 0.8 else 1
+            self.lead_hz = ROOT_HZ * octave * 2 ** (SCALE[self.rng.integers(len(SCALE))] / 12)
+
+    def render(self, out):
+        """Fills `out` (int16, shape (samples,) or (samples, channels)) with the next samples."""
+        n = len(out)
+        if n > len(self._mix):
+            self._mix = np.zeros(n, dtype=np.float32)  # Only if called with a bigger chunk than it was sized for
+        mix = self._mix[:n]
+        pos = 0
+        while pos < n:
+            if self.step_pos >= self.step_len:
+                self._next_step()
+            seg = min(n - pos, self.step_len - self.step_pos)
+            t = self._ramp[self.step_pos:self.step_pos + seg]
+            part = mix[pos:pos + seg]
+
+            # Bass: square wave with a slow decay
+            phase = self.bass_phase + 2 * np.pi * self.bass_hz * t
+            np.sign(np.sin(phase), out=part)
+            part *= 0.35 * np.exp(-3.0 * t)
+            if self.play_lead:
+                lead_phase = self.lead_phase + 2 * np.pi * self.lead_hz * t
+                part += (0.3 * self.intensity) * np.exp(-12.0 * t) * (2 / np.pi) * np.arcsin(np.sin(lead_phase))
+            if self.play_hat:
+                hat = self._noise[self.step_pos % len(self._noise):][:seg]
+                part[:len(hat)] += 0.12 * hat * np.exp(-60.0 * t[:len(hat)])
+
+            self.step_pos += seg
+            pos += seg
+            if self.step_pos >= self.step_len:
+                # Carry the oscillator phases into the next step so notes that continue don't click
+                self.bass_phase = float(self.bass_phase + 2 * np.pi * self.bass_hz * self.step_len / self.sample_rate)
+                self.lead_phase = float(self.lead_phase + 2 * np.pi * self.lead_hz * self.step_len / self.sample_rate)
+
+        np.clip(mix, -1, 1, out=mix)
+        mix *= 32767 * MASTER_VOLUME
+        if out.ndim == 2:
+            out[:] = mix[:, None]
+        else:
+            out[:] = mix
+
+
+class MusicStream:
+    """
+    Streams the sequencer to a mixer Channel.
+
+    A worker thread renders chunks into a ring of RING_CHUNKS preallocated
+    buffers and waits whenever the ring is full, so the tune is never
+    synthesized ahead of time and memory stays constant. The game loop calls
+    update() every frame; it only takes a ready chunk (never waits for one)
+    and queues it on the channel when the channel's queue is free.
+    """
+
+    def __init__(self, channel, chunk_samples=CHUNK_SAMPLES, ring_chunks=RING_CHUNKS, seed=None):
+        frequency, _size, channels = pygame.mixer.get_init()
+        self.channel = channel
+        self.sequencer = Sequencer(frequency, seed, chunk_samples)
+        shape = (chunk_samples, channels) if channels > 1 else (chunk_samples,)
+        self.ring = [np.zeros(shape, dtype=np.int16) for _ in range(ring_chunks)]
+        self._free = threading.Semaphore(ring_chunks)
+        self._filled = threading.Semaphore(0)
+        self._read = 0
+        self.underruns = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        write = 0
+        while not self._stop.is_set():
+            if not self._free.acquire(timeout=0.1):
+                continue
+            try:
+                self.sequencer.render(self.ring[write])
+            except Exception as e:
+                print(f"Music stopped: {type(e).__name__}: {e}")
+                return
+            write = (write + 1) % len(self.ring)
+            self._filled.release()
+
+    def set_rally(self, rally):
+        self.sequencer.set_rally(rally)
+
+    def update(self):
+        """Call once per frame from the game loop. Never blocks."""
+        if self.channel.get_queue() is not None:
+            return
+        if not self._filled.acquire(blocking=False):
+            if not self.channel.get_busy():
+                self.underruns += 1
+            return
+        sound = pygame.mixer.Sound(buffer=self.ring[self._read])  # Copies the chunk, so the slot is free again
+        self._read = (self._read + 1) % len(self.ring)
+        self._free.release()
+        if self.channel.get_busy():
+            self.channel.queue(sound)
+        else:
+            self.channel.play(sound)
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.channel.stop()
+
+
+# ----------------------------------------
+# Benchmark
+# ----------------------------------------
+
+def benchmark_chunks(chunks=2000, chunk_samples=CHUNK_SAMPLES, channels=2):
+    """
+    Renders `chunks` chunks while the rally grows from 0 to full intensity.
+    Returns the mean and worst ms per chunk, the share of one core that
+    takes (render time / chunk duration) and the traced memory halfway and
+    at the end, which should match.
+    """
+    sequencer = Sequencer(seed=1, chunk_samples=chunk_samples)
+    out = np.zeros((chunk_samples, channels), dtype=np.int16)
+    times = np.zeros(chunks)  # Preallocated, so the timing itself doesn't show up as growth
+    tracemalloc.start()
+    for i in range(chunks):
+        sequencer.set_rally(i * 2 * FULL_INTENSITY_RALLY // chunks)
+        start = time.perf_counter()
+        sequencer.render(out)
+        times[i] = time.perf_counter() - start
+        if i == chunks // 2:  # Past NumPy's warm-up allocations
+            early = tracemalloc.get_traced_memory()[0]
+    late = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    chunk_ms = chunk_samples / SAMPLE_RATE * 1000
+    mean_ms = float(times.mean()) * 1000
+    return {"chunk_ms": round(chunk_ms, 1), "mean_ms": round(mean_ms, 3), "max_ms": round(float(times.max()) * 1000, 3),
+            "cpu_share": round(mean_ms / chunk_ms, 4), "memory_early": early, "memory_late": late}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Pong music sequencer, or listen to it.")
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--chunk-samples", type=int, default=CHUNK_SAMPLES)
+    parser.add_argument("--play", type=float, metavar="SECONDS", help="Stream it for this long with a growing rally")
+    args = parser.parse_args()
+
+    if args.play:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        pygame.mixer.pre_init(SAMPLE_RATE, -16, 2, 512)
+        pygame.init()
+        stream = MusicStream(pygame.mixer.Channel(0), args.chunk_samples)
+        start = time.perf_counter()
+        while time.perf_counter() - start < args.play:
+            stream.set_rally(int((time.perf_counter() - start) / args.play * FULL_INTENSITY_RALLY * 1.5))
+            stream.update()
+            time.sleep(1 / 60)
+        stream.stop()
+        print(f"Underruns: {stream.underruns}")
+    else:
+        result = benchmark_chunks(args.chunks, args.chunk_samples)
+        print(f"{result['mean_ms']} ms mean / {result['max_ms']} ms worst per {result['chunk_ms']} ms chunk "
+              f"({result['cpu_share']:.2%} of one core)")
+        print(f"Traced memory halfway: {result['memory_early']} B, at the end: {result['memory_late']} B")
@@ -0,0 +1,395 @@
+import os
+import time
+import argparse
+from itertools import repeat
+import numpy as np
+import pygame
+from Pong4kv0 import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, FPS, BALL_SIZE, PADDLE_WIDTH, PADDLE_HEIGHT, PADDLE_SPEED, AI_SPEED, WHITE, BLACK
+)
+
+# Stress/party mode configuration constants
+CELL_SIZE = 40          # Spatial hash cell size in pixels (a few ball widths)
+MAX_DY = 8.0            # Cap on vertical speed so paddle spin can't build up forever
+SPAWN_BAND = 200        # Party balls spawn anywhere in a band this wide around the center line
+PADDLES = 2             # Rect ids 0 and 1 are the paddles; obstacles follow
+RASTER_THRESHOLD = 1500 # From this many balls on, drawing them as one array operation beats blitting each
+
+
+# Ball state for thousands of balls: one packed array per field instead of one Python object per ball
+class BallArray:
+    def __init__(self, capacity=1024, seed=None):
+        self.count = 0
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)  # Top-left corner (x, y) of each ball
+        self.vel = np.zeros((capacity, 2), dtype=np.float32)  # Velocity (dx, dy) in pixels per frame
+        self.rng = np.random.default_rng(seed)
+
+    def _launch(self, index, spread):
+        """Same launch rules as Ball.launch, for every ball in `index` at once."""
+        n = len(index)
+        self.pos[index, 0] = SCREEN_WIDTH // 2 - BALL_SIZE // 2
+        self.pos[index, 1] = SCREEN_HEIGHT // 2 - BALL_SIZE // 2
+        if spread:
+            # Spread a new party out so it doesn't start as one pixel-perfect clump
+            self.pos[index, 0] += self.rng.uniform(-SPAWN_BAND / 2, SPAWN_BAND / 2, n)
+            self.pos[index, 1] = self.rng.uniform(0, SCREEN_HEIGHT - BALL_SIZE, n)
+        self.vel[index, 0] = self.rng.choice([-4.0, 4.0], n) * self.rng.uniform(0.75, 1.25, n)
+        dy = self.rng.integers(-3, 4, n).astype(np.float32)
+        dy[dy == 0] = 2  # avoid 0 vertical speed (perfectly horizontal trajectories)
+        self.vel[index, 1] = dy
+
+    def spawn(self, n):
+        """Adds n balls, growing the arrays if needed."""
+        if self.count + n > len(self.pos):
+            capacity = max(self.count + n, len(self.pos) * 2)
+            self.pos = np.resize(self.pos, (capacity, 2))
+            self.vel = np.resize(self.vel, (capacity, 2))
+        index = np.arange(self.count, self.count + n)
+        self.count += n
+        self._launch(index, spread=True)
+
+    def remove(self, n):
+        self.count = max(0, self.count - n)
+
+    def relaunch(self, index):
+        self._launch(index, spread=False)
+
+
+# Broad phase: a uniform grid mapping each cell to the ids of the rects that can touch a ball in it
+class SpatialHash:
+    def __init__(self, width, height, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.cols = -(-width // cell_size)
+        self.rows = -(-height // cell_size)
+
+    def build(self, rects, first_id=0):
+        """
+        Returns a (cells, K) int32 table of rect ids, -1 padded. Each rect is
+        inserted into every cell a ball's top-left corner can be in while
+        overlapping it, so one lookup per ball finds every candidate.
+        """
+        cells = [[] for _ in range(self.cols * self.rows)]
+        for i, (x, y, w, h) in enumerate(rects):
+            c0 = max(0, int((x - BALL_SIZE) // self.cell_size))
+            c1 = min(self.cols - 1, int((x + w) // self.cell_size))
+            r0 = max(0, int((y - BALL_SIZE) // self.cell_size))
+            r1 = min(self.rows - 1, int((y + h) // self.cell_size))
+            for r in range(r0, r1 + 1):
+                for c in range(c0, c1 + 1):
+                    cells[r * self.cols + c].append(first_id + i)
+        table = np.full((len(cells), max(1, max(len(c) for c in cells))), -1, dtype=np.int32)
+        for i, ids in enumerate(cells):
+            table[i, :len(ids)] = ids
+        return table
+
+    def cells_of(self, pos):
+        """Cell index of each ball's top-left corner (clamped to the grid)."""
+        col = np.clip((pos[:, 0] // self.cell_size).astype(np.int32), 0, self.cols - 1)
+        row = np.clip((pos[:, 1] // self.cell_size).astype(np.int32), 0, self.rows - 1)
+        return row * self.cols + col
+
+
+# The party-mode simulation: two paddles, optional obstacles and any number of balls
+class StressSim:
+    def __init__(self, n_balls, obstacles=0, seed=None):
+        self.balls = BallArray(max(n_balls, 1), seed)
+        self.balls.spawn(n_balls)
+        self.player_y = float((SCREEN_HEIGHT - PADDLE_HEIGHT) // 2)
+        self.ai_y = float((SCREEN_HEIGHT - PADDLE_HEIGHT) // 2)
+        self.player_score = 0
+        self.ai_score = 0
+        self.grid = SpatialHash(SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.event_x = {}
+
+        # Obstacles are static, so their part of the hash is built once
+        rng = np.random.default_rng(seed)
+        self.obstacles = []
+        for _ in range(obstacles):
+            w, h = rng.integers(20, 60, 2)
+            x = rng.integers(SCREEN_WIDTH // 4, SCREEN_WIDTH * 3 // 4 - w)
+            y = rng.integers(0, SCREEN_HEIGHT - h)
+            self.obstacles.append((int(x), int(y), int(w), int(h)))
+        self.static_table = self.grid.build(self.obstacles, first_id=PADDLES) if self.obstacles else None
+
+    def paddle_rects(self):
+        return [
+            (20, self.player_y, PADDLE_WIDTH, PADDLE_HEIGHT),
+            (SCREEN_WIDTH - 20 - PADDLE_WIDTH, self.ai_y, PADDLE_WIDTH, PADDLE_HEIGHT),
+        ]
+
+    def move_player(self, dy):
+        self.player_y = min(max(self.player_y + dy, 0), SCREEN_HEIGHT - PADDLE_HEIGHT)
+
+    def _track(self, paddle_y, target_y, speed):
+        """Moves a paddle's y toward a ball (or the center) at the AI speed, like the single-ball AI."""
+        center = paddle_y + PADDLE_HEIGHT / 2
+        if center < target_y:
+            paddle_y += speed
+        elif center > target_y:
+            paddle_y -= speed
+        return min(max(paddle_y, 0), SCREEN_HEIGHT - PADDLE_HEIGHT)
+
+    def _incoming_y(self, pos, vel, moving_right):
+        """Center y of the ball closest to a paddle and moving toward it, or the screen center if none."""
+        x = pos[:, 0] if moving_right else SCREEN_WIDTH - pos[:, 0]
+        incoming = (vel[:, 0] > 0) if moving_right else (vel[:, 0] < 0)
+        if not incoming.any():
+            return SCREEN_HEIGHT / 2
+        return float(pos[np.where(incoming, x, -np.inf).argmax(), 1]) + BALL_SIZE / 2
+
+    def step(self, player_ai=False):
+        """
+        Advances one frame. Returns (wall hits, paddle hits, balls scored)
+        so the caller can play sounds; event_x holds the mean x of each kind
+        of event this frame (for panning them).
+        """
+        n = self.balls.count
+        pos = self.balls.pos[:n]
+        vel = self.balls.vel[:n]
+
+        # Paddles: AI on the right (and on the left too when nobody is playing)
+        self.ai_y = self._track(self.ai_y, self._incoming_y(pos, vel, True), AI_SPEED)
+        if player_ai:
+            self.player_y = self._track(self.player_y, self._incoming_y(pos, vel, False), AI_SPEED)
+
+        pos += vel
+
+        # Top and bottom walls
+        top = pos[:, 1] <= 0
+        bottom = pos[:, 1] + BALL_SIZE >= SCREEN_HEIGHT
+        pos[top, 1] = 0
+        pos[bottom, 1] = SCREEN_HEIGHT - BALL_SIZE
+        walls = top | bottom
+        vel[walls, 1] *= -1
+        self.event_x = {}
+        if walls.any():
+            self.event_x["wall"] = float(pos[walls, 0].mean())
+
+        # Broad phase: paddles are re-hashed every frame (they move), obstacles come from the static table
+        paddles = self.paddle_rects()
+        table = self.grid.build(paddles)
+        rects = np.array(paddles + self.obstacles, dtype=np.float32)
+        if self.static_table is not None:
+            table = np.hstack((table, self.static_table))
+        candidates = table[self.grid.cells_of(pos)]  # (balls, K) rect ids
+
+        # Narrow phase: AABB overlap against each candidate, all balls at once
+        valid = candidates >= 0
+        r = rects[np.where(valid, candidates, 0)]
+        bx = pos[:, 0, None]
+        by = pos[:, 1, None]
+        hit = valid & (bx < r[..., 0] + r[..., 2]) & (bx + BALL_SIZE > r[..., 0]) \
+            & (by < r[..., 1] + r[..., 3]) & (by + BALL_SIZE > r[..., 1])
+        rows = np.flatnonzero(hit.any(axis=1))
+        paddle_hits = 0
+        if len(rows):
+            ids = candidates[rows, hit[rows].argmax(axis=1)]
+            rx, ry, rw, rh = rects[ids].T
+            bx, by = pos[rows, 0], pos[rows, 1]
+            # Bounce off the side with the smaller overlap (the side the ball came through)
+            side = np.minimum(bx + BALL_SIZE - rx, rx + rw - bx) <= np.minimum(by + BALL_SIZE - ry, ry + rh - by)
+
+            h = rows[side]
+            pos[h, 0] = np.where(vel[h, 0] > 0, rx[side] - BALL_SIZE, rx[side] + rw[side])  # avoid sticking inside
+            vel[h, 0] *= -1
+            v = rows[~side]
+            pos[v, 1] = np.where(vel[v, 1] > 0, ry[~side] - BALL_SIZE, ry[~side] + rh[~side])
+            vel[v, 1] *= -1
+
+            # Paddle hits adjust vertical speed by where the ball struck, as in the single-ball game
+            on_paddle = side & (ids < PADDLES)
+            p = rows[on_paddle]
+            hit_position = (pos[p, 1] + BALL_SIZE / 2 - (ry[on_paddle] + PADDLE_HEIGHT / 2)) / (PADDLE_HEIGHT / 2)
+            vel[p, 1] = np.clip(vel[p, 1] + hit_position * 2, -MAX_DY, MAX_DY)
+            paddle_hits = len(p)
+            if paddle_hits:
+                self.event_x["paddle"] = float(pos[p, 0].mean())
+
+        # Scoring: balls off the left or right edge relaunch from the center
+        left = pos[:, 0] < 0
+        right = pos[:, 0] > SCREEN_WIDTH
+        scored = np.flatnonzero(left | right)
+        if len(scored):
+            self.event_x["score"] = float(pos[scored, 0].mean())
+            self.ai_score += int(left.sum())
+            self.player_score += int(right.sum())
+            self.balls.relaunch(scored)
+        return int(walls.sum()), paddle_hits, len(scored)
+
+    def draw(self, surface, ball_image):
+        surface.fill(BLACK)
+        for rect in self.paddle_rects() + self.obstacles:
+            pygame.draw.rect(surface, WHITE, rect)
+        draw_balls(surface, self.balls.pos[:self.balls.count], ball_image)
+
+
+def draw_balls(surface, pos, ball_image):
+    """
+    Draws a ball at every position. Few balls are blitted; many are
+    rasterized straight into the surface's pixels: mark each ball's corner
+    in a boolean grid, grow the marks to BALL_SIZE squares with shifted ORs
+    and paint the whole mask at once, which costs the same for 2,000 balls
+    as for 50,000.
+    """
+    coords = pos.astype(np.int32)
+    if len(coords) >= RASTER_THRESHOLD and surface.get_bytesize() in (1, 2, 4):
+        width, height = surface.get_size()
+        xs, ys = coords[:, 0], coords[:, 1]
+        visible = (xs > -BALL_SIZE) & (xs < width) & (ys > -BALL_SIZE) & (ys < height)
+        mask = np.zeros((width + BALL_SIZE, height + BALL_SIZE), dtype=bool)
+        mask[xs[visible] + BALL_SIZE, ys[visible] + BALL_SIZE] = True
+        grown = 1
+        while grown < BALL_SIZE:  # 1 -> 2 -> 4 -> 8 -> 10 pixels wide, then the same vertically
+            shift = min(grown, BALL_SIZE - grown)
+            mask[shift:] |= mask[:-shift]
+            mask[:, shift:] |= mask[:, :-shift]
+            grown += shift
+        pixels = pygame.surfarray.pixels2d(surface)
+        pixels[mask[BALL_SIZE:, BALL_SIZE:]] = surface.map_rgb(WHITE)
+        del pixels  # Unlocks the surface
+    else:
+        surface.blits(zip(repeat(ball_image), coords.tolist()), doreturn=False)
+
+
+def ball_image():
+    image = pygame.Surface((BALL_SIZE, BALL_SIZE))
+    image.fill(WHITE)
+    return image
+
+
+# Party mode game loop (started from Pong4kv0.py --balls N)
+def run_party(display, clock, n_balls, obstacles=0, audio=None, frames=0, uncapped=False):
+    sim = StressSim(n_balls, obstacles)
+    image = ball_image()
+    font = pygame.font.Font(None, 28)
+    running = True
+    frame = 0
+    while running:
+        clock.tick(0 if uncapped else FPS)
+        frame += 1
+        if frames and frame > frames:
+            break
+        if audio:
+            audio.begin_frame()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif display.handle_event(event):
+                pass
+            elif event.type == pygame.KEYDOWN and event.key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS):
+                sim.balls.spawn(max(1, sim.balls.count // 2))  # + : 50% more balls
+            elif event.type == pygame.KEYDOWN and event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                sim.balls.remove(sim.balls.count // 3)         # - : a third fewer
+
+        keys = pygame.key.get_pressed()
+        if keys[pygame.K_UP] or keys[pygame.K_w]:
+            sim.move_player(-PADDLE_SPEED)
+        if keys[pygame.K_DOWN] or keys[pygame.K_s]:
+            sim.move_player(PADDLE_SPEED)
+
+        sim.step()
+        if audio:
+            # The voice manager plays each kind at most once per frame, panned to where it happened
+            for kind, x in sim.event_x.items():
+                audio.play(kind, pan=x / SCREEN_WIDTH)
+
+        screen = display.logical_surface()  # Balls are rasterized at logical size; present() scales the frame
+        sim.draw(screen, image)
+        text = font.render(f"{sim.player_score}   {sim.ai_score}    balls {sim.balls.count}    fps {clock.get_fps():.0f}",
+                           True, WHITE)
+        screen.blit(text, text.get_rect(center=(SCREEN_WIDTH // 2, 20)))
+        display.present()
+
+
+# ----------------------------------------
+# Benchmark
+# ----------------------------------------
+
+def frame_ms(n_balls, obstacles=0, frames=120, draw=True, seed=1):
+    """Mean milliseconds per simulated (and drawn) frame with n_balls, after a short warm-up."""
+    sim = StressSim(n_balls, obstacles, seed)
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    image = ball_image()
+    for _ in range(10):
+        sim.step(player_ai=True)
+    start = time.perf_counter()
+    for _ in range(frames):
+        sim.step(player_ai=True)
+        if draw:
+            sim.draw(surface, image)
+    return (time.perf_counter() - start) * 1000 / frames
+
+
+def object_frame_ms(n_balls, obstacles=0, frames=60):
+    """The same frame with one Pong4kv0.Ball object per ball and colliderect checks, for comparison."""
+    from Pong4kv0 import Ball, Paddle
+    random_state = np.random.default_rng(1)
+    balls = []
+    for _ in range(n_balls):
+        ball = Ball(0, 0, BALL_SIZE)
+        ball.launch()
+        ball.y = int(random_state.integers(0, SCREEN_HEIGHT - BALL_SIZE))
+        balls.append(ball)
+    rects = [Paddle(20, 250).rect, Paddle(SCREEN_WIDTH - 30, 250).rect]
+    rects += [pygame.Rect(r) for r in StressSim(0, obstacles, 1).obstacles]
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    start = time.perf_counter()
+    for _ in range(frames):
+        surface.fill(BLACK)
+        for ball in balls:
+            ball.move()
+            if ball.y <= 0 or ball.y + BALL_SIZE >= SCREEN_HEIGHT:
+                ball.bounce_vertical()
+            index = ball.rect.collidelist(rects)
+            if index >= 0:
+                ball.bounce_horizontal()
+            if ball.x < 0 or ball.x > SCREEN_WIDTH:
+                ball.launch()
+            ball.draw(surface)
+    return (time.perf_counter() - start) * 1000 / frames
+
+
+def benchmark_capacity(target_fps=FPS, obstacles=0, draw=True, measure=frame_ms):
+    """
+    Finds the most balls that still fit a frame in 1/target_fps seconds:
+    doubles the count until a frame is too slow, then bisects.
+    Returns {"budget_ms", "sustainable_balls", "samples": [(balls, ms), ...]}.
+    """
+    budget = 1000 / target_fps
+    samples = []
+
+    def fits(n):
+        ms = measure(n, obstacles) if measure is not frame_ms else frame_ms(n, obstacles, draw=draw)
+        samples.append((n, round(ms, 2)))
+        return ms <= budget
+
+    good, bad = 0, 250
+    while fits(bad):
+        good, bad = bad, bad * 2
+    while bad - good > max(50, good // 20):
+        middle = (good + bad) // 2
+        if fits(middle):
+            good = middle
+        else:
+            bad = middle
+    return {"budget_ms": round(budget, 2), "sustainable_balls": good, "samples": samples}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find how many Pong balls fit in a 60 FPS frame.")
+    parser.add_argument("--fps", type=int, default=FPS)
+    parser.add_argument("--obstacles", type=int, default=8)
+    parser.add_argument("--no-draw", dest="draw", action="store_false", help="Simulation only")
+    parser.add_argument("--objects", action="store_true", help="Also measure one Ball object per ball")
+    args = parser.parse_args()
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    result = benchmark_capacity(args.fps, args.obstacles, args.draw)
+    print(f"Packed arrays + spatial hash: {result['sustainable_balls']} balls at {args.fps} FPS "
+          f"({result['budget_ms']} ms budget)")
+    for n, ms in result["samples"]:
+        print(f"  {n:>7} balls  {ms:7.2f} ms/frame")
+    if args.objects:
+        baseline = benchmark_capacity(args.fps, args.obstacles, measure=object_frame_ms)
+        print(f"One Ball object per ball:     {baseline['sustainable_balls']} balls at {args.fps} FPS")
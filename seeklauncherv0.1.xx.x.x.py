@@ -12,6 +12,8 @@ from datetime import datetime
 import webbrowser
 import requests  # Import the requests library
 from PIL import Image, ImageTk  # For Image handling
+from launcher_settings import SettingsStore
+from net_loop import NetLoop, TkDispatcher, HttpError
 
 
 # ----------------------------------------
@@ -81,26 +83,25 @@ def microsoft_login_flow(root):
         return None
 
 
-def fetch_image(url, local_path, resize_to=None):
-    """Fetches an image from URL, saves it locally, and returns a PhotoImage object.
-       Handles network and file errors gracefully. Optionally resizes the image.
+_photo_cache = {}  # (path, size) -> (mtime_ns, PhotoImage): each image is decoded and held once, and replaced when it changes
+
+
+def load_image(local_path, resize_to=None):
+    """Opens a local image and returns a PhotoImage (must run on the Tk thread), or None.
+       Only the PhotoImage is kept; the PIL image is released as soon as it is converted.
     """
     try:
-        if not os.path.exists(local_path):  # Only download if it doesn't exist
-            response = requests.get(url, stream=True)
-            response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-
-            with open(local_path, 'wb') as out_file:
-                for chunk in response.iter_content(chunk_size=8192):
-                    out_file.write(chunk)
-
-        image = Image.open(local_path)
-        if resize_to:
-            image = image.resize(resize_to, Image.Resampling.LANCZOS)
-        return ImageTk.PhotoImage(image)
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching image from {url}: {e}")
-        return None
+        key = (local_path, resize_to)
+        mtime_ns = os.stat(local_path).st_mtime_ns
+        cached = _photo_cache.get(key)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+        with Image.open(local_path) as image:
+            if resize_to:
+                image = image.resize(resize_to, Image.Resampling.LANCZOS)
+            photo = ImageTk.PhotoImage(image)
+        _photo_cache[key] = (mtime_ns, photo)  # Drops the stale PhotoImage of an older copy of the file
+        return photo
     except (IOError, OSError) as e:
         print(f"Error opening or saving image {local_path}: {e}")
         return None
@@ -109,6 +110,21 @@ def fetch_image(url, local_path, resize_to=None):
         return None
 
 
+def fetch_image(net, url, local_path, on_image, resize_to=None):
+    """Fetches an image from URL (unless cached at local_path) without blocking the UI.
+       `on_image(photo)` is called on the Tk thread with a PhotoImage, or None on failure.
+    """
+    if os.path.exists(local_path):  # Only download if it doesn't exist
+        on_image(load_image(local_path, resize_to))
+        return
+
+    def failed(e):
+        print(f"Error fetching image from {url}: {e}")
+        on_image(None)
+
+    net.download(url, local_path, on_done=lambda response: on_image(load_image(local_path, resize_to)), on_error=failed)
+
+
 # ----------------------------------------
 # Main Launcher Class
 # ----------------------------------------
@@ -148,14 +164,19 @@ class MineSeek4KLauncher:
             "show_snapshots": False,  # Option to show snapshots
             "show_old_versions": False # Option to show alpha/beta versions.
         }
-        self.settings = {}
+        self.settings_store = SettingsStore(self.config_path, self.default_settings)
+        self.settings = self.settings_store.data
 
         # Ensure .minecraft directory exists
         os.makedirs(self.minecraft_dir, exist_ok=True)
 
+        # One event loop thread for all HTTP; results come back on the Tk thread
+        self.net = NetLoop(TkDispatcher(self.root))
+
         # Load (or create) configuration
         self.load_settings()
         self.current_account_image = None  # Store the current account image
+        self.account_menu = None
 
         # ----------------------------------------
         # UI Setup
@@ -184,12 +205,12 @@ class MineSeek4KLauncher:
         self.top_bar = ttk.Frame(self.root)
         self.top_bar.pack(side="top", fill="x")
 
-        # Logo (using a downloaded image, handled by fetch_image)
+        # Logo (downloaded in the background, shown once it arrives)
         logo_path = os.path.join(self.minecraft_dir, "launcher_logo.png")
-        self.logo_image = fetch_image(LOGO_URL, logo_path, resize_to=(100, 100))  # Resize logo
-        if self.logo_image:
-            logo_label = ttk.Label(self.top_bar, image=self.logo_image)
-            logo_label.pack(side="left", padx=5, pady=5)
+        self.logo_image = None
+        self.logo_label = ttk.Label(self.top_bar)
+        self.logo_label.pack(side="left", padx=5, pady=5)
+        fetch_image(self.net, LOGO_URL, logo_path, self.show_logo, resize_to=(100, 100))  # Resize logo
 
         # Account/Profile Section (Right side of top bar)
         self.account_frame = ttk.Frame(self.top_bar)
@@ -260,14 +281,23 @@ class MineSeek4KLauncher:
 
 
 
+    def show_logo(self, image):
+        self.logo_image = image  # Keep a reference so Tk doesn't drop the image
+        if image:
+            self.logo_label.config(image=image)
+
+
     def show_account_menu(self):
         """Displays a popup menu for account management (Add, Edit, Delete)."""
-        menu = tk.Menu(self.root, tearoff=0)
-        menu.add_command(label="Add Account", command=self.create_new_profile)
-        menu.add_command(label="Edit Account", command=self.edit_profile)
-        menu.add_command(label="Remove Account", command=self.delete_profile)
-        menu.add_separator()
-        menu.add_command(label="Manage Accounts (Microsoft)", command=lambda: webbrowser.open("https://account.microsoft.com/"))
+        menu = self.account_menu
+        if menu is None:
+            # Built once and reused; a new tk.Menu per click would leak a Tcl widget each time
+            menu = self.account_menu = tk.Menu(self.root, tearoff=0)
+            menu.add_command(label="Add Account", command=self.create_new_profile)
+            menu.add_command(label="Edit Account", command=self.edit_profile)
+            menu.add_command(label="Remove Account", command=self.delete_profile)
+            menu.add_separator()
+            menu.add_command(label="Manage Accounts (Microsoft)", command=lambda: webbrowser.open("https://account.microsoft.com/"))
         menu.tk_popup(self.account_menu_button.winfo_rootx(), self.account_menu_button.winfo_rooty() + self.account_menu_button.winfo_height())
 
 
@@ -279,39 +309,19 @@ class MineSeek4KLauncher:
 
         size = (32, 32)  # Smaller image size
         if profile["auth_method"] == "microsoft" and profile["uuid"]:
-            # Try to fetch from Mojang API (more reliable)
-            try:
-                response = requests.get(f"https://sessionserver.mojang.com/session/minecraft/profile/{profile['uuid']}")
-                response.raise_for_status()
-                data = response.json()
-                # Extract skin URL from the complicated Mojang response (you might need to adjust this)
-                for prop in data.get("properties", []):
-                    if prop["name"] == "textures":
-                        import base64
-                        textures = json.loads(base64.b64decode(prop["value"]))
-                        skin_url = textures["textures"]["SKIN"]["url"]
-                        break
-                else:
-                    raise ValueError("Skin URL not found in Mojang response")
-
-                image_path = os.path.join(self.skins_cache_dir, f"{profile['uuid']}_head.png")
-                self.current_account_image = fetch_image(skin_url, image_path, resize_to=size)
-
-            except (requests.exceptions.RequestException, ValueError, KeyError, json.JSONDecodeError) as e:
-                print(f"Error fetching Microsoft skin: {e}")
-                self.current_account_image = None  # Fallback if fetching fails
-            
+            # Try to fetch from Mojang API (more reliable); the image is set when the requests finish
+            self.net.fetch(
+                f"https://sessionserver.mojang.com/session/minecraft/profile/{profile['uuid']}",
+                on_done=lambda response: self.on_session_profile(profile, response, size),
+                on_error=self.on_skin_error
+            )
+            self.current_account_image = None
+
         elif profile["auth_method"] == "offline":
               # Use a Steve/Alex skin, or a local cached skin if one is available
               image_path = os.path.join(self.skins_cache_dir, f"{profile['username'].lower()}_head.png")
               if os.path.exists(image_path):
-                  try:
-                      image = Image.open(image_path)
-                      image = image.resize(size, Image.Resampling.LANCZOS)
-                      self.current_account_image = ImageTk.PhotoImage(image)
-                  except (IOError, OSError) as e:
-                      print(f"Error opening cached skin: {e}")
-                      self.current_account_image = None
+                  self.current_account_image = load_image(image_path, size)
               else:
                   # Fallback to Steve
                   self.current_account_image = self.load_steve_skin(size) # Load Steve
@@ -324,17 +334,44 @@ class MineSeek4KLauncher:
             self.account_image_label.config(image="")  # Clear if no image
             
 
+    def on_session_profile(self, profile, response, size):
+        """Extracts the skin URL from a Mojang session profile and fetches the skin image."""
+        try:
+            data = response.raise_for_status().json()
+            # Extract skin URL from the complicated Mojang response (you might need to adjust this)
+            for prop in data.get("properties", []):
+                if prop["name"] == "textures":
+                    import base64
+                    textures = json.loads(base64.b64decode(prop["value"]))
+                    skin_url = textures["textures"]["SKIN"]["url"]
+                    break
+            else:
+                raise ValueError("Skin URL not found in Mojang response")
+        except (HttpError, ValueError, KeyError, json.JSONDecodeError) as e:
+            self.on_skin_error(e)
+            return
+
+        image_path = os.path.join(self.skins_cache_dir, f"{profile['uuid']}_head.png")
+        fetch_image(self.net, skin_url, image_path, self.show_account_image, resize_to=size)
+
+
+    def on_skin_error(self, error):
+        print(f"Error fetching Microsoft skin: {error}")
+        self.show_account_image(None)  # Fallback if fetching fails
+
+
+    def show_account_image(self, image):
+        self.current_account_image = image
+        if image:
+            self.account_image_label.config(image=image)
+        else:
+            self.account_image_label.config(image="")  # Clear if no image
+
+
     def load_steve_skin(self, size):
         """Loads a built-in Steve skin as a fallback"""
-        try:
-            # Assuming 'steve.png' is in the same directory as the script.
-            image_path = os.path.join(os.path.dirname(__file__), "steve.png")
-            image = Image.open(image_path)
-            image = image.resize(size, Image.Resampling.LANCZOS)
-            return ImageTk.PhotoImage(image)
-        except Exception as e:
-            print(f"Error loading Steve skin: {e}")
-            return None
+        # Assuming 'steve.png' is in the same directory as the script.
+        return load_image(os.path.join(os.path.dirname(__file__), "steve.png"), size)
 
 
     def get_current_username(self):
@@ -358,4 +395,13 @@ class MineSeek4KLauncher:
         self.settings["profiles"].append(new_profile)
         self.settings["active_profile"] = len(self.settings["profiles"]) - 1
         self.save_settings()
-        
+
+
+    def load_settings(self):
+        """Loads the launcher config, importing and migrating an older launcher's config if needed."""
+        self.settings_store.load()
+
+
+    def save_settings(self):
+        """Schedules an atomic, debounced write of the current settings."""
+        self.settings_store.save()
@@ -7,6 +7,9 @@ import requests
 import webbrowser
 from threading import Thread
 import sys
+from launcher_settings import SettingsStore, PYLAUNCHER_CONFIG
+from install_queue import InstallScheduler, DONE
+from version_manifest import shared_manifest
 
 class MinecraftLauncher:
     def __init__(self, root):
@@ -16,12 +19,17 @@ class MinecraftLauncher:
         
         # Configuration
         self.minecraft_dir = minecraft_launcher_lib.utils.get_minecraft_directory()
-        self.settings = {
-            "java_path": "",
-            "ram": "4096",
-            "resolution": "1280x720",
-            "server_ip": ""
-        }
+        self.settings_store = SettingsStore(
+            os.path.join(self.minecraft_dir, PYLAUNCHER_CONFIG),
+            {
+                "java_path": "",
+                "ram": 4096,
+                "resolution": "1280x720",
+                "server_ip": ""
+            }
+        )
+        self.settings = self.settings_store.data
+        self.install_scheduler = InstallScheduler(self.minecraft_dir)
         
         # Variables
         self.versions = []
@@ -135,11 +143,9 @@ class MinecraftLauncher:
 
     def load_online_versions(self):
         try:
-            versions = minecraft_launcher_lib.utils.get_version_list()
-            for version in versions:
-                if version["type"] == "release":
-                    self.version_tree.insert("", "end", text=version["id"], 
-                                          values=(version["type"], version["releaseTime"]))
+            for version in shared_manifest().versions(("release",)):
+                self.version_tree.insert("", "end", text=version.id,
+                                      values=(version.type, version.release_time))
         except Exception as e:
             self.log(f"Error loading versions: {str(e)}")
 
@@ -147,19 +153,14 @@ class MinecraftLauncher:
         version = self.version_tree.item(self.version_tree.selection()[0])["text"]
         modloader = self.modloader_var.get()
         
-        def install_thread():
-            try:
-                if modloader == "Forge":
-                    minecraft_launcher_lib.forge.install_forge_version(version, self.minecraft_dir)
-                elif modloader == "Fabric":
-                    minecraft_launcher_lib.fabric.install_fabric(version, self.minecraft_dir)
-                else:
-                    minecraft_launcher_lib.install.install_minecraft_version(version, self.minecraft_dir)
-                self.log(f"Successfully installed {version}")
-            except Exception as e:
-                self.log(f"Installation error: {str(e)}")
-        
-        Thread(target=install_thread).start()
+        def install_done(job):
+            # Runs on the install worker thread; Tk widgets only from the Tk thread
+            if job.state == DONE:
+                self.root.after(0, self.log, f"Successfully installed {version}")
+            else:
+                self.root.after(0, self.log, f"Installation error: {str(job.error)}")
+        
+        self.install_scheduler.submit(version, modloader, on_done=install_done)
 
     def launch_minecraft(self):
         version = self.selected_version.get()
@@ -195,8 +196,11 @@ class MinecraftLauncher:
             self.settings["java_path"] = path
 
     def save_settings(self):
-        # Implement settings save to file
-        self.log("Settings saved")
+        self.settings["server_ip"] = self.server_entry.get()
+        self.settings_store.save(on_written=lambda error: self.root.after(0, self.settings_written, error))
+
+    def settings_written(self, error):
+        self.log("Settings saved" if error is None else f"Failed to save settings: {error}")
 
     def log(self, message):
         self.console.config(state="normal")
@@ -205,8 +209,9 @@ class MinecraftLauncher:
         self.console.see("end")
 
     def load_settings(self):
-        # Implement settings load from file
-        pass
+        self.settings_store.load()
+        self.server_entry.delete(0, "end")
+        self.server_entry.insert(0, self.settings.get("server_ip", ""))
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+import os
+import json
+import time
+import struct
+import asyncio
+import argparse
+import statistics
+from collections import deque
+from launcher_settings import atomic_write_json
+
+# ----------------------------------------
+# Constants
+# ----------------------------------------
+DEFAULT_PORT = 25565
+PING_TIMEOUT = 3.0          # Seconds for a whole status exchange (connect, status, ping)
+MAX_CONCURRENT_PINGS = 32
+HISTORY_SIZE = 32           # Pings remembered per server
+PROTOCOL_VERSION = -1       # Servers answer a status request whatever version the client claims
+MAX_PACKET = 1024 * 1024    # Status responses carry a base64 favicon, but nothing near this
+SERVERS_FILE = "launcher_servers.json"
+
+
+# ----------------------------------------
+# Server List Ping Protocol
+# ----------------------------------------
+
+def parse_address(address):
+    """'host', 'host:port' or '[v6]:port' -> (host, port)."""
+    address = address.strip()
+    if address.startswith("["):
+        host, _, rest = address[1:].partition("]")
+        return host, int(rest[1:]) if rest.startswith(":") else DEFAULT_PORT
+    if address.count(":") == 1:
+        host, port = address.split(":")
+        return host, int(port)
+    return address, DEFAULT_PORT
+
+
+def _varint(value):
+    value &= 0xFFFFFFFF  # Negative ints are sent as their 32-bit two's complement
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _unpack_varint(data, offset=0):
+    """Returns (value, next offset)."""
+    value = shift = 0
+    while True:
+        if offset >= len(data) or shift > 28:
+            raise ValueError("Bad VarInt")
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            break
+        shift += 7
+    if value & 0x80000000:
+        value -= 1 << 32
+    return value, offset
+
+
+def _string(text):
+    data = text.encode("utf-8")
+    return _varint(len(data)) + data
+
+
+def _packet(packet_id, payload=b""):
+    body = _varint(packet_id) + payload
+    return _varint(len(body)) + body
+
+
+async def _read_packet(reader):
+    """Reads one length-prefixed packet. Returns (packet_id, payload)."""
+    length = shift = 0
+    while True:
+        byte = (await reader.readexactly(1))[0]
+        length |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            break
+        shift += 7
+        if shift > 28:
+            raise ValueError("Bad packet length")
+    if not 0 < length <= MAX_PACKET:
+        raise ValueError(f"Bad packet length {length}")
+    body = await reader.readexactly(length)
+    packet_id, offset = _unpack_varint(body)
+    return packet_id, body[offset:]
+
+
+def _motd_text(description):
+    """Flattens a chat component (or a plain string) to text."""
+    if isinstance(description, str):
+        return description
+    if not isinstance(description, dict):
+        return ""
+    extra = description.get("extra")
+    return str(description.get("text", "")) + "".join(_motd_text(part) for part in (extra if isinstance(extra, list) else []))
+
+
+class PingResult:
+    """One status ping. `rtt_ms` and the player fields are None when the server didn't answer."""
+
+    __slots__ = ("address", "time", "rtt_ms", "online", "max_players", "version", "motd", "error")
+
+    def __init__(self, address, rtt_ms=None, online=None, max_players=None, version=None, motd=None, error=None):
+        self.address = address
+        self.time = time.time()
+        self.rtt_ms = rtt_ms
+        self.online = online
+        self.max_players = max_players
+        self.version = version
+        self.motd = motd
+        self.error = error
+
+    @property
+    def up(self):
+        return self.error is None
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def describe(self):
+        if not self.up:
+            return f"{self.address}: offline ({self.error})"
+        return f"{self.address}: {self.rtt_ms:.0f} ms, {self.online}/{self.max_players} players, {self.version}"
+
+
+async def _status(address, timeout):
+    host, port = parse_address(address)
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        handshake = _varint(PROTOCOL_VERSION) + _string(host) + struct.pack(">H", port) + _varint(1)
+        writer.write(_packet(0x00, handshake) + _packet(0x00))  # Handshake (next state: status), status request
+        await writer.drain()
+        packet_id, payload = await _read_packet(reader)
+        if packet_id != 0x00:
+            raise ValueError(f"Unexpected packet 0x{packet_id:02x}")
+        length, offset = _unpack_varint(payload)
+        status = json.loads(payload[offset:offset + length].decode("utf-8"))
+        if not isinstance(status, dict):
+            raise ValueError("Status is not a JSON object")
+
+        # RTT is timed on the ping/pong exchange only, like the game's server list
+        token = time.monotonic_ns() & 0x7FFFFFFFFFFFFFFF
+        start = time.perf_counter()
+        writer.write(_packet(0x01, struct.pack(">q", token)))
+        await writer.drain()
+        packet_id, payload = await _read_packet(reader)
+        rtt_ms = (time.perf_counter() - start) * 1000
+        if packet_id != 0x01 or len(payload) < 8 or struct.unpack(">q", payload[:8])[0] != token:
+            raise ValueError("Bad pong")
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+    players = status.get("players")
+    players = players if isinstance(players, dict) else {}
+    version = status.get("version")
+    version = version if isinstance(version, dict) else {}
+    return PingResult(address, rtt_ms, players.get("online"), players.get("max"),
+                      version.get("name"), _motd_text(status.get("description")))
+
+
+async def ping(address, timeout=PING_TIMEOUT):
+    """Pings one server (Server List Ping, 1.7+). Never raises: failures come back as PingResult.error."""
+    try:
+        return await asyncio.wait_for(_status(address, timeout), timeout)
+    except asyncio.TimeoutError:
+        return PingResult(address, error="timed out")
+    except (OSError, ValueError, struct.error, asyncio.IncompleteReadError) as e:
+        return PingResult(address, error=str(e) or type(e).__name__)
+    except Exception as e:
+        # Whatever else a misbehaving server provokes; one bad server must not abort ping_many()
+        return PingResult(address, error=f"{type(e).__name__}: {e}")
+
+
+async def ping_many(addresses, timeout=PING_TIMEOUT, limit=MAX_CONCURRENT_PINGS):
+    """Pings every address concurrently (at most `limit` at a time). Returns results in the same order."""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def one(address):
+        async with semaphore:
+            return await ping(address, timeout)
+    return await asyncio.gather(*(one(address) for address in addresses))
+
+
+# ----------------------------------------
+# Saved Servers + Latency History
+# ----------------------------------------
+
+class ServerList:
+    """
+    Saved servers with the last HISTORY_SIZE pings of each, kept in a ring
+    buffer (a bounded deque of (time, rtt_ms, players online) entries, with
+    None for a failed ping) and persisted next to the launcher settings.
+    """
+
+    def __init__(self, path, history_size=HISTORY_SIZE):
+        self.path = path
+        self.history_size = history_size
+        self.servers = {}  # name -> {"address": str, "history": deque}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        self.servers = {
+            name: {"address": entry["address"],
+                   "history": deque((tuple(h) for h in entry.get("history", [])), maxlen=self.history_size)}
+            for name, entry in data.get("servers", {}).items()
+        }
+
+    def save(self):
+        atomic_write_json(self.path, {"servers": {
+            name: {"address": entry["address"], "history": list(entry["history"])}
+            for name, entry in self.servers.items()
+        }})
+
+    def add(self, name, address):
+        parse_address(address)  # Rejects a bad port now rather than at ping time
+        entry = self.servers.get(name)
+        if entry is None or entry["address"] != address:
+            self.servers[name] = {"address": address, "history": deque(maxlen=self.history_size)}
+        self.save()
+
+    def remove(self, name):
+        if self.servers.pop(name, None) is None:
+            raise KeyError(f"No saved server named {name!r}")
+        self.save()
+
+    def record(self, name, result):
+        players = result.online if result.up else None
+        self.servers[name]["history"].append((round(result.time, 3), result.rtt_ms and round(result.rtt_ms, 2), players))
+
+    async def ping_all(self, timeout=PING_TIMEOUT, limit=MAX_CONCURRENT_PINGS, names=None):
+        """Pings the saved servers concurrently, records the results and saves. Returns {name: PingResult}."""
+        names = list(names or self.servers)
+        results = await ping_many([self.servers[n]["address"] for n in names], timeout, limit)
+        for name, result in zip(names, results):
+            self.record(name, result)
+        self.save()
+        return dict(zip(names, results))
+
+    def refresh(self, timeout=PING_TIMEOUT, limit=MAX_CONCURRENT_PINGS, names=None):
+        """ping_all() for callers without an event loop (CLI, worker threads)."""
+        return asyncio.run(self.ping_all(timeout, limit, names))
+
+    def stats(self, name):
+        entry = self.servers[name]
+        history = entry["history"]
+        rtts = [h[1] for h in history if h[1] is not None]
+        last = history[-1] if history else None
+        return {
+            "address": entry["address"],
+            "up": bool(last and last[1] is not None),
+            "last_rtt_ms": last[1] if last else None,
+            "median_rtt_ms": round(statistics.median(rtts), 2) if rtts else None,
+            "min_rtt_ms": min(rtts) if rtts else None,
+            "loss": round(1 - len(rtts) / len(history), 3) if history else None,
+            "players": last[2] if last else None,
+            "samples": len(history),
+        }
+
+    def best(self):
+        """The name of the server that answered its last ping with the lowest median RTT, or None."""
+        candidates = [(s["median_rtt_ms"], s["loss"], name) for name, s in
+                      ((name, self.stats(name)) for name in self.servers) if s["up"]]
+        return min(candidates)[2] if candidates else None
+
+
+# ----------------------------------------
+# Stub Server (self-test)
+# ----------------------------------------
+
+class StubServer:
+    """
+    A local server that speaks just enough of the protocol to answer status
+    pings, after `delay` seconds per reply. With `silent` it accepts
+    connections and never answers (a hung server); with `short_pong` it
+    answers pings with a truncated pong. Replace `status` to send other JSON.
+    """
+
+    def __init__(self, delay=0.0, online=3, max_players=20, motd="Stub", silent=False, short_pong=False):
+        self.delay = delay
+        self.silent = silent
+        self.short_pong = short_pong
+        self.status = {"version": {"name": "Stub 1.20.1", "protocol": 763},
+                       "players": {"max": max_players, "online": online}, "description": {"text": motd}}
+        self.server = None
+        self.address = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.address = "127.0.0.1:%d" % self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def _handle(self, reader, writer):
+        try:
+            packet_id, payload = await _read_packet(reader)  # Handshake
+            if self.silent:
+                await reader.read()  # Hold the connection open until the client gives up
+                return
+            while True:
+                packet_id, payload = await _read_packet(reader)
+                await asyncio.sleep(self.delay)
+                if packet_id == 0x00:
+                    writer.write(_packet(0x00, _string(json.dumps(self.status))))
+                elif packet_id == 0x01:
+                    writer.write(_packet(0x01, payload[:4] if self.short_pong else payload))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+async def self_test(rounds=3, timeout=0.5):
+    """
+    Pings stub servers with different latencies plus a hung one, a closed
+    port and two that answer with malformed status JSON or pongs, all at once, and checks the results, the ring buffer and best().
+    Returns the ServerList's stats.
+    """
+    import tempfile
+    delays = {"fast": 0.005, "medium": 0.03, "slow": 0.08}
+    stubs = {name: await StubServer(delay, online=i).start() for i, (name, delay) in enumerate(delays.items())}
+    hung = await StubServer(silent=True).start()
+    closed = await StubServer().start()
+    await closed.close()  # Nothing listens on this port any more
+    not_object = await StubServer().start()
+    not_object.status = ["not", "an", "object"]
+    short_pong = await StubServer(short_pong=True).start()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            servers = ServerList(os.path.join(tmp, SERVERS_FILE), history_size=2)
+            for name, stub in stubs.items():
+                servers.add(name, stub.address)
+            servers.add("hung", hung.address)
+            servers.add("closed", closed.address)
+            servers.add("not_object", not_object.address)
+            servers.add("short_pong", short_pong.address)
+            for _ in range(rounds):
+                start = time.perf_counter()
+                results = await servers.ping_all(timeout)
+                elapsed = time.perf_counter() - start
+                assert elapsed < timeout * 2, f"pings ran one after another ({elapsed:.2f} s)"
+            assert results["hung"].error == "timed out", results["hung"].error
+            assert not results["closed"].up
+            assert not results["not_object"].up and not results["short_pong"].up, results
+            assert results["slow"].online == 2 and results["slow"].max_players == 20
+            assert results["fast"].rtt_ms < results["slow"].rtt_ms
+            assert all(len(entry["history"]) == 2 for entry in servers.servers.values()), "ring buffer not bounded"
+            assert servers.best() == "fast", servers.best()
+            assert ServerList(servers.path).stats("fast")["samples"] == 2, "history not persisted"
+            return {name: servers.stats(name) for name in servers.servers}
+    finally:
+        for stub in [*stubs.values(), hung, not_object, short_pong]:
+            await stub.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ping Minecraft servers (Server List Ping).")
+    parser.add_argument("addresses", nargs="*", help="host or host:port")
+    parser.add_argument("--timeout", type=float, default=PING_TIMEOUT)
+    parser.add_argument("--self-test", action="store_true", help="Check the pinger against local stub servers")
+    args = parser.parse_args()
+
+    if args.self_test:
+        for name, stats in asyncio.run(self_test()).items():
+            print(f"{name:>10}: {stats}")
+        print("Self-test passed")
+    else:
+        for result in asyncio.run(ping_many(args.addresses, args.timeout)):
+            print(result.describe())
@@ -0,0 +1,280 @@
+import os
+import sys
+import json
+import errno
+import select
+import sqlite3
+import struct
+import ctypes
+import ctypes.util
+import threading
+from version_manifest import shared_manifest
+
+# ----------------------------------------
+# Constants
+# ----------------------------------------
+INDEX_FILE = "launcher_versions_index.sqlite"
+POLL_INTERVAL = 5.0  # Seconds between rescans when inotify is unavailable
+
+# inotify(7) event masks
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+ROOT_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_ONLYDIR
+VERSION_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+# ----------------------------------------
+# Utility Functions
+# ----------------------------------------
+
+def _load_libc_inotify():
+    """Returns libc if it exposes inotify (Linux only), otherwise None."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            return None
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+def read_version_json(path):
+    """Parses the fields we index out of a version JSON. Returns None if unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return {
+        "id": data.get("id"),
+        "type": data.get("type", "release"),
+        "releaseTime": data.get("releaseTime", ""),
+        "inheritsFrom": data.get("inheritsFrom"),
+    }
+
+
+# ----------------------------------------
+# Version Index
+# ----------------------------------------
+
+class VersionIndex:
+    """
+    Persistent index of the versions installed under `<minecraft_dir>/versions`.
+
+    Opening the index only reads the SQLite table, so startup cost does not
+    depend on how many version JSONs are on disk. `start()` reconciles the
+    table against the directory on a background thread (re-parsing only JSONs
+    whose mtime or size changed) and then keeps it current from inotify, or
+    by polling when inotify is not available.
+
+    `generation` increases on every change; UI code can poll it from its own
+    loop instead of being called back from the watcher thread.
+    """
+
+    def __init__(self, minecraft_dir, index_path=None):
+        self.minecraft_dir = minecraft_dir
+        self.versions_dir = os.path.join(minecraft_dir, "versions")
+        self.index_path = index_path or os.path.join(minecraft_dir, INDEX_FILE)
+        self.generation = 0
+
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._versions = {}
+
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        self._db = sqlite3.connect(self.index_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS versions ("
+            " id TEXT PRIMARY KEY, type TEXT, release_time TEXT, inherits_from TEXT,"
+            " json_mtime_ns INTEGER, json_size INTEGER)"
+        )
+        self._db.commit()
+        for row in self._db.execute("SELECT id, type, release_time, inherits_from, json_mtime_ns, json_size FROM versions"):
+            self._versions[row[0]] = row
+
+    # ---------------- Queries ----------------
+    def installed_versions(self):
+        """Installed versions in the same dict shape as utils.get_installed_versions()."""
+        with self._lock:
+            rows = list(self._versions.values())
+        return [
+            {"id": r[0], "type": r[1], "releaseTime": r[2], "inheritsFrom": r[3]}
+            for r in rows
+        ]
+
+    def __contains__(self, version_id):
+        with self._lock:
+            return version_id in self._versions
+
+    # ---------------- Updating ----------------
+    def refresh_version(self, version_id):
+        """Re-stat (and if changed, re-parse) a single version. Returns True if the index changed."""
+        json_path = os.path.join(self.versions_dir, version_id, version_id + ".json")
+        try:
+            st = os.stat(json_path)
+        except OSError:
+            return self._remove(version_id)
+
+        with self._lock:
+            known = self._versions.get(version_id)
+        if known and known[4] == st.st_mtime_ns and known[5] == st.st_size:
+            return False
+
+        info = read_version_json(json_path)
+        if info is None:
+            # Half-written JSON; inotify will report the final close_write
+            return False
+        row = (version_id, info["type"], info["releaseTime"], info["inheritsFrom"], st.st_mtime_ns, st.st_size)
+        with self._lock:
+            self._versions[version_id] = row
+            self._db.execute("INSERT OR REPLACE INTO versions VALUES (?, ?, ?, ?, ?, ?)", row)
+            self._db.commit()
+            self.generation += 1
+        return True
+
+    def _remove(self, version_id):
+        with self._lock:
+            if self._versions.pop(version_id, None) is None:
+                return False
+            self._db.execute("DELETE FROM versions WHERE id = ?", (version_id,))
+            self._db.commit()
+            self.generation += 1
+        return True
+
+    def reconcile(self):
+        """Bring the index in line with the versions directory using stat() only where possible."""
+        try:
+            on_disk = set(
+                name for name in os.listdir(self.versions_dir)
+                if os.path.isdir(os.path.join(self.versions_dir, name))
+            )
+        except FileNotFoundError:
+            on_disk = set()
+        with self._lock:
+            stale = set(self._versions) - on_disk
+        changed = False
+        for version_id in stale:
+            changed |= self._remove(version_id)
+        for version_id in on_disk:
+            changed |= self.refresh_version(version_id)
+        return changed
+
+    # ---------------- Watching ----------------
+    def start(self):
+        """Reconcile in the background and then keep watching the versions directory."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name="VersionIndexWatcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def close(self):
+        """Stop the watcher and close the SQLite connection."""
+        self.stop()
+        if self._thread is not None:
+            self._thread.join()
+        with self._lock:
+            self._db.close()
+
+    def _watch(self):
+        os.makedirs(self.versions_dir, exist_ok=True)
+        libc = _load_libc_inotify()
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC) if libc else -1
+        if fd < 0:
+            self._poll()
+            return
+        try:
+            self._watch_inotify(libc, fd)
+        except OSError as e:
+            print(f"inotify watcher failed, falling back to polling: {e}")
+            self._poll()
+        finally:
+            os.close(fd)
+
+    def _poll(self):
+        self.reconcile()
+        while not self._stop.wait(POLL_INTERVAL):
+            self.reconcile()
+
+    def _watch_inotify(self, libc, fd):
+        watches = {}  # wd -> version id ("" for the versions directory itself)
+
+        def add_watch(path, mask, version_id):
+            wd = libc.inotify_add_watch(fd, os.fsencode(path), mask)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOSPC:
+                    raise OSError(err, "inotify watch limit reached")
+                return
+            watches[wd] = version_id
+
+        add_watch(self.versions_dir, ROOT_MASK, "")
+        # Watches go in before the reconcile so nothing changing during it is missed
+        for name in os.listdir(self.versions_dir):
+            path = os.path.join(self.versions_dir, name)
+            if os.path.isdir(path):
+                add_watch(path, VERSION_MASK, name)
+        self.reconcile()
+
+        while not self._stop.is_set():
+            ready, _, _ = select.select([fd], [], [], 1.0)
+            if not ready:
+                continue
+            try:
+                buf = os.read(fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+
+            dirty = set()
+            offset = 0
+            while offset < len(buf):
+                wd, mask, _cookie, length = EVENT_HEADER.unpack_from(buf, offset)
+                name = buf[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+                offset += EVENT_HEADER.size + length
+                name = os.fsdecode(name)
+                owner = watches.get(wd)
+                if owner is None:
+                    continue
+                if owner == "":
+                    # A version directory appeared or went away
+                    if mask & (IN_CREATE | IN_MOVED_TO) and mask & IN_ISDIR:
+                        add_watch(os.path.join(self.versions_dir, name), VERSION_MASK, name)
+                    dirty.add(name)
+                elif mask & IN_DELETE_SELF:
+                    watches.pop(wd, None)
+                    dirty.add(owner)
+                elif name == owner + ".json":
+                    dirty.add(owner)
+
+            # Coalesce bursts (an install writes many files) into one refresh per version
+            for version_id in dirty:
+                if version_id:
+                    self.refresh_version(version_id)
+
+
+def get_available_versions(index):
+    """Like utils.get_available_versions(), but installed versions come from the index."""
+    versions = []
+    seen = set()
+    for version in shared_manifest().versions():
+        versions.append({"id": version.id, "type": version.type})
+        seen.add(version["id"])
+    for version in index.installed_versions():
+        if version["id"] not in seen:
+            versions.append({"id": version["id"], "type": version["type"]})
+    return versions
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+import sys
+import time
+import argparse
+import threading
+import tracemalloc
+import minecraft_launcher_lib
+
+# ----------------------------------------
+# Constants
+# ----------------------------------------
+MANIFEST_TTL = 10 * 60  # Seconds before the cached Mojang version list is refetched
+
+
+# ----------------------------------------
+# Version Records
+# ----------------------------------------
+
+class VersionRecord:
+    """
+    One entry of Mojang's version list. Uses __slots__ instead of a per-entry
+    dict, and the handful of distinct type strings are interned so every
+    record shares them. Supports record["id"] / ["type"] / ["releaseTime"]
+    so code written against the library's dicts keeps working.
+    """
+
+    __slots__ = ("id", "type", "release_time")
+
+    _KEYS = {"id": "id", "type": "type", "releaseTime": "release_time"}
+
+    def __init__(self, version_id, version_type, release_time):
+        self.id = version_id
+        self.type = sys.intern(version_type)
+        self.release_time = release_time
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, self._KEYS[key])
+        except KeyError:
+            raise KeyError(key) from None
+
+    def __repr__(self):
+        return f"<VersionRecord {self.type} {self.id}>"
+
+
+def compact_versions(versions):
+    """Turns the library's list of version dicts into a tuple of VersionRecords."""
+    return tuple(VersionRecord(v["id"], v["type"], v["releaseTime"]) for v in versions)
+
+
+# ----------------------------------------
+# Shared Manifest
+# ----------------------------------------
+
+class SharedManifest:
+    """
+    The version list, fetched at most once per MANIFEST_TTL and shared by
+    every tab, launcher and the core in this process. Filtered views are cached
+    tuples of the same record objects, not copies of the records.
+    """
+
+    def __init__(self, ttl=MANIFEST_TTL, fetch=None):
+        self.ttl = ttl
+        self._fetch = fetch or minecraft_launcher_lib.utils.get_version_list
+        self._records = None
+        self._fetched = 0.0
+        self._by_type = {}
+        self._lock = threading.Lock()
+
+    def versions(self, types=None, refresh=False):
+        with self._lock:
+            if refresh or self._records is None or time.monotonic() - self._fetched > self.ttl:
+                self._records = compact_versions(self._fetch())
+                self._fetched = time.monotonic()
+                self._by_type = {}
+            if not types:
+                return self._records
+            key = tuple(types)
+            if key not in self._by_type:
+                self._by_type[key] = tuple(v for v in self._records if v.type in types)
+            return self._by_type[key]
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_manifest():
+    """The process-wide SharedManifest."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = SharedManifest()
+        return _shared
+
+
+# ----------------------------------------
+# Benchmark
+# ----------------------------------------
+
+def _traced(build):
+    """Bytes still allocated by the object `build()` returns."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    obj = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del obj
+    return size
+
+
+def benchmark_memory(raw=None, copies=3):
+    """
+    Compares holding the version list the old way (a list of dicts per tab,
+    `copies` tabs) with one shared tuple of slotted records.
+    Returns {"versions": n, "dicts": bytes, "records": bytes}.
+    """
+    raw = raw if raw is not None else minecraft_launcher_lib.utils.get_version_list()
+
+    def fetch():
+        # A fresh get_version_list() result: new dicts and new strings every time
+        return [{"id": "".join(v["id"]), "type": "".join(v["type"]), "releaseTime": v["releaseTime"]} for v in raw]
+
+    def as_dicts():
+        return [fetch() for _ in range(copies)]  # Before: each tab fetched and kept its own list
+
+    def as_records():
+        records = compact_versions(fetch())  # The fetched dicts are dropped; only the records stay
+        return [records for _ in range(copies)]
+
+    return {"versions": len(raw), "dicts": _traced(as_dicts), "records": _traced(as_records)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the memory held by the version manifest (tracemalloc).")
+    parser.add_argument("--copies", type=int, default=3, help="Tabs/launchers that each held their own list before")
+    args = parser.parse_args()
+
+    result = benchmark_memory(copies=args.copies)
+    print(f"{result['versions']} versions, {args.copies} consumers")
+    print(f"  list of dicts per consumer: {result['dicts'] / 1024:.0f} KiB")
+    print(f"  shared slotted records:     {result['records'] / 1024:.0f} KiB "
+          f"({result['dicts'] / max(result['records'], 1):.1f}x smaller)")
@@ -0,0 +1,345 @@
+import os
+import re
+import gzip
+import mmap
+import zlib
+import struct
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# ----------------------------------------
+# Constants
+# ----------------------------------------
+SECTOR = 4096
+HEADER_SECTORS = 2           # 1024 chunk locations, then 1024 timestamps
+
+COMPRESSION_GZIP = 1
+COMPRESSION_ZLIB = 2
+COMPRESSION_NONE = 3
+COMPRESSION_LZ4 = 4          # 1.20.5+ option; not decoded here, such chunks are never pruned
+EXTERNAL_FLAG = 0x80
+
+TICKS_PER_SECOND = 20
+DEFAULT_MIN_INHABITED = 60 * TICKS_PER_SECOND  # Chunks players spent less than a minute near
+SIBLING_DIRS = ("entities", "poi")              # 1.17+ keep per-chunk entities / POIs in parallel region files
+POOL_THRESHOLD = 4
+
+_REGION_NAME = re.compile(r"^r\.(-?\d+)\.(-?\d+)\.mca$")
+# Long tag named "InhabitedTime": at the chunk root since 1.18, under "Level" before.
+# A byte search is far cheaper than parsing each chunk's whole NBT tree.
+_INHABITED_TAG = b"\x04\x00\x0dInhabitedTime"
+
+
+# ----------------------------------------
+# Region File Parsing (runs in worker processes)
+# ----------------------------------------
+
+def _decompress(kind, data):
+    if kind == COMPRESSION_ZLIB:
+        return zlib.decompress(data)
+    if kind == COMPRESSION_GZIP:
+        return gzip.decompress(data)
+    if kind == COMPRESSION_NONE:
+        return bytes(data)
+    return None
+
+
+def inhabited_time(nbt):
+    """InhabitedTime (ticks) from a chunk's uncompressed NBT, or None if it has none."""
+    i = nbt.find(_INHABITED_TAG)
+    if i < 0 or i + len(_INHABITED_TAG) + 8 > len(nbt):
+        return None
+    return struct.unpack_from(">q", nbt, i + len(_INHABITED_TAG))[0]
+
+
+def _chunk_table(mm, total_sectors):
+    """Returns ([(index, offset, sectors, length, timestamp)], errors) for the chunks a region's header lists."""
+    locations = struct.unpack_from(">1024I", mm, 0)
+    timestamps = struct.unpack_from(">1024I", mm, SECTOR)
+    chunks, errors = [], []
+    for index, location in enumerate(locations):
+        if not location:
+            continue
+        offset, count = location >> 8, location & 0xFF
+        if offset < HEADER_SECTORS or count == 0 or offset + count > total_sectors:
+            errors.append(f"chunk {index}: sectors {offset}+{count} outside the file")
+            continue
+        length = struct.unpack_from(">I", mm, offset * SECTOR)[0]
+        if length == 0 or length + 4 > count * SECTOR:
+            errors.append(f"chunk {index}: length {length} does not fit its {count} sectors")
+            continue
+        chunks.append((index, offset, count, length, timestamps[index]))
+    return chunks, errors
+
+
+def _region_coords(path):
+    match = _REGION_NAME.match(os.path.basename(path))
+    return (int(match.group(1)), int(match.group(2))) if match else (0, 0)
+
+
+def analyze_region(path, min_inhabited=DEFAULT_MIN_INHABITED):
+    """
+    Reads one .mca file through mmap. Returns a dict with the file's sector
+    usage and one (x, z, bytes, sectors, compression, inhabited_ticks,
+    timestamp) tuple per chunk, in world chunk coordinates.
+    """
+    size = os.path.getsize(path)
+    total = -(-size // SECTOR)
+    report = {
+        "path": path, "file_size": size, "sectors": total, "used_sectors": 0, "unused_sectors": 0,
+        "compacted_size": 0, "chunks": [], "stale": 0, "errors": [],
+    }
+    if size < HEADER_SECTORS * SECTOR:
+        if size:
+            report["errors"].append("truncated header")
+        return report
+
+    rx, rz = _region_coords(path)
+    used = bytearray(total)
+    used[:HEADER_SECTORS] = b"\x01" * HEADER_SECTORS
+    needed = HEADER_SECTORS
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        table, report["errors"] = _chunk_table(mm, total)
+        for index, offset, count, length, timestamp in table:
+            start = offset * SECTOR
+            kind = mm[start + 4]
+            inhabited = None
+            if not kind & EXTERNAL_FLAG:
+                try:
+                    nbt = _decompress(kind, mm[start + 5:start + 4 + length])
+                except (zlib.error, OSError, EOFError) as e:
+                    report["errors"].append(f"chunk {index}: {e}")
+                    nbt = None
+                if nbt is not None:
+                    inhabited = inhabited_time(nbt)
+            used[offset:offset + count] = b"\x01" * count
+            needed += -(-(length + 4) // SECTOR)
+            if inhabited is not None and inhabited < min_inhabited:
+                report["stale"] += 1
+            report["chunks"].append((
+                rx * 32 + index % 32, rz * 32 + index // 32, length + 4, count, kind, inhabited, timestamp
+            ))
+    report["used_sectors"] = used.count(1)
+    report["unused_sectors"] = total - report["used_sectors"]
+    report["compacted_size"] = needed * SECTOR if report["chunks"] else 0
+    return report
+
+
+def _readable(path):
+    """True if a region file's header lists only chunks that fit in the file (what _rewrite needs)."""
+    size = os.path.getsize(path)
+    if size < HEADER_SECTORS * SECTOR:
+        return True
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return not _chunk_table(mm, -(-size // SECTOR))[1]
+
+
+def _rewrite(path, drop, dry_run):
+    """
+    Writes a region file back with its chunks packed back to back (in index
+    order) and the chunks in `drop` removed. Returns (size before, size after),
+    or None if the file has header errors and was left alone.
+    """
+    before = os.path.getsize(path)
+    if before < HEADER_SECTORS * SECTOR:
+        return before, before
+    total = -(-before // SECTOR)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        table, errors = _chunk_table(mm, total)
+        if errors:
+            return None  # Never rewrite a file we can't fully read; the game may still recover it
+        kept = [c for c in sorted(table) if c[0] not in drop]
+        sectors = HEADER_SECTORS + sum(-(-(length + 4) // SECTOR) for _i, _o, _c, length, _t in kept)
+        after = sectors * SECTOR if kept else 0
+        if dry_run or not kept:
+            tmp = None
+        else:
+            tmp = path + ".compact.tmp"
+            _write_packed(mm, kept, tmp)
+    if dry_run:
+        return before, after
+    if tmp is None:
+        os.remove(path)  # Nothing left: the game treats a missing region as all-new chunks
+        return before, 0
+    os.replace(tmp, path)
+    return before, after
+
+
+def _write_packed(mm, kept, tmp):
+    header = bytearray(HEADER_SECTORS * SECTOR)
+    with open(tmp, "wb") as out:
+        out.write(header)
+        position = HEADER_SECTORS
+        for index, offset, _count, length, timestamp in kept:
+            count = -(-(length + 4) // SECTOR)
+            struct.pack_into(">I", header, index * 4, (position << 8) | count)
+            struct.pack_into(">I", header, SECTOR + index * 4, timestamp)
+            start = offset * SECTOR
+            out.write(mm[start:start + length + 4])
+            out.write(b"\0" * (count * SECTOR - length - 4))
+            position += count
+        out.seek(0)
+        out.write(header)
+        out.flush()
+        os.fsync(out.fileno())
+
+
+def compact_region(path, min_inhabited=None, dry_run=False):
+    """
+    Compacts one region file, first dropping chunks whose InhabitedTime is
+    below `min_inhabited` (None keeps every chunk). Dropped chunks are also
+    removed from the matching entities/ and poi/ region files, so the game
+    regenerates them cleanly. If any of the three files can't be fully read,
+    none of them is rewritten, so they never disagree about which chunks
+    exist. Returns a dict with the bytes before and after.
+    """
+    result = {"path": path, "before": 0, "after": 0, "pruned": 0, "skipped": []}
+    drop = set()
+    if min_inhabited is not None:
+        report = analyze_region(path, min_inhabited)
+        if report["errors"]:
+            result["skipped"].append(path)
+            return result
+        rx, rz = _region_coords(path)
+        for x, z, _size, _sectors, _kind, inhabited, _timestamp in report["chunks"]:
+            if inhabited is not None and inhabited < min_inhabited:
+                drop.add((x - rx * 32) + (z - rz * 32) * 32)
+        result["pruned"] = len(drop)
+
+    dimension = os.path.dirname(os.path.dirname(path))
+    siblings = [os.path.join(dimension, d, os.path.basename(path)) for d in SIBLING_DIRS]
+    paths = [path] + [p for p in siblings if os.path.exists(p)]
+    unreadable = [p for p in paths if not _readable(p)]
+    if unreadable:
+        result["skipped"].extend(unreadable)
+        result["pruned"] = 0
+        return result
+    for p in paths:
+        sizes = _rewrite(p, drop, dry_run)
+        if sizes is None:
+            result["skipped"].append(p)
+            continue
+        result["before"] += sizes[0]
+        result["after"] += sizes[1]
+    return result
+
+
+# ----------------------------------------
+# Worlds
+# ----------------------------------------
+
+def list_worlds(minecraft_dir):
+    """World directories (those with a level.dat) under <minecraft_dir>/saves, sorted by name."""
+    saves = os.path.join(minecraft_dir, "saves")
+    try:
+        names = sorted(os.listdir(saves))
+    except FileNotFoundError:
+        return []
+    return [os.path.join(saves, n) for n in names if os.path.isfile(os.path.join(saves, n, "level.dat"))]
+
+
+def find_regions(world_dir):
+    """Every .mca file in a world's terrain region/ directories (all dimensions)."""
+    regions = []
+    for dirpath, dirnames, filenames in os.walk(world_dir):
+        if os.path.basename(dirpath) == "region":
+            regions.extend(os.path.join(dirpath, n) for n in filenames if _REGION_NAME.match(n))
+            dirnames[:] = []
+    return sorted(regions)
+
+
+def world_in_use(world_dir):
+    """True if a running game holds the world's session.lock."""
+    path = os.path.join(world_dir, "session.lock")
+    try:
+        with open(path, "r+b") as f:
+            if fcntl is not None:
+                fcntl.lockf(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                f.read(1)  # Windows locks are mandatory; reading a locked file fails
+    except FileNotFoundError:
+        return False
+    except OSError:
+        return True
+    return False
+
+
+class RegionTool:
+    """
+    Analyzes and compacts the region files of one world, one region per task
+    on a process pool.
+
+    - analyze() reports per-chunk sizes, sectors the header no longer points
+      at (left behind whenever a chunk grows and is moved), and stale chunks
+      whose InhabitedTime is below a threshold.
+    - compact() rewrites each region with its chunks packed back to back and,
+      given a threshold, drops the stale chunks first.
+    """
+
+    def __init__(self, world_dir, workers=None):
+        self.world_dir = world_dir
+        self.workers = workers
+
+    def _map(self, func, paths, callback):
+        set_max = callback.get("setMax", lambda n: None)
+        set_progress = callback.get("setProgress", lambda n: None)
+        set_max(len(paths))
+        results = []
+        if len(paths) < POOL_THRESHOLD:
+            for i, path in enumerate(paths):
+                results.append(func(path))
+                set_progress(i + 1)
+            return results
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            for i, result in enumerate(pool.map(func, paths)):
+                results.append(result)
+                set_progress(i + 1)
+        return results
+
+    def analyze(self, min_inhabited=DEFAULT_MIN_INHABITED, callback=None, chunks=False):
+        """World summary; with chunks=True each region keeps its per-chunk list."""
+        callback = callback or {}
+        regions = find_regions(self.world_dir)
+        callback.get("setStatus", lambda s: None)(f"Analyzing {len(regions)} region files")
+        reports = self._map(partial(analyze_region, min_inhabited=min_inhabited), regions, callback)
+
+        all_chunks = [c for r in reports for c in r["chunks"]]
+        largest = sorted(all_chunks, key=lambda c: c[2], reverse=True)[:10]
+        summary = {
+            "world": self.world_dir,
+            "regions": len(reports),
+            "chunks": len(all_chunks),
+            "file_bytes": sum(r["file_size"] for r in reports),
+            "unused_bytes": sum(r["unused_sectors"] for r in reports) * SECTOR,
+            "reclaimable_bytes": sum(r["file_size"] - r["compacted_size"] for r in reports if not r["errors"]),
+            "stale_chunks": sum(r["stale"] for r in reports),
+            "min_inhabited_ticks": min_inhabited,
+            "largest_chunks": [{"x": c[0], "z": c[1], "bytes": c[2]} for c in largest],
+            "errors": {r["path"]: r["errors"] for r in reports if r["errors"]},
+        }
+        if chunks:
+            summary["region_files"] = reports
+        return summary
+
+    def compact(self, min_inhabited=None, dry_run=False, callback=None):
+        """Compacts every region (pruning stale chunks if min_inhabited is given). Refuses while the world is open."""
+        if not dry_run and world_in_use(self.world_dir):
+            raise RuntimeError(f"{os.path.basename(self.world_dir)} is open in a running game")
+        callback = callback or {}
+        regions = find_regions(self.world_dir)
+        callback.get("setStatus", lambda s: None)(f"Compacting {len(regions)} region files")
+        results = self._map(partial(compact_region, min_inhabited=min_inhabited, dry_run=dry_run), regions, callback)
+        return {
+            "world": self.world_dir,
+            "regions": len(results),
+            "dry_run": dry_run,
+            "before_bytes": sum(r["before"] for r in results),
+            "after_bytes": sum(r["after"] for r in results),
+            "pruned_chunks": sum(r["pruned"] for r in results),
+            "skipped": [p for r in results for p in r["skipped"]],
+        }